@@ -3,9 +3,8 @@ Sistema de Gestão - Anotações, Ocorrências e Atas de Reunião
 Aplicação principal com dashboard
 """
 import streamlit as st
-from database import DatabaseManager
+from database import criar_gerenciador
 from datetime import datetime
-import plotly.graph_objects as go
 from utils.components import exibir_logo_sidebar, exibir_assinatura_footer
 from auth import login_simples, exibir_info_usuario
 from config import EMPRESA
@@ -25,7 +24,7 @@ if not login_simples():
 # Inicializar o banco de dados
 @st.cache_resource
 def get_db():
-    return DatabaseManager()
+    return criar_gerenciador()
 
 db = get_db()
 
@@ -86,7 +85,9 @@ with col4:
 
 st.markdown("---")
 
-# Gráfico
+# Gráfico (plotly carregado aqui, depois das métricas já desenhadas)
+import plotly.graph_objects as go
+
 st.subheader("📊 Distribuição de Registros")
 
 labels = ['Anotações', 'Ocorrências', 'Atas']
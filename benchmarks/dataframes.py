@@ -0,0 +1,104 @@
+"""
+Benchmark: DataFrame de ocorrências a partir de List[Dict] x obter_dataframe_ocorrencias
+
+Uso:
+    python -m benchmarks.dataframes [--linhas 100000 1000000]
+
+Cria um banco temporário com N ocorrências e mede tempo, pico de memória
+(tracemalloc) e memória final do DataFrame de cada caminho.
+"""
+import argparse
+import gc
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from database.db_manager import DatabaseManager
+
+TIPOS = ["Incidente", "Problema", "Observação", "Bug", "Melhoria", "Outro"]
+SEVERIDADES = ["baixa", "média", "alta", "crítica"]
+STATUS = ["aberta", "em análise", "resolvida", "fechada"]
+
+
+def _popular(db: DatabaseManager, linhas: int):
+    """Insere ocorrências sintéticas espalhadas pelos últimos 3 anos"""
+    inicio = datetime.now() - timedelta(days=3 * 365)
+    aleatorio = random.Random(42)
+    db.criar_ocorrencias_em_lote(({
+        'tipo': aleatorio.choice(TIPOS),
+        'descricao': f"Ocorrência sintética {i} " + "x" * aleatorio.randint(20, 200),
+        'severidade': aleatorio.choice(SEVERIDADES),
+        'status': aleatorio.choice(STATUS),
+        'data_ocorrencia': (inicio + timedelta(minutes=aleatorio.randint(0, 3 * 365 * 24 * 60))).isoformat(),
+        'responsavel': aleatorio.choice([None, "Ana", "Bruno", "Carla"])
+    } for i in range(linhas)), tamanho_lote=20000)
+
+
+def _medir(funcao):
+    """Executa funcao duas vezes e retorna (resultado, segundos, pico_mb).
+
+    O tempo é medido sem tracemalloc, que deixa as alocações bem mais lentas;
+    o pico de memória vem de uma segunda execução rastreada.
+    """
+    gc.collect()
+    inicio = time.perf_counter()
+    resultado = funcao()
+    segundos = time.perf_counter() - inicio
+    del resultado
+
+    gc.collect()
+    tracemalloc.start()
+    resultado = funcao()
+    pico = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+    tracemalloc.stop()
+    return resultado, segundos, pico
+
+
+def caminho_dicts(db: DatabaseManager) -> pd.DataFrame:
+    """Caminho anterior: listar_ocorrencias() -> DataFrame -> conversão de datas"""
+    df = pd.DataFrame(db.listar_ocorrencias())
+    df['data_ocorrencia'] = pd.to_datetime(df['data_ocorrencia'], format='ISO8601')
+    return df
+
+
+def caminho_tipado(db: DatabaseManager, colunas=None) -> pd.DataFrame:
+    """Caminho novo: DataFrame tipado montado em blocos direto do cursor"""
+    return db.obter_dataframe_ocorrencias(colunas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--linhas", type=int, nargs="+", default=[100000, 1000000])
+    args = parser.parse_args(argv)
+
+    for linhas in args.linhas:
+        with tempfile.TemporaryDirectory() as pasta:
+            db = DatabaseManager(os.path.join(pasta, "benchmark.db"))
+            db._cache = None  # mede a consulta, não o cache de resultados
+            _popular(db, linhas)
+
+            print(f"\n{linhas:,} ocorrências")
+            print(f"{'caminho':<34}{'tempo (s)':>10}{'pico (MB)':>12}{'DataFrame (MB)':>16}")
+
+            casos = [
+                ("List[Dict] -> DataFrame", lambda: caminho_dicts(db)),
+                ("obter_dataframe (todas)", lambda: caminho_tipado(db)),
+                ("obter_dataframe (3 colunas)",
+                 lambda: caminho_tipado(db, ['severidade', 'status', 'data_ocorrencia'])),
+            ]
+            for nome, funcao in casos:
+                df, segundos, pico = _medir(funcao)
+                tamanho = df.memory_usage(deep=True).sum() / 1024 ** 2
+                print(f"{nome:<34}{segundos:>10.2f}{pico:>12.1f}{tamanho:>16.1f}")
+                del df
+
+            db.fechar()
+
+
+if __name__ == "__main__":
+    main()
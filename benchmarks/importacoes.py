@@ -0,0 +1,105 @@
+"""
+Relatório: tempo de importação de cada página no primeiro carregamento
+
+Uso:
+    python -m benchmarks.importacoes [--repeticoes 5] [--maiores 5]
+
+Para app.py e cada arquivo de pages/, separa as importações de nível de
+módulo (executadas antes de qualquer elemento ser desenhado) das feitas
+dentro de funções e modos (sob demanda), e mede cada grupo em um
+interpretador novo, como depois de um deploy. Mostra o melhor tempo das
+repetições e os módulos de nível de módulo mais caros (-X importtime).
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Executado no interpretador novo: importações de nível de módulo e, em
+# seguida, as sob demanda, cronometradas separadamente
+_MEDIDOR = """
+import sys, time
+sys.path.insert(0, {raiz!r})
+inicio = time.perf_counter()
+{topo}
+meio = time.perf_counter()
+{sob_demanda}
+fim = time.perf_counter()
+print(meio - inicio, fim - meio)
+"""
+
+
+def _importacoes(caminho: Path):
+    """Importações de nível de módulo e sob demanda de um arquivo"""
+    arvore = ast.parse(caminho.read_text(encoding='utf-8'))
+    topo = [no for no in arvore.body if isinstance(no, (ast.Import, ast.ImportFrom))]
+    sob_demanda = [
+        no for no in ast.walk(arvore)
+        if isinstance(no, (ast.Import, ast.ImportFrom)) and no not in topo
+    ]
+    return [ast.unparse(no) for no in topo], [ast.unparse(no) for no in sob_demanda]
+
+
+def _medir(topo, sob_demanda):
+    """Roda as importações em um interpretador novo; retorna (s topo, s sob demanda, stderr)"""
+    codigo = _MEDIDOR.format(
+        raiz=str(RAIZ),
+        topo='\n'.join(topo) or 'pass',
+        sob_demanda='\n'.join(f"try:\n    {linha}\nexcept ImportError:\n    pass" for linha in sob_demanda) or 'pass'
+    )
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo],
+        cwd=RAIZ, capture_output=True, text=True, env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(resultado.stderr.strip().splitlines()[-1])
+    segundos_topo, segundos_demanda = map(float, resultado.stdout.split())
+    return segundos_topo, segundos_demanda, resultado.stderr
+
+
+def _maiores(importtime: str, topo, quantidade: int):
+    """Pacotes mais caros entre os importados pelo topo do arquivo (µs acumulados)"""
+    pacotes = set()
+    for linha in topo:
+        no = ast.parse(linha).body[0]
+        nomes = [alias.name for alias in no.names] if isinstance(no, ast.Import) else [no.module or '']
+        pacotes.update(nome.split('.')[0] for nome in nomes)
+
+    # Só as entradas sem recuo: cada módulo é contado uma vez, no pacote
+    # de quem o importou primeiro
+    custos = {}
+    for linha in importtime.splitlines():
+        if not linha.startswith('import time:') or linha.count('|') != 2:
+            continue
+        _, acumulado, nome = linha[len('import time:'):].split('|')
+        pacote = nome[1:].split('.')[0]
+        if acumulado.strip().isdigit() and not nome[1:].startswith(' ') and pacote in pacotes:
+            custos[pacote] = custos.get(pacote, 0) + int(acumulado)
+    return sorted(custos.items(), key=lambda item: item[1], reverse=True)[:quantidade]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--maiores", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    arquivos = [RAIZ / 'app.py'] + sorted(p for p in (RAIZ / 'pages').glob('*.py') if p.name != '__init__.py')
+
+    print(f"{'página':<28}{'topo (ms)':>12}{'sob demanda (ms)':>18}   maiores no topo (ms)")
+    for arquivo in arquivos:
+        topo, sob_demanda = _importacoes(arquivo)
+        medicoes = [_medir(topo, sob_demanda) for _ in range(args.repeticoes)]
+        melhor = min(medicoes, key=lambda medicao: medicao[0])
+        segundos_demanda = min(medicao[1] for medicao in medicoes)
+        maiores = ', '.join(f"{nome} {custo / 1000:.0f}"
+                            for nome, custo in _maiores(melhor[2], topo, args.maiores))
+        print(f"{arquivo.name:<28}{melhor[0] * 1000:>12.0f}{segundos_demanda * 1000:>18.0f}   {maiores}")
+
+
+if __name__ == "__main__":
+    main()
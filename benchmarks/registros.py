@@ -0,0 +1,111 @@
+"""
+Benchmark: listas de dicts x registros com __slots__ (database.models)
+
+Uso:
+    python -m benchmarks.registros [--linhas 100000 500000]
+
+Cria um banco temporário com N anotações e N ocorrências e mede, para cada
+caminho, o tempo de montar a lista e a memória retida por linha
+(tracemalloc). O caminho com dicts reproduz a leitura anterior:
+sqlite3.Row -> dict, com as tags decodificadas na hora.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.dataframes import _popular as _popular_ocorrencias
+from database.db_manager import DatabaseManager
+from database.models import COLUNAS_ANOTACOES, COLUNAS_OCORRENCIAS, Anotacao, Ocorrencia
+
+TAGS = ["urgente", "cliente", "interno", "financeiro", "ti", "rh", "projeto"]
+
+
+def _popular_anotacoes(db: DatabaseManager, linhas: int):
+    """Insere anotações sintéticas com até 3 tags"""
+    aleatorio = random.Random(42)
+    db.criar_anotacoes_em_lote(({
+        'titulo': f"Anotação {i}",
+        'conteudo': "y" * aleatorio.randint(20, 400),
+        'tags': aleatorio.sample(TAGS, aleatorio.randint(0, 3))
+    } for i in range(linhas)), tamanho_lote=20000)
+
+
+def _dicts(conn, query: str, json_campos=()) -> list:
+    """Caminho anterior: dict por linha e JSON decodificado na montagem"""
+    conn.row_factory = sqlite3.Row
+    itens = []
+    for row in conn.execute(query):
+        item = dict(row)
+        for campo in json_campos:
+            item[campo] = json.loads(item[campo]) if item[campo] else []
+        itens.append(item)
+    return itens
+
+
+def _registros(conn, query: str, classe) -> list:
+    """Caminho novo: registro montado da tupla pela row_factory"""
+    cursor = conn.cursor()
+    cursor.row_factory = classe.fabrica
+    return cursor.execute(query).fetchall()
+
+
+def _medir(funcao):
+    """Retorna (segundos, bytes retidos pela lista); o tempo é medido sem tracemalloc"""
+    gc.collect()
+    inicio = time.perf_counter()
+    resultado = funcao()
+    segundos = time.perf_counter() - inicio
+    del resultado
+
+    gc.collect()
+    tracemalloc.start()
+    resultado = funcao()
+    gc.collect()
+    retido = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return len(resultado), segundos, retido
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--linhas", type=int, nargs="+", default=[100000, 500000])
+    args = parser.parse_args(argv)
+
+    for linhas in args.linhas:
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "benchmark.db")
+            db = DatabaseManager(caminho)
+            _popular_anotacoes(db, linhas)
+            _popular_ocorrencias(db, linhas)
+            db.fechar()
+
+            conn = sqlite3.connect(caminho)
+            anotacoes = f"SELECT {COLUNAS_ANOTACOES} FROM anotacoes"
+            ocorrencias = f"SELECT {COLUNAS_OCORRENCIAS} FROM ocorrencias"
+
+            print(f"\n{linhas:,} linhas por tabela")
+            print(f"{'caminho':<40}{'tempo (s)':>10}{'bytes/linha':>14}")
+
+            casos = [
+                ("anotações: dicts", lambda: _dicts(conn, anotacoes, ['tags'])),
+                ("anotações: registros", lambda: _registros(conn, anotacoes, Anotacao)),
+                ("anotações: registros + tags lidas",
+                 lambda: [r for r in _registros(conn, anotacoes, Anotacao) if r['tags'] is not None]),
+                ("ocorrências: dicts", lambda: _dicts(conn, ocorrencias)),
+                ("ocorrências: registros", lambda: _registros(conn, ocorrencias, Ocorrencia)),
+            ]
+            for nome, funcao in casos:
+                quantidade, segundos, retido = _medir(funcao)
+                print(f"{nome:<40}{segundos:>10.2f}{retido / max(quantidade, 1):>14.0f}")
+
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
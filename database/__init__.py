@@ -1,3 +1,26 @@
+from .backend import BackendArmazenamento
 from .db_manager import DatabaseManager
 
-__all__ = ['DatabaseManager']
\ No newline at end of file
+try:
+    from config import BANCO_DADOS
+except ImportError:
+    BANCO_DADOS = {'backend': 'sqlite'}
+
+
+def criar_gerenciador(backend: str = None) -> BackendArmazenamento:
+    """Cria o gerenciador do backend configurado em BANCO_DADOS['backend'].
+
+    O módulo do PostgreSQL (e o psycopg) só é importado quando selecionado.
+    """
+    backend = (backend or BANCO_DADOS.get('backend') or 'sqlite').lower()
+
+    if backend == 'sqlite':
+        return DatabaseManager()
+    if backend == 'postgresql':
+        from .postgres import PostgresManager
+        return PostgresManager()
+
+    raise ValueError(f"Backend inválido: {backend}")
+
+
+__all__ = ['BackendArmazenamento', 'DatabaseManager', 'criar_gerenciador']
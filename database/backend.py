@@ -0,0 +1,679 @@
+"""
+Interface comum dos backends de armazenamento
+O DatabaseManager (SQLite) e o PostgresManager implementam os mesmos métodos
+públicos; aqui ficam o cache, o executor de leituras, as transações de
+escrita e os auxiliares que não dependem do banco
+"""
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator, Callable, Union
+
+from .cache import cache_do_banco
+from .fila_escrita import escrita_enfileirada
+
+try:
+    from config import CACHE_CONSULTAS
+except ImportError:
+    CACHE_CONSULTAS = {'habilitado': True, 'memoria_max_mb': 64}
+
+# Domínios de invalidação do cache: tabelas dependentes (tags, acoes,
+# contadores, índices de busca) são cobertas pela tabela principal
+TABELAS_CACHE = ('anotacoes', 'ocorrencias', 'atas_reuniao')
+
+# Campos aceitos em cada registro das cargas em lote (criar_*_em_lote)
+CAMPOS_ANOTACAO = ('titulo', 'conteudo', 'categoria', 'tags', 'prioridade')
+CAMPOS_OCORRENCIA = ('tipo', 'descricao', 'severidade', 'status', 'data_ocorrencia',
+                     'data_fechamento', 'responsavel', 'solucao')
+CAMPOS_ATA = ('titulo', 'data_reuniao', 'horario_inicio', 'horario_fim', 'participantes',
+              'pauta', 'discussoes', 'decisoes', 'acoes', 'proxima_reuniao')
+
+# Campos aceitos por atualizar_ocorrencia (e pelas alterações de atualizar_ocorrencias)
+CAMPOS_EDICAO_OCORRENCIA = ('tipo', 'descricao', 'severidade', 'status', 'responsavel', 'solucao')
+
+# Granularidades aceitas por contar_ocorrencias_por_periodo e obter_fluxo_ocorrencias
+GRANULARIDADES = ('dia', 'semana', 'mes')
+
+
+class BackendArmazenamento(ABC):
+    """Base dos gerenciadores de dados usados pelas páginas.
+
+    A subclasse cria self._pool antes de chamar este __init__. O pool deve
+    oferecer leitura(), escritor(), escrita(), em_transacao(conn) e fechar();
+    MARCADOR é o placeholder de parâmetros do driver.
+    """
+
+    MARCADOR = '?'
+
+    def __init__(self, chave_cache: str, leitores_paralelos: int = 4, usar_cache: bool = True):
+        """Prepara o executor de leituras e o cache compartilhado por chave_cache"""
+        # Consultas em paralelo e pré-carregamento de páginas; cada thread do
+        # executor usa a sua própria conexão de leitura do pool
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, int(leitores_paralelos)),
+            thread_name_prefix='db-leitura'
+        )
+        # Cache de leituras compartilhado por todas as sessões e instâncias do mesmo banco
+        self._cache = None
+        if usar_cache and CACHE_CONSULTAS.get('habilitado', True):
+            self._cache = cache_do_banco(
+                chave_cache, int(CACHE_CONSULTAS.get('memoria_max_mb', 64) * 1024 * 1024)
+            )
+        # Tabelas alteradas na transação aberta pela thread atual
+        self._transacao = threading.local()
+        # Vazão da última carga em lote de cada entidade (ver obter_metricas_lote)
+        self._metricas_lote: Dict[str, Dict[str, float]] = {}
+        # Fila de escrita (FilaEscrita), quando a subclasse a ativa
+        self._fila = None
+
+    def fechar(self):
+        """Grava as escritas enfileiradas e fecha as conexões mantidas pelo pool"""
+        if self._fila is not None:
+            self._fila.fechar()
+            self._fila = None
+        self._executor.shutdown(wait=True)
+        self._pool.fechar()
+
+    @contextmanager
+    def _escrita(self, *tabelas: str):
+        """Transação de escrita que invalida o cache das tabelas alteradas.
+
+        Em blocos aninhados as tabelas são acumuladas e as gerações só são
+        incrementadas após o COMMIT da transação externa, para que nenhuma
+        leitura guarde dados já substituídos. Escritas feitas fora do
+        gerenciador não são vistas pelo cache.
+        """
+        with self._pool.escritor() as conn:
+            externa = not self._pool.em_transacao(conn)
+            if externa:
+                self._transacao.tabelas = set()
+            self._transacao.tabelas.update(tabelas)
+            try:
+                with self._pool.escrita() as conn:
+                    yield conn
+            except BaseException:
+                if externa:
+                    self._transacao.tabelas = set()
+                raise
+
+            if externa:
+                alteradas, self._transacao.tabelas = self._transacao.tabelas, set()
+                if self._cache is not None:
+                    self._cache.invalidar(*alteradas)
+
+    def obter_metricas_escrita(self) -> Dict[str, Any]:
+        """Retorna as métricas da fila de escrita ({} se desativada)"""
+        return self._fila.metricas() if self._fila is not None else {}
+
+    def obter_metricas_replica(self) -> Dict[str, Any]:
+        """Retorna as métricas da réplica de leitura em memória ({} se desativada)"""
+        replica = getattr(self._pool, 'replica', None)
+        return replica.metricas() if replica is not None else {}
+
+    def estatisticas_cache(self) -> Dict[str, Any]:
+        """Retorna acertos, falhas e ocupação do cache de consultas"""
+        if self._cache is None:
+            return {'habilitado': False}
+        return {'habilitado': True, **self._cache.estatisticas()}
+
+    def limpar_cache(self):
+        """Descarta todos os resultados guardados no cache"""
+        if self._cache is not None:
+            self._cache.limpar()
+
+    # ==================== PAGINAÇÃO ====================
+
+    def _paginar(self, conn, query: str, condicoes: List[str], params: List[Any],
+                 coluna: str, tamanho_pagina: int, cursor: Optional[Tuple],
+                 fabrica: Callable = None) -> Tuple[list, Dict]:
+        """Executa uma consulta paginada por keyset sobre (coluna, id) decrescente.
+
+        O cursor é uma tupla ('apos', valor, id) para avançar ou ('antes',
+        valor, id) para voltar; None indica a primeira página. Retorna as
+        linhas da página e os cursores 'proximo'/'anterior' (None quando não
+        há mais páginas naquela direção). fabrica, se informada, é a
+        row_factory do cursor (registros de models); o resultado precisa
+        expor a coluna e o id por chave.
+        """
+        direcao = cursor[0] if cursor else 'apos'
+        condicoes = list(condicoes)
+        params = list(params)
+        marcador = self.MARCADOR
+
+        if cursor:
+            operador = '<' if direcao == 'apos' else '>'
+            condicoes.append(f"({coluna}, id) {operador} ({marcador}, {marcador})")
+            params.extend([cursor[1], cursor[2]])
+
+        ordem = 'DESC' if direcao == 'apos' else 'ASC'
+        where = ' AND '.join(condicoes) if condicoes else '1=1'
+        query += f" WHERE {where} ORDER BY {coluna} {ordem}, id {ordem} LIMIT {marcador}"
+        params.append(int(tamanho_pagina) + 1)
+
+        if fabrica is None:
+            rows = conn.execute(query, params).fetchall()
+        else:
+            cursor_db = conn.cursor()
+            cursor_db.row_factory = fabrica
+            rows = cursor_db.execute(query, params).fetchall()
+        ha_mais = len(rows) > tamanho_pagina
+        rows = rows[:tamanho_pagina]
+
+        if direcao == 'antes':
+            rows.reverse()
+            tem_anterior, tem_proximo = ha_mais, True
+        else:
+            tem_anterior, tem_proximo = cursor is not None, ha_mais
+
+        cursores = {'proximo': None, 'anterior': None}
+        if rows:
+            if tem_proximo:
+                cursores['proximo'] = ('apos', rows[-1][coluna], rows[-1]['id'])
+            if tem_anterior:
+                cursores['anterior'] = ('antes', rows[0][coluna], rows[0]['id'])
+
+        return rows, cursores
+
+    def pre_carregar(self, metodo: str, *args, **kwargs) -> Future:
+        """Executa um método de leitura em segundo plano e retorna o Future"""
+        return self._executor.submit(getattr(self, metodo), *args, **kwargs)
+
+    # ==================== CONSULTAS EM PARALELO ====================
+
+    def submeter_consultas(self, consultas: Dict[str, Union[str, Tuple[str, Dict]]]) -> Dict[str, Future]:
+        """Submete leituras independentes ao executor e retorna os Futures.
+
+        consultas mapeia um nome para o método de leitura ('obter_estatisticas')
+        ou para (método, kwargs). Cada consulta roda em uma thread do pool,
+        com conexão de leitura própria, então a latência total fica próxima
+        da consulta mais lenta. Use apenas métodos de leitura.
+        """
+        futuros = {}
+        for nome, consulta in consultas.items():
+            metodo, kwargs = (consulta, {}) if isinstance(consulta, str) else consulta
+            futuros[nome] = self.pre_carregar(metodo, **kwargs)
+        return futuros
+
+    def consultar_em_paralelo(self, consultas: Dict[str, Union[str, Tuple[str, Dict]]],
+                              timeout: float = None) -> Dict[str, Any]:
+        """Executa as consultas em paralelo e aguarda todos os resultados.
+
+        Uma exceção em qualquer consulta é propagada ao chamador.
+        """
+        futuros = self.submeter_consultas(consultas)
+        return {nome: futuro.result(timeout=timeout) for nome, futuro in futuros.items()}
+
+    async def consultar_async(self, consultas: Dict[str, Union[str, Tuple[str, Dict]]]) -> Dict[str, Any]:
+        """Versão awaitable de consultar_em_paralelo (asyncio.gather dos Futures)"""
+        futuros = self.submeter_consultas(consultas)
+        resultados = await asyncio.gather(*(asyncio.wrap_future(futuro) for futuro in futuros.values()))
+        return dict(zip(futuros, resultados))
+
+    # ==================== CARGA EM LOTE ====================
+
+    @staticmethod
+    def _validar_registro(registro: Dict, obrigatorios: Tuple[str, ...],
+                          permitidos: Tuple[str, ...]) -> Dict:
+        """Confere campos obrigatórios e desconhecidos de um registro de lote"""
+        if not isinstance(registro, dict):
+            raise ValueError(f"registro deve ser um dict, recebido {type(registro).__name__}")
+
+        desconhecidos = set(registro) - set(permitidos)
+        if desconhecidos:
+            raise ValueError(f"campos desconhecidos: {', '.join(sorted(desconhecidos))}")
+
+        for campo in obrigatorios:
+            valor = registro.get(campo)
+            if valor is None or (isinstance(valor, str) and not valor.strip()):
+                raise ValueError(f"campo obrigatório ausente: {campo}")
+
+        return registro
+
+    def _inserir_em_lotes(self, tabela: str, registros: Iterable[Dict], tamanho_lote: int,
+                          preparar: Callable[[Dict], Any],
+                          inserir: Callable[[Any, List[Any]], List[int]]) -> List[int]:
+        """Consome os registros em blocos, cada um inserido em uma transação.
+
+        preparar valida e converte um registro (ValueError se inválido);
+        inserir grava o bloco e retorna os ids. Um registro inválido
+        interrompe a carga antes da transação do seu bloco, mantendo os
+        blocos anteriores já confirmados.
+        """
+        if tamanho_lote < 1:
+            raise ValueError("tamanho_lote deve ser positivo")
+
+        ids = []
+        inicio = time.perf_counter()
+        iterador = iter(registros)
+
+        while True:
+            bloco = list(islice(iterador, tamanho_lote))
+            if not bloco:
+                break
+
+            linhas = []
+            for posicao, registro in enumerate(bloco, start=len(ids)):
+                try:
+                    linhas.append(preparar(registro))
+                except ValueError as erro:
+                    raise ValueError(f"Registro {posicao}: {erro}") from erro
+
+            with self._escrita(tabela) as conn:
+                ids.extend(inserir(conn, linhas))
+
+        segundos = time.perf_counter() - inicio
+        self._metricas_lote[tabela] = {
+            'linhas': len(ids),
+            'segundos': segundos,
+            'linhas_por_segundo': len(ids) / segundos if segundos > 0 else 0.0
+        }
+        return ids
+
+    def obter_metricas_lote(self) -> Dict[str, Dict[str, float]]:
+        """Retorna linhas, duração e linhas/segundo da última carga de cada tabela"""
+        return {tabela: dict(metricas) for tabela, metricas in self._metricas_lote.items()}
+
+    # ==================== AUXILIARES ====================
+
+    @staticmethod
+    def _normalizar_tags(tags: List[str]) -> List[str]:
+        """Remove espaços, vazias e repetidas, mantendo a ordem"""
+        normalizadas = []
+        for tag in tags or []:
+            tag = str(tag).strip()
+            if tag and tag not in normalizadas:
+                normalizadas.append(tag)
+        return normalizadas
+
+    @classmethod
+    def _filtros_ocorrencias(cls, status: str, severidade: str, tipo: str) -> Tuple[List[str], List[Any]]:
+        """Monta as condições WHERE comuns às listagens de ocorrências"""
+        condicoes = []
+        params = []
+
+        if status and status != "Todos":
+            condicoes.append(f"status = {cls.MARCADOR}")
+            params.append(status.lower())
+
+        if severidade and severidade != "Todas":
+            condicoes.append(f"severidade = {cls.MARCADOR}")
+            params.append(severidade.lower())
+
+        if tipo and tipo != "Todos":
+            condicoes.append(f"tipo = {cls.MARCADOR}")
+            params.append(tipo)
+
+        return condicoes, params
+
+    @classmethod
+    def _campos_ocorrencia(cls, **campos) -> Tuple[List[str], List[Any]]:
+        """Monta o SET de um UPDATE de ocorrências com os campos informados"""
+        updates = []
+        params = []
+
+        for campo, valor in campos.items():
+            if valor is not None:
+                updates.append(f"{campo} = {cls.MARCADOR}")
+                params.append(valor)
+
+        return updates, params
+
+    @staticmethod
+    def _validar_periodo(granularidade: str, dimensao: Union[str, Tuple[str, ...]] = None) -> Tuple[str, ...]:
+        """Confere granularidade e dimensões das contagens por período"""
+        if granularidade not in GRANULARIDADES:
+            raise ValueError(f"Granularidade inválida: {granularidade}")
+
+        dimensoes = (dimensao,) if isinstance(dimensao, str) else tuple(dimensao or ())
+        for nome in dimensoes:
+            if nome not in ('severidade', 'status', 'tipo'):
+                raise ValueError(f"Dimensão inválida: {nome}")
+        return dimensoes
+
+    @staticmethod
+    def _montar_dataframe(blocos: Iterator[List[tuple]], colunas: List[str],
+                          dominios: Dict[str, List[Any]], datas: Tuple[str, ...]):
+        """Converte blocos de tuplas em um DataFrame tipado.
+
+        Cada bloco vira um DataFrame já convertido (categorias com o domínio
+        completo lido antes, datas em datetime64), e só os blocos convertidos
+        são mantidos até o concat final, sem a lista de dicts intermediária.
+        """
+        import pandas as pd
+
+        tipos = {coluna: pd.CategoricalDtype(sorted(valores)) for coluna, valores in dominios.items()}
+
+        partes = []
+        for rows in blocos:
+            bloco = pd.DataFrame.from_records(rows, columns=colunas)
+            for coluna, tipo in tipos.items():
+                bloco[coluna] = bloco[coluna].astype(tipo)
+            for coluna in datas:
+                if coluna in bloco:
+                    bloco[coluna] = pd.to_datetime(bloco[coluna], format='ISO8601', errors='coerce')
+            partes.append(bloco)
+
+        if not partes:
+            vazio = pd.DataFrame({coluna: pd.Series(dtype=tipos.get(coluna, object)) for coluna in colunas})
+            for coluna in datas:
+                if coluna in vazio:
+                    vazio[coluna] = pd.to_datetime(vazio[coluna])
+            return vazio
+
+        return pd.concat(partes, ignore_index=True, copy=False) if len(partes) > 1 else partes[0]
+
+    # ==================== MANUTENÇÃO ====================
+
+    @abstractmethod
+    def init_database(self):
+        """Cria ou atualiza o schema do banco"""
+
+    @abstractmethod
+    def reconstruir_indice_busca(self, tamanho_lote: int = 500, completo: bool = False) -> int:
+        """Atualiza o índice de busca textual das anotações"""
+
+    @abstractmethod
+    def reconstruir_resumos_ocorrencias(self, data_inicio: str = None, data_fim: str = None) -> int:
+        """Recalcula os resumos diários de ocorrências"""
+
+    @abstractmethod
+    def verificar_contadores(self, corrigir: bool = True) -> Dict[str, Tuple[int, int]]:
+        """Compara os contadores mantidos pelo banco com as contagens reais"""
+
+    @abstractmethod
+    def arquivar_ocorrencias(self, dias_retencao: int = None, tamanho_lote: int = None) -> int:
+        """Move para o arquivo as ocorrências fechadas antigas"""
+
+    @abstractmethod
+    def compactar_banco(self, paginas: int = None, completo: bool = False) -> int:
+        """Devolve ao disco o espaço liberado"""
+
+    # ==================== ANOTAÇÕES ====================
+
+    @abstractmethod
+    def criar_anotacao(self, titulo: str, conteudo: str, categoria: str = "Geral",
+                       tags: List[str] = None, prioridade: str = "média") -> int:
+        """Cria uma nova anotação"""
+
+    @abstractmethod
+    def criar_anotacoes_em_lote(self, anotacoes: Iterable[Dict], tamanho_lote: int = 1000) -> List[int]:
+        """Cria várias anotações com uma transação por bloco"""
+
+    @abstractmethod
+    def listar_anotacoes(self, arquivada: bool = False, categoria: str = None,
+                         tag: str = None, prioridade: str = None) -> List[Dict]:
+        """Lista as anotações filtradas"""
+
+    @abstractmethod
+    def listar_anotacoes_pagina(self, arquivada: bool = False, categoria: str = None,
+                                tag: str = None, prioridade: str = None,
+                                tamanho_pagina: int = 20, cursor: Tuple = None) -> Dict:
+        """Retorna uma página de anotações"""
+
+    @abstractmethod
+    def listar_resumos_anotacoes_pagina(self, arquivada: bool = False, categoria: str = None,
+                                        tag: str = None, prioridade: str = None,
+                                        tamanho_pagina: int = 20, cursor: Tuple = None) -> Dict:
+        """Retorna uma página de anotações com prévia do conteúdo (cards)"""
+
+    @abstractmethod
+    def listar_ids_anotacoes(self, arquivada: bool = False, categoria: str = None,
+                             tag: str = None, prioridade: str = None) -> List[int]:
+        """Retorna apenas os ids das anotações filtradas"""
+
+    @abstractmethod
+    def buscar_anotacao(self, anotacao_id: int) -> Optional[Dict]:
+        """Busca uma anotação específica"""
+
+    @abstractmethod
+    def atualizar_anotacao(self, anotacao_id: int, titulo: str = None,
+                           conteudo: str = None, categoria: str = None,
+                           tags: List[str] = None, prioridade: str = None):
+        """Atualiza uma anotação existente"""
+
+    @abstractmethod
+    def deletar_anotacao(self, anotacao_id: int):
+        """Deleta uma anotação"""
+
+    @abstractmethod
+    def arquivar_anotacao(self, anotacao_id: int, arquivar: bool = True):
+        """Arquiva ou desarquiva uma anotação"""
+
+    @abstractmethod
+    def arquivar_anotacoes_em_lote(self, ids: Iterable[int], arquivar: bool = True) -> int:
+        """Arquiva ou desarquiva várias anotações"""
+
+    @abstractmethod
+    def deletar_anotacoes_em_lote(self, ids: Iterable[int]) -> int:
+        """Deleta várias anotações"""
+
+    @abstractmethod
+    def adicionar_tags_em_lote(self, ids: Iterable[int], tags: List[str]) -> int:
+        """Acrescenta tags a várias anotações"""
+
+    @abstractmethod
+    def remover_tags_em_lote(self, ids: Iterable[int], tags: List[str]) -> int:
+        """Remove tags de várias anotações"""
+
+    @abstractmethod
+    def buscar_anotacoes(self, termo: str, limite: int = 50) -> List[Dict]:
+        """Busca anotações por termo, ordenadas por relevância"""
+
+    @abstractmethod
+    def obter_nuvem_tags(self, limite: int = None) -> List[Dict]:
+        """Retorna as tags em uso com o número de anotações de cada uma"""
+
+    @abstractmethod
+    def obter_categorias(self) -> List[str]:
+        """Retorna lista de categorias únicas"""
+
+    @abstractmethod
+    def iterar_anotacoes(self, arquivada: bool = False, categoria: str = None, tag: str = None,
+                         prioridade: str = None, tamanho_bloco: int = 1000) -> Iterator[Dict]:
+        """Gera as anotações filtradas sem carregar o resultado inteiro"""
+
+    # ==================== OCORRÊNCIAS ====================
+
+    @abstractmethod
+    def criar_ocorrencia(self, tipo: str, descricao: str, severidade: str = "média",
+                         data_ocorrencia: str = None, responsavel: str = None,
+                         solucao: str = None) -> int:
+        """Cria uma nova ocorrência"""
+
+    @abstractmethod
+    def criar_ocorrencias_em_lote(self, ocorrencias: Iterable[Dict], tamanho_lote: int = 1000) -> List[int]:
+        """Cria várias ocorrências com uma transação por bloco"""
+
+    @abstractmethod
+    def listar_ocorrencias(self, status: str = None, severidade: str = None,
+                           tipo: str = None, incluir_arquivo: bool = False) -> List[Dict]:
+        """Lista as ocorrências filtradas"""
+
+    @abstractmethod
+    def listar_ocorrencias_pagina(self, status: str = None, severidade: str = None,
+                                  tipo: str = None, tamanho_pagina: int = 20,
+                                  cursor: Tuple = None, incluir_arquivo: bool = False) -> Dict:
+        """Retorna uma página de ocorrências"""
+
+    @abstractmethod
+    def listar_ids_ocorrencias(self, status: str = None, severidade: str = None,
+                               tipo: str = None) -> List[int]:
+        """Retorna apenas os ids das ocorrências filtradas"""
+
+    @abstractmethod
+    def buscar_ocorrencia(self, ocorrencia_id: int, incluir_arquivo: bool = False) -> Optional[Dict]:
+        """Busca uma ocorrência específica"""
+
+    @abstractmethod
+    def atualizar_ocorrencia(self, ocorrencia_id: int, tipo: str = None,
+                             descricao: str = None, severidade: str = None,
+                             status: str = None, responsavel: str = None,
+                             solucao: str = None) -> int:
+        """Atualiza uma ocorrência existente; retorna o número de linhas alteradas (0 ou 1)"""
+
+    @abstractmethod
+    def atualizar_ocorrencias_em_lote(self, ids: Iterable[int], tipo: str = None,
+                                      descricao: str = None, severidade: str = None,
+                                      status: str = None, responsavel: str = None,
+                                      solucao: str = None) -> int:
+        """Aplica os mesmos campos a várias ocorrências"""
+
+    @escrita_enfileirada
+    def atualizar_ocorrencias(self, alteracoes: Dict[int, Dict[str, Any]]) -> int:
+        """Aplica alterações diferentes a várias ocorrências em uma única transação.
+
+        alteracoes é {id: {campo: valor}} com os campos de atualizar_ocorrencia
+        (edição em tabela); se alguma falhar, nenhuma é gravada. Retorna o
+        número de ocorrências efetivamente atualizadas: ids excluídos ou
+        arquivados nesse meio-tempo não entram na contagem.
+        """
+        for ocorrencia_id, campos in alteracoes.items():
+            desconhecidos = set(campos) - set(CAMPOS_EDICAO_OCORRENCIA)
+            if desconhecidos:
+                raise ValueError(f"Ocorrência {ocorrencia_id}: campos desconhecidos: "
+                                 f"{', '.join(sorted(desconhecidos))}")
+
+        with self._escrita('ocorrencias'):
+            return sum(self.atualizar_ocorrencia(ocorrencia_id, **campos)
+                       for ocorrencia_id, campos in alteracoes.items())
+
+    @abstractmethod
+    def deletar_ocorrencias_em_lote(self, ids: Iterable[int]) -> int:
+        """Deleta várias ocorrências"""
+
+    @abstractmethod
+    def deletar_ocorrencia(self, ocorrencia_id: int):
+        """Deleta uma ocorrência"""
+
+    @abstractmethod
+    def obter_ocorrencias_por_status(self) -> Dict[str, int]:
+        """Retorna contagem de ocorrências por status"""
+
+    @abstractmethod
+    def obter_ocorrencias_por_severidade(self) -> Dict[str, int]:
+        """Retorna contagem de ocorrências por severidade"""
+
+    @abstractmethod
+    def contar_ocorrencias_por_periodo(self, granularidade: str = 'dia',
+                                       dimensao: Union[str, Tuple[str, ...]] = None,
+                                       data_inicio: str = None, data_fim: str = None) -> List[Dict]:
+        """Conta ocorrências por dia, semana ou mês"""
+
+    @abstractmethod
+    def obter_fluxo_ocorrencias(self, granularidade: str = 'dia', data_inicio: str = None,
+                                data_fim: str = None) -> List[Dict]:
+        """Retorna ocorrências abertas e fechadas por período"""
+
+    @abstractmethod
+    def obter_ocorrencias_criticas_abertas(self) -> List[Dict]:
+        """Retorna ocorrências críticas que ainda estão abertas"""
+
+    @abstractmethod
+    def obter_dataframe_ocorrencias(self, colunas: List[str] = None, status: str = None,
+                                    severidade: str = None, tipo: str = None,
+                                    data_inicio: str = None, data_fim: str = None,
+                                    tamanho_bloco: int = 50000):
+        """Retorna as ocorrências filtradas como DataFrame tipado"""
+
+    @abstractmethod
+    def iterar_ocorrencias(self, status: str = None, severidade: str = None, tipo: str = None,
+                           tamanho_bloco: int = 1000, incluir_arquivo: bool = False) -> Iterator[Dict]:
+        """Gera as ocorrências filtradas sem carregar o resultado inteiro"""
+
+    # ==================== ATAS DE REUNIÃO ====================
+
+    @abstractmethod
+    def criar_ata(self, titulo: str, data_reuniao: str, horario_inicio: str = None,
+                  horario_fim: str = None, participantes: List[str] = None,
+                  pauta: str = None, discussoes: str = None, decisoes: str = None,
+                  acoes: List[Dict] = None, proxima_reuniao: str = None) -> int:
+        """Cria uma nova ata de reunião"""
+
+    @abstractmethod
+    def criar_atas_em_lote(self, atas: Iterable[Dict], tamanho_lote: int = 500) -> List[int]:
+        """Cria várias atas (e suas ações) com uma transação por bloco"""
+
+    @abstractmethod
+    def listar_atas(self, limite: int = None) -> List[Dict]:
+        """Lista as atas de reunião"""
+
+    @abstractmethod
+    def buscar_ata(self, ata_id: int) -> Optional[Dict]:
+        """Busca uma ata específica"""
+
+    @abstractmethod
+    def atualizar_ata(self, ata_id: int, titulo: str = None, data_reuniao: str = None,
+                      horario_inicio: str = None, horario_fim: str = None,
+                      participantes: List[str] = None, pauta: str = None,
+                      discussoes: str = None, decisoes: str = None,
+                      acoes: List[Dict] = None, proxima_reuniao: str = None):
+        """Atualiza uma ata existente"""
+
+    @abstractmethod
+    def deletar_ata(self, ata_id: int):
+        """Deleta uma ata de reunião e suas ações"""
+
+    @abstractmethod
+    def buscar_atas_por_periodo(self, data_inicio: str, data_fim: str) -> List[Dict]:
+        """Busca atas em um período específico"""
+
+    @abstractmethod
+    def listar_atas_pagina(self, data_inicio: str = None, data_fim: str = None,
+                           tamanho_pagina: int = 20, cursor: Tuple = None) -> Dict:
+        """Retorna uma página de atas"""
+
+    @abstractmethod
+    def listar_resumos_atas(self, data_inicio: str = None, data_fim: str = None,
+                            limite: int = None) -> List[Dict]:
+        """Lista atas sem os textos longos, com contagens de participantes e ações (cards)"""
+
+    @abstractmethod
+    def listar_resumos_atas_pagina(self, data_inicio: str = None, data_fim: str = None,
+                                   tamanho_pagina: int = 20, cursor: Tuple = None) -> Dict:
+        """Retorna uma página de atas no formato de listar_resumos_atas"""
+
+    @abstractmethod
+    def criar_acao(self, ata_id: int, descricao: str, responsavel: str = None,
+                   prazo: str = None, concluida: bool = False) -> int:
+        """Adiciona uma ação ao plano de ação de uma ata"""
+
+    @abstractmethod
+    def listar_acoes(self, ata_id: int) -> List[Dict]:
+        """Lista as ações de uma ata"""
+
+    @abstractmethod
+    def atualizar_acao(self, acao_id: int, descricao: str = None, responsavel: str = None,
+                       prazo: str = None, concluida: bool = None):
+        """Atualiza uma única ação"""
+
+    @abstractmethod
+    def deletar_acao(self, acao_id: int):
+        """Remove uma ação"""
+
+    @abstractmethod
+    def concluir_acoes_em_lote(self, ids: Iterable[int], concluida: bool = True) -> int:
+        """Marca (ou desmarca) várias ações como concluídas"""
+
+    @abstractmethod
+    def obter_acoes_pendentes(self, responsavel: str = None) -> List[Dict]:
+        """Retorna todas as ações pendentes de todas as atas, por prazo"""
+
+    @abstractmethod
+    def obter_dataframe_atas(self, colunas: List[str] = None, data_inicio: str = None,
+                             data_fim: str = None, tamanho_bloco: int = 50000):
+        """Retorna as atas como DataFrame tipado"""
+
+    @abstractmethod
+    def iterar_atas(self, data_inicio: str = None, data_fim: str = None,
+                    tamanho_bloco: int = 500) -> Iterator[Dict]:
+        """Gera as atas do período com suas ações"""
+
+    # ==================== ESTATÍSTICAS ====================
+
+    @abstractmethod
+    def obter_estatisticas(self) -> Dict[str, Any]:
+        """Retorna estatísticas gerais do sistema"""
@@ -0,0 +1,199 @@
+"""
+Cache de resultados de consultas
+Compartilhado entre sessões e invalidado por contadores de geração por tabela
+"""
+import copy
+import functools
+import inspect
+import sys
+import threading
+from collections import OrderedDict, defaultdict
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, Tuple
+
+
+def _copia(valor: Any) -> Any:
+    """Cópia rasa da estrutura do resultado para entregar ao chamador.
+
+    Listas, tuplas e dicts são recriados e cada Registro é copiado um nível,
+    então o chamador pode trocar itens e campos sem alterar a entrada do
+    cache. Os valores dos campos de um Registro (inclusive as listas JSON
+    já decodificadas) são compartilhados e não devem ser alterados no lugar.
+    """
+    if isinstance(valor, list):
+        return [_copia(item) for item in valor]
+    if isinstance(valor, dict):
+        return {chave: _copia(item) for chave, item in valor.items()}
+    if isinstance(valor, tuple):
+        return tuple(_copia(item) for item in valor)
+    if isinstance(valor, MutableMapping):
+        return copy.copy(valor)
+    return valor
+
+
+def _tamanho(valor: Any) -> int:
+    """Estimativa (em bytes) da memória ocupada por um resultado"""
+    tamanho = sys.getsizeof(valor)
+    if isinstance(valor, dict):
+        tamanho += sum(_tamanho(k) + _tamanho(v) for k, v in valor.items())
+    elif isinstance(valor, (list, tuple)):
+        tamanho += sum(_tamanho(item) for item in valor)
+    return tamanho
+
+
+class CacheConsultas:
+    """Cache LRU de resultados de leitura limitado por memória.
+
+    Cada entrada guarda a geração das tabelas de que depende no momento em
+    que a consulta começou. Toda escrita incrementa a geração das tabelas
+    alteradas (após o COMMIT), de modo que uma entrada só é servida enquanto
+    nenhuma dessas tabelas mudou.
+    """
+
+    def __init__(self, memoria_maxima: int = 64 * 1024 * 1024):
+        """Cria o cache com o limite de memória informado (bytes)"""
+        self.memoria_maxima = int(memoria_maxima)
+        self._entradas: "OrderedDict[Hashable, Tuple[Tuple[int, ...], Any, int]]" = OrderedDict()
+        self._geracoes: Dict[str, int] = defaultdict(int)
+        self._memoria = 0
+        self._lock = threading.Lock()
+
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+        self.remocoes_lru = 0
+
+    def geracoes(self, tabelas: Iterable[str]) -> Tuple[int, ...]:
+        """Retorna a geração atual de cada tabela"""
+        with self._lock:
+            return tuple(self._geracoes[tabela] for tabela in tabelas)
+
+    def obter(self, chave: Hashable, tabelas: Iterable[str]) -> Tuple[bool, Any]:
+        """Retorna (True, valor) se houver entrada válida para a chave"""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self.falhas += 1
+                return False, None
+
+            geracoes, valor, tamanho = entrada
+            if geracoes != tuple(self._geracoes[tabela] for tabela in tabelas):
+                del self._entradas[chave]
+                self._memoria -= tamanho
+                self.descartes += 1
+                self.falhas += 1
+                return False, None
+
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return True, valor
+
+    def guardar(self, chave: Hashable, geracoes: Tuple[int, ...], valor: Any):
+        """Guarda um resultado, removendo os menos usados se passar do limite"""
+        tamanho = _tamanho(valor)
+        if tamanho > self.memoria_maxima:
+            return
+
+        with self._lock:
+            anterior = self._entradas.pop(chave, None)
+            if anterior is not None:
+                self._memoria -= anterior[2]
+
+            self._entradas[chave] = (geracoes, valor, tamanho)
+            self._memoria += tamanho
+
+            while self._memoria > self.memoria_maxima:
+                _, (_, _, removido) = self._entradas.popitem(last=False)
+                self._memoria -= removido
+                self.remocoes_lru += 1
+
+    def invalidar(self, *tabelas: str):
+        """Incrementa a geração das tabelas alteradas"""
+        with self._lock:
+            for tabela in tabelas:
+                self._geracoes[tabela] += 1
+
+    def limpar(self):
+        """Remove todas as entradas e invalida todas as gerações"""
+        with self._lock:
+            self._entradas.clear()
+            self._memoria = 0
+            for tabela in self._geracoes:
+                self._geracoes[tabela] += 1
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Retorna contadores de acertos, falhas e ocupação do cache"""
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+                'descartes': self.descartes,
+                'remocoes_lru': self.remocoes_lru,
+                'entradas': len(self._entradas),
+                'memoria_bytes': self._memoria,
+                'memoria_maxima': self.memoria_maxima
+            }
+
+
+_caches: Dict[str, CacheConsultas] = {}
+_caches_lock = threading.Lock()
+
+
+def cache_do_banco(db_path: str, memoria_maxima: int) -> CacheConsultas:
+    """Retorna o cache compartilhado pelas instâncias que usam o mesmo banco.
+
+    As páginas criam cada uma o seu gerenciador; compartilhar o cache
+    (e as gerações) por arquivo garante que a escrita feita em uma página
+    invalide os resultados guardados pelas outras. URLs de servidor
+    (postgresql://...) são usadas como chave sem alteração.
+    """
+    if db_path == ':memory:':
+        return CacheConsultas(memoria_maxima)
+
+    chave = db_path if '://' in db_path else str(Path(db_path).resolve())
+    with _caches_lock:
+        if chave not in _caches:
+            _caches[chave] = CacheConsultas(memoria_maxima)
+        return _caches[chave]
+
+
+def cacheado(*tabelas: str):
+    """Decorador para métodos de leitura do DatabaseManager.
+
+    A chave é o nome do método mais os argumentos normalizados pela
+    assinatura (posicionais e nomeados geram a mesma chave). O chamador
+    recebe uma cópia rasa da estrutura (ver _copia): pode alterar listas e
+    registros, mas não os valores dos campos no lugar.
+    """
+    def decorador(metodo):
+        assinatura = inspect.signature(metodo)
+
+        @functools.wraps(metodo)
+        def wrapper(self, *args, **kwargs):
+            cache = self._cache
+            if cache is None:
+                return metodo(self, *args, **kwargs)
+
+            argumentos = assinatura.bind(self, *args, **kwargs)
+            argumentos.apply_defaults()
+            chave = (metodo.__name__,) + tuple(argumentos.arguments.items())[1:]
+
+            try:
+                encontrado, valor = cache.obter(chave, tabelas)
+            except TypeError:
+                # Argumentos não hasheáveis: consulta sem cache
+                return metodo(self, *args, **kwargs)
+
+            if not encontrado:
+                geracoes = cache.geracoes(tabelas)
+                valor = metodo(self, *args, **kwargs)
+                cache.guardar(chave, geracoes, valor)
+
+            return _copia(valor)
+
+        return wrapper
+
+    return decorador
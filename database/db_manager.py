@@ -1,109 +1,382 @@
 """
 Gerenciador do banco de dados SQLite
 """
-import sqlite3
 import json
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import re
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator, Callable, Union
 from pathlib import Path
-from .models import ALL_SCHEMAS
+from .backend import BackendArmazenamento, TABELAS_CACHE, CAMPOS_ANOTACAO, CAMPOS_OCORRENCIA, CAMPOS_ATA
+from .cache import cacheado
+from .fila_escrita import FilaEscrita, escrita_enfileirada
+from .migrations import aplicar_migracoes, recalcular_resumos_ocorrencias
+from .models import (CONSULTA_CONTADORES, EPOCH, COLUNAS_OCORRENCIAS, SCHEMA_OCORRENCIAS_ARQUIVO,
+                     ORIGEM_OCORRENCIAS_COM_ARQUIVO, COLUNAS_ANOTACOES, COLUNAS_ATAS, ACOES_DA_ATA_JSON,
+                     COLUNAS_RESUMO_ANOTACOES, COLUNAS_RESUMO_ATAS, Anotacao, Ocorrencia, Ata,
+                     ResumoAnotacao, ResumoAta)
+from .pool import ConnectionPool
 
+# Colunas de anotacoes qualificadas pelo apelido usado na busca textual
+_COLUNAS_ANOTACOES_A = ', '.join(f"a.{coluna.strip()}" for coluna in COLUNAS_ANOTACOES.split(','))
 
-class DatabaseManager:
-    def __init__(self, db_path: str = "dados_gestao.db"):
+# Atas com as ações já agregadas em JSON (decodificadas sob demanda pelo registro)
+_COLUNAS_ATAS_COM_ACOES = f"{COLUNAS_ATAS}, {ACOES_DA_ATA_JSON.format('atas_reuniao')} AS acoes"
+
+try:
+    from config import BANCO_DADOS
+except ImportError:
+    BANCO_DADOS = {
+        'caminho': 'dados_gestao.db',
+        'busy_timeout': 5000,
+        'cache_size': -20000,
+        'mmap_size': 268435456,
+        'synchronous': 'NORMAL',
+        'leitores_paralelos': 4,
+        'max_leitores': 8,
+        'espera_leitor': 30
+    }
+
+try:
+    from config import ARQUIVAMENTO
+except ImportError:
+    ARQUIVAMENTO = {'caminho': None, 'dias_retencao': 180, 'tamanho_lote': 500}
+
+try:
+    from config import FILA_ESCRITA
+except ImportError:
+    FILA_ESCRITA = {'habilitada': True, 'max_lote': 50, 'tentativas_ocupado': 5, 'espera_ocupado_ms': 50}
+
+try:
+    from config import REPLICA_LEITURA
+except ImportError:
+    REPLICA_LEITURA = {'habilitada': False}
+
+# Expressão de agrupamento por granularidade (contar_ocorrencias_por_periodo e
+# obter_fluxo_ocorrencias)
+_PERIODOS_OCORRENCIAS = {
+    'dia': "date({coluna})",
+    'semana': "date({coluna}, 'weekday 0', '-6 days')",
+    'mes': "strftime('%Y-%m-01', {coluna})"
+}
+
+# Colunas disponíveis para os DataFrames de análise: nome -> expressão SQL
+_COLUNAS_DF_OCORRENCIAS = {
+    'id': 'id', 'tipo': 'tipo', 'descricao': 'descricao', 'severidade': 'severidade',
+    'status': 'status', 'data_ocorrencia': 'data_ocorrencia', 'data_registro': 'data_registro',
+    'data_fechamento': 'data_fechamento', 'responsavel': 'responsavel', 'solucao': 'solucao'
+}
+_COLUNAS_DF_ATAS = {
+    'id': 'a.id', 'titulo': 'a.titulo', 'data_reuniao': 'a.data_reuniao',
+    'horario_inicio': 'a.horario_inicio', 'horario_fim': 'a.horario_fim',
+    'participantes': "json_array_length(COALESCE(a.participantes, '[]'))",
+    'acoes': '(SELECT COUNT(*) FROM acoes c WHERE c.ata_id = a.id)',
+    'acoes_pendentes': '(SELECT COUNT(*) FROM acoes c WHERE c.ata_id = a.id AND c.concluida = 0)',
+    'proxima_reuniao': 'a.proxima_reuniao', 'data_criacao': 'a.data_criacao'
+}
+
+# Limites de período comparados com as colunas *_epoch: início do dia de
+# data_inicio e início do dia seguinte a data_fim (intervalo inclusivo)
+_EPOCH_DESDE = EPOCH.format("?, 'start of day'")
+_EPOCH_ATE = EPOCH.format("?, 'start of day', '+1 day'")
+
+
+def _montar_consulta_fts(termo: str) -> str:
+    """Converte o texto digitado em uma expressão MATCH segura para o FTS5.
+
+    Frases entre aspas viram consultas de frase, palavras terminadas em * são
+    prefixos e a última palavra digitada também é tratada como prefixo.
+    """
+    partes = []
+    for frase, palavra in re.findall(r'"([^"]*)"|(\S+)', termo):
+        if frase:
+            tokens = re.findall(r'\w+', frase)
+            if tokens:
+                partes.append('"' + ' '.join(tokens) + '"')
+        else:
+            sufixo = '*' if palavra.endswith('*') else ''
+            for token in re.findall(r'\w+', palavra):
+                partes.append(f'"{token}"{sufixo}')
+
+    if partes and not termo.endswith((' ', '"')) and not partes[-1].endswith('*'):
+        partes[-1] += '*'
+
+    return ' '.join(partes)
+
+
+class DatabaseManager(BackendArmazenamento):
+    """Backend SQLite: pool WAL, contadores e resumos mantidos por triggers"""
+
+    def __init__(self, db_path: str = None):
         """Inicializa o gerenciador do banco de dados"""
-        self.db_path = db_path
+        self.db_path = db_path or BANCO_DADOS['caminho']
+        # O caminho configurado vale para o banco padrão; bancos informados
+        # explicitamente têm o arquivo ao lado ('<banco>_arquivo.db')
+        self.arquivo_path = self._caminho_arquivo(
+            self.db_path, ARQUIVAMENTO.get('caminho') if db_path is None else None
+        )
+        self._pool = ConnectionPool(
+            self.db_path,
+            busy_timeout=BANCO_DADOS.get('busy_timeout', 5000),
+            cache_size=BANCO_DADOS.get('cache_size', -20000),
+            mmap_size=BANCO_DADOS.get('mmap_size', 268435456),
+            synchronous=BANCO_DADOS.get('synchronous', 'NORMAL'),
+            anexos={'arquivo': self.arquivo_path},
+            max_leitores=BANCO_DADOS.get('max_leitores', 8),
+            espera_leitor=BANCO_DADOS.get('espera_leitor', 30)
+        )
+        super().__init__(self.db_path, BANCO_DADOS.get('leitores_paralelos', 4))
         self.init_database()
-    
+
+        # A réplica é copiada depois das migrações; bancos em memória não têm arquivo a copiar
+        if REPLICA_LEITURA.get('habilitada') and self.db_path != ':memory:':
+            self._pool.ativar_replica(
+                intervalo_verificacao=REPLICA_LEITURA.get('intervalo_verificacao', 1.0),
+                idade_minima=REPLICA_LEITURA.get('idade_minima', 0.5),
+                idade_maxima=REPLICA_LEITURA.get('idade_maxima', 5.0)
+            )
+
+        if FILA_ESCRITA.get('habilitada', True):
+            self._fila = FilaEscrita(
+                self._escrita,
+                max_lote=FILA_ESCRITA.get('max_lote', 50),
+                tentativas_ocupado=FILA_ESCRITA.get('tentativas_ocupado', 5),
+                espera_ocupado=FILA_ESCRITA.get('espera_ocupado_ms', 50) / 1000
+            )
+
+    @staticmethod
+    def _caminho_arquivo(db_path: str, caminho: str = None) -> str:
+        """Caminho do banco de arquivo: o configurado ou '<banco>_arquivo.db' ao lado do principal"""
+        if caminho:
+            return caminho
+        if db_path == ':memory:':
+            return ':memory:'
+        banco = Path(db_path)
+        return str(banco.with_name(f"{banco.stem}_arquivo{banco.suffix or '.db'}"))
+
     def get_connection(self):
-        """Retorna uma conexão com o banco"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Permite acessar colunas por nome
-        return conn
-    
+        """Retorna uma conexão avulsa com o banco (fora do pool)"""
+        return self._pool._abrir_conexao()
+
     def init_database(self):
-        """Cria as tabelas se não existirem"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        for schema in ALL_SCHEMAS:
-            cursor.execute(schema)
-        
-        conn.commit()
-        conn.close()
-    
+        """Aplica as migrações de schema ainda não aplicadas"""
+        with self._pool.escritor() as conn:
+            # O arquivo é um banco à parte, sem user_version próprio
+            for comando in SCHEMA_OCORRENCIAS_ARQUIVO:
+                conn.execute(comando)
+            aplicar_migracoes(conn)
+
+        # Conclui a indexação FTS pendente de bancos já existentes
+        self.reconstruir_indice_busca()
+
+    # ==================== PERÍODOS ====================
+
+    @staticmethod
+    def _filtros_periodo(coluna: str, data_inicio: str, data_fim: str) -> Tuple[List[str], List[Any]]:
+        """Condições de período (dias inclusivos) sobre uma coluna *_epoch indexada"""
+        condicoes, params = [], []
+        if data_inicio:
+            condicoes.append(f"{coluna} >= {_EPOCH_DESDE}")
+            params.append(data_inicio)
+        if data_fim:
+            condicoes.append(f"{coluna} < {_EPOCH_ATE}")
+            params.append(data_fim)
+        return condicoes, params
+
+    # ==================== CARGA EM LOTE ====================
+
+    @staticmethod
+    def _inserir_com_ids(conn, query: str, linhas: List[tuple]) -> List[int]:
+        """executemany que retorna os ids atribuídos às linhas inseridas.
+
+        Com AUTOINCREMENT e um único escritor dentro da transação os ids são
+        consecutivos e terminam em last_insert_rowid().
+        """
+        conn.executemany(query, linhas)
+        ultimo = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        return list(range(ultimo - len(linhas) + 1, ultimo + 1))
+
+    @staticmethod
+    def _ids_json(ids: Iterable[int]) -> str:
+        """Serializa ids para um único parâmetro lido com json_each(?)"""
+        return json.dumps(sorted({int(item) for item in ids}))
+
     # ==================== ANOTAÇÕES ====================
-    
-    def criar_anotacao(self, titulo: str, conteudo: str, categoria: str = "Geral", 
+
+    def _sincronizar_tags(self, conn, anotacao_id: int, tags: List[str]):
+        """Ajusta anotacao_tags para refletir a lista de tags da anotação"""
+        tags_json = json.dumps(tags)
+
+        conn.executemany("INSERT OR IGNORE INTO tags (nome) VALUES (?)", [(tag,) for tag in tags])
+        conn.execute("""
+            DELETE FROM anotacao_tags
+            WHERE anotacao_id = ?
+              AND tag_id NOT IN (SELECT id FROM tags WHERE nome IN (SELECT value FROM json_each(?)))
+        """, (anotacao_id, tags_json))
+        conn.execute("""
+            INSERT OR IGNORE INTO anotacao_tags (anotacao_id, tag_id)
+            SELECT ?, id FROM tags WHERE nome IN (SELECT value FROM json_each(?))
+        """, (anotacao_id, tags_json))
+
+    @escrita_enfileirada
+    def criar_anotacao(self, titulo: str, conteudo: str, categoria: str = "Geral",
                        tags: List[str] = None, prioridade: str = "média") -> int:
         """Cria uma nova anotação"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        tags_json = json.dumps(tags) if tags else json.dumps([])
-        
-        cursor.execute("""
-            INSERT INTO anotacoes (titulo, conteudo, categoria, tags, prioridade)
-            VALUES (?, ?, ?, ?, ?)
-        """, (titulo, conteudo, categoria, tags_json, prioridade))
-        
-        anotacao_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return anotacao_id
-    
-    def listar_anotacoes(self, arquivada: bool = False, categoria: str = None) -> List[Dict]:
-        """Lista todas as anotações"""
-        conn = self.get_connection()
+        tags = self._normalizar_tags(tags)
+
+        with self._escrita('anotacoes') as conn:
+            cursor = conn.execute("""
+                INSERT INTO anotacoes (titulo, conteudo, categoria, tags, prioridade)
+                VALUES (?, ?, ?, ?, ?)
+            """, (titulo, conteudo, categoria, json.dumps(tags), prioridade))
+
+            anotacao_id = cursor.lastrowid
+            if tags:
+                self._sincronizar_tags(conn, anotacao_id, tags)
+
+            return anotacao_id
+
+    @escrita_enfileirada(agrupar=False)
+    def criar_anotacoes_em_lote(self, anotacoes: Iterable[Dict], tamanho_lote: int = 1000) -> List[int]:
+        """Cria várias anotações com uma transação por bloco.
+
+        Cada item é um dict com os parâmetros de criar_anotacao; aceita
+        listas ou geradores. Retorna os ids na ordem de entrada.
+        """
+        def preparar(registro):
+            self._validar_registro(registro, ('titulo',), CAMPOS_ANOTACAO)
+            tags = self._normalizar_tags(registro.get('tags'))
+            return tags, (registro['titulo'], registro.get('conteudo', ''),
+                          registro.get('categoria') or 'Geral', json.dumps(tags),
+                          registro.get('prioridade') or 'média')
+
+        def inserir(conn, linhas):
+            ids = self._inserir_com_ids(conn, """
+                INSERT INTO anotacoes (titulo, conteudo, categoria, tags, prioridade)
+                VALUES (?, ?, ?, ?, ?)
+            """, [valores for _, valores in linhas])
+
+            com_tags = [(anotacao_id, tags) for anotacao_id, (tags, _) in zip(ids, linhas) if tags]
+            if com_tags:
+                nomes = {tag for _, tags in com_tags for tag in tags}
+                conn.executemany("INSERT OR IGNORE INTO tags (nome) VALUES (?)", [(nome,) for nome in nomes])
+                conn.executemany("""
+                    INSERT OR IGNORE INTO anotacao_tags (anotacao_id, tag_id)
+                    SELECT ?, id FROM tags WHERE nome IN (SELECT value FROM json_each(?))
+                """, [(anotacao_id, json.dumps(tags)) for anotacao_id, tags in com_tags])
+
+            return ids
+
+        return self._inserir_em_lotes('anotacoes', anotacoes, tamanho_lote, preparar, inserir)
+
+    @staticmethod
+    def _registros(conn, classe, query: str, params: Iterable[Any] = ()) -> list:
+        """Executa a consulta montando cada linha direto como registro da classe (models)"""
         cursor = conn.cursor()
-        
-        query = "SELECT * FROM anotacoes WHERE arquivada = ?"
+        cursor.row_factory = classe.fabrica
+        return cursor.execute(query, params).fetchall()
+
+    @staticmethod
+    def _filtros_anotacoes(arquivada: bool, categoria: str, tag: str,
+                           prioridade: str) -> Tuple[List[str], List[Any]]:
+        """Monta as condições WHERE comuns às listagens de anotações"""
+        condicoes = ["arquivada = ?"]
         params = [1 if arquivada else 0]
-        
+
         if categoria and categoria != "Todas":
-            query += " AND categoria = ?"
+            condicoes.append("categoria = ?")
             params.append(categoria)
-        
-        query += " ORDER BY data_modificacao DESC"
-        
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
-        
-        anotacoes = []
-        for row in rows:
-            anotacao = dict(row)
-            anotacao['tags'] = json.loads(anotacao['tags']) if anotacao['tags'] else []
-            anotacoes.append(anotacao)
-        
-        return anotacoes
-    
+
+        if tag and tag != "Todas":
+            condicoes.append("""id IN (
+                SELECT at.anotacao_id FROM anotacao_tags at
+                JOIN tags t ON t.id = at.tag_id
+                WHERE t.nome = ?
+            )""")
+            params.append(tag)
+
+        if prioridade and prioridade != "Todas":
+            condicoes.append("prioridade = ?")
+            params.append(prioridade.lower())
+
+        return condicoes, params
+
+    @cacheado('anotacoes')
+    def listar_anotacoes(self, arquivada: bool = False, categoria: str = None,
+                         tag: str = None, prioridade: str = None) -> List[Dict]:
+        """Lista todas as anotações, opcionalmente apenas as que têm uma tag"""
+        condicoes, params = self._filtros_anotacoes(arquivada, categoria, tag, prioridade)
+        query = f"""
+            SELECT {COLUNAS_ANOTACOES} FROM anotacoes WHERE {' AND '.join(condicoes)}
+            ORDER BY data_modificacao_epoch DESC, id DESC
+        """
+
+        with self._pool.leitura() as conn:
+            return self._registros(conn, Anotacao, query, params)
+
+    @cacheado('anotacoes')
+    def listar_anotacoes_pagina(self, arquivada: bool = False, categoria: str = None,
+                                tag: str = None, prioridade: str = None,
+                                tamanho_pagina: int = 20, cursor: Tuple = None) -> Dict:
+        """Retorna uma página de anotações (keyset em data_modificacao_epoch, id).
+
+        Resultado: {'itens': [...], 'proximo': cursor, 'anterior': cursor}.
+        """
+        condicoes, params = self._filtros_anotacoes(arquivada, categoria, tag, prioridade)
+
+        with self._pool.leitura() as conn:
+            rows, cursores = self._paginar(conn, f"SELECT {COLUNAS_ANOTACOES}, data_modificacao_epoch FROM anotacoes",
+                                           condicoes, params, 'data_modificacao_epoch', tamanho_pagina, cursor,
+                                           fabrica=Anotacao.fabrica)
+
+        return {'itens': rows, **cursores}
+
+    @cacheado('anotacoes')
+    def listar_resumos_anotacoes_pagina(self, arquivada: bool = False, categoria: str = None,
+                                        tag: str = None, prioridade: str = None,
+                                        tamanho_pagina: int = 20, cursor: Tuple = None) -> Dict:
+        """Página de anotações para os cards: prévia do conteúdo em vez do texto completo.
+
+        Cada item traz 'previa' (primeiros TAMANHO_PREVIA caracteres) e
+        'previa_cortada'; o conteúdo completo vem de buscar_anotacao.
+        """
+        condicoes, params = self._filtros_anotacoes(arquivada, categoria, tag, prioridade)
+
+        with self._pool.leitura() as conn:
+            rows, cursores = self._paginar(conn, f"SELECT {COLUNAS_RESUMO_ANOTACOES}, data_modificacao_epoch "
+                                                 f"FROM anotacoes",
+                                           condicoes, params, 'data_modificacao_epoch', tamanho_pagina, cursor,
+                                           fabrica=ResumoAnotacao.fabrica)
+
+        return {'itens': rows, **cursores}
+
+    @cacheado('anotacoes')
+    def listar_ids_anotacoes(self, arquivada: bool = False, categoria: str = None,
+                             tag: str = None, prioridade: str = None) -> List[int]:
+        """Retorna apenas os ids das anotações filtradas (operações em lote)"""
+        condicoes, params = self._filtros_anotacoes(arquivada, categoria, tag, prioridade)
+
+        with self._pool.leitura() as conn:
+            rows = conn.execute(f"SELECT id FROM anotacoes WHERE {' AND '.join(condicoes)}", params).fetchall()
+
+        return [row[0] for row in rows]
+
+    @cacheado('anotacoes')
     def buscar_anotacao(self, anotacao_id: int) -> Optional[Dict]:
         """Busca uma anotação específica"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM anotacoes WHERE id = ?", (anotacao_id,))
-        row = cursor.fetchone()
-        conn.close()
-        
-        if row:
-            anotacao = dict(row)
-            anotacao['tags'] = json.loads(anotacao['tags']) if anotacao['tags'] else []
-            return anotacao
-        return None
-    
-    def atualizar_anotacao(self, anotacao_id: int, titulo: str = None, 
+        with self._pool.leitura() as conn:
+            rows = self._registros(conn, Anotacao, f"SELECT {COLUNAS_ANOTACOES} FROM anotacoes WHERE id = ?",
+                                   (anotacao_id,))
+
+        return rows[0] if rows else None
+
+    @escrita_enfileirada
+    def atualizar_anotacao(self, anotacao_id: int, titulo: str = None,
                           conteudo: str = None, categoria: str = None,
                           tags: List[str] = None, prioridade: str = None):
         """Atualiza uma anotação existente"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         updates = []
         params = []
-        
+
         if titulo is not None:
             updates.append("titulo = ?")
             params.append(titulo)
@@ -114,305 +387,698 @@ class DatabaseManager:
             updates.append("categoria = ?")
             params.append(categoria)
         if tags is not None:
+            tags = self._normalizar_tags(tags)
             updates.append("tags = ?")
             params.append(json.dumps(tags))
         if prioridade is not None:
             updates.append("prioridade = ?")
             params.append(prioridade)
-        
+
         if updates:
             updates.append("data_modificacao = CURRENT_TIMESTAMP")
             query = f"UPDATE anotacoes SET {', '.join(updates)} WHERE id = ?"
             params.append(anotacao_id)
-            
-            cursor.execute(query, params)
-            conn.commit()
-        
-        conn.close()
-    
+
+            with self._escrita('anotacoes') as conn:
+                conn.execute(query, params)
+                if tags is not None:
+                    self._sincronizar_tags(conn, anotacao_id, tags)
+
+    @escrita_enfileirada
     def deletar_anotacao(self, anotacao_id: int):
         """Deleta uma anotação"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM anotacoes WHERE id = ?", (anotacao_id,))
-        conn.commit()
-        conn.close()
-    
+        with self._escrita('anotacoes') as conn:
+            conn.execute("DELETE FROM anotacoes WHERE id = ?", (anotacao_id,))
+
+    @escrita_enfileirada
     def arquivar_anotacao(self, anotacao_id: int, arquivar: bool = True):
         """Arquiva ou desarquiva uma anotação"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE anotacoes SET arquivada = ? WHERE id = ?", 
-                      (1 if arquivar else 0, anotacao_id))
-        conn.commit()
-        conn.close()
-    
-    def buscar_anotacoes(self, termo: str) -> List[Dict]:
-        """Busca anotações por termo no título ou conteúdo"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM anotacoes 
-            WHERE (titulo LIKE ? OR conteudo LIKE ?) AND arquivada = 0
-            ORDER BY data_modificacao DESC
-        """, (f"%{termo}%", f"%{termo}%"))
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        anotacoes = []
-        for row in rows:
-            anotacao = dict(row)
-            anotacao['tags'] = json.loads(anotacao['tags']) if anotacao['tags'] else []
-            anotacoes.append(anotacao)
-        
-        return anotacoes
-    
+        with self._escrita('anotacoes') as conn:
+            conn.execute("UPDATE anotacoes SET arquivada = ? WHERE id = ?",
+                         (1 if arquivar else 0, anotacao_id))
+
+    @escrita_enfileirada
+    def arquivar_anotacoes_em_lote(self, ids: Iterable[int], arquivar: bool = True) -> int:
+        """Arquiva ou desarquiva várias anotações em um único UPDATE"""
+        with self._escrita('anotacoes') as conn:
+            cursor = conn.execute("""
+                UPDATE anotacoes SET arquivada = ?
+                WHERE id IN (SELECT value FROM json_each(?)) AND arquivada IS NOT ?
+            """, (1 if arquivar else 0, self._ids_json(ids), 1 if arquivar else 0))
+            return cursor.rowcount
+
+    @escrita_enfileirada
+    def deletar_anotacoes_em_lote(self, ids: Iterable[int]) -> int:
+        """Deleta várias anotações em um único DELETE (tags e índice via triggers)"""
+        with self._escrita('anotacoes') as conn:
+            cursor = conn.execute("DELETE FROM anotacoes WHERE id IN (SELECT value FROM json_each(?))",
+                                  (self._ids_json(ids),))
+            return cursor.rowcount
+
+    @escrita_enfileirada
+    def adicionar_tags_em_lote(self, ids: Iterable[int], tags: List[str]) -> int:
+        """Acrescenta tags a várias anotações em uma transação.
+
+        As tags já presentes são mantidas na ordem original; retorna o número
+        de anotações alteradas.
+        """
+        tags = self._normalizar_tags(tags)
+        ids_json = self._ids_json(ids)
+        if not tags:
+            return 0
+
+        with self._escrita('anotacoes') as conn:
+            alteradas = conn.execute("""
+                SELECT COUNT(*) FROM anotacoes
+                WHERE id IN (SELECT value FROM json_each(?))
+                  AND EXISTS (SELECT 1 FROM json_each(?) n
+                              WHERE n.value NOT IN (SELECT value FROM json_each(COALESCE(anotacoes.tags, '[]'))))
+            """, (ids_json, json.dumps(tags))).fetchone()[0]
+
+            conn.executemany("""
+                UPDATE anotacoes
+                SET tags = json_insert(COALESCE(tags, '[]'), '$[#]', ?1),
+                    data_modificacao = CURRENT_TIMESTAMP
+                WHERE id IN (SELECT value FROM json_each(?2))
+                  AND ?1 NOT IN (SELECT value FROM json_each(COALESCE(tags, '[]')))
+            """, [(tag, ids_json) for tag in tags])
+
+            conn.executemany("INSERT OR IGNORE INTO tags (nome) VALUES (?)", [(tag,) for tag in tags])
+            conn.execute("""
+                INSERT OR IGNORE INTO anotacao_tags (anotacao_id, tag_id)
+                SELECT a.id, t.id FROM anotacoes a, tags t
+                WHERE a.id IN (SELECT value FROM json_each(?))
+                  AND t.nome IN (SELECT value FROM json_each(?))
+            """, (ids_json, json.dumps(tags)))
+
+        return alteradas
+
+    @escrita_enfileirada
+    def remover_tags_em_lote(self, ids: Iterable[int], tags: List[str]) -> int:
+        """Remove tags de várias anotações em uma transação.
+
+        Retorna o número de anotações alteradas.
+        """
+        tags_json = json.dumps(self._normalizar_tags(tags))
+        ids_json = self._ids_json(ids)
+
+        with self._escrita('anotacoes') as conn:
+            cursor = conn.execute("""
+                UPDATE anotacoes
+                SET tags = (SELECT json_group_array(value) FROM json_each(anotacoes.tags)
+                            WHERE value NOT IN (SELECT value FROM json_each(?1))),
+                    data_modificacao = CURRENT_TIMESTAMP
+                WHERE id IN (SELECT value FROM json_each(?2))
+                  AND EXISTS (SELECT 1 FROM json_each(COALESCE(anotacoes.tags, '[]'))
+                              WHERE value IN (SELECT value FROM json_each(?1)))
+            """, (tags_json, ids_json))
+
+            conn.execute("""
+                DELETE FROM anotacao_tags
+                WHERE anotacao_id IN (SELECT value FROM json_each(?))
+                  AND tag_id IN (SELECT id FROM tags WHERE nome IN (SELECT value FROM json_each(?)))
+            """, (ids_json, tags_json))
+
+            return cursor.rowcount
+
+    @cacheado('anotacoes')
+    def buscar_anotacoes(self, termo: str, limite: int = 50) -> List[Dict]:
+        """Busca anotações por termo no título ou conteúdo, ordenadas por relevância.
+
+        Usa o índice FTS5 (ranking bm25, título com peso maior). Aceita frases
+        entre aspas e prefixos com *; "ação" também encontra "acao". Cada
+        resultado traz 'titulo_destacado' e 'trecho' com os termos em negrito.
+        """
+        consulta = _montar_consulta_fts(termo)
+        if not consulta:
+            return []
+
+        with self._pool.leitura() as conn:
+            return self._registros(conn, Anotacao, f"""
+                SELECT {_COLUNAS_ANOTACOES_A},
+                       highlight(anotacoes_fts, 0, '**', '**') AS titulo_destacado,
+                       snippet(anotacoes_fts, 1, '**', '**', '…', 24) AS trecho,
+                       bm25(anotacoes_fts, 10.0, 1.0) AS relevancia
+                FROM anotacoes_fts
+                JOIN anotacoes a ON a.id = anotacoes_fts.rowid
+                WHERE anotacoes_fts MATCH ? AND a.arquivada = 0
+                ORDER BY relevancia
+                LIMIT ?
+            """, (consulta, limite))
+
+    @escrita_enfileirada(agrupar=False)
+    def reconstruir_indice_busca(self, tamanho_lote: int = 500, completo: bool = False) -> int:
+        """Indexa no FTS, em lotes, as anotações ainda não indexadas.
+
+        Cada lote roda em uma transação curta, então bancos grandes são
+        indexados sem bloquear as demais escritas e o processo pode ser
+        retomado se interrompido. Com completo=True o índice é refeito do zero.
+        Retorna o número de anotações indexadas.
+        """
+        if completo:
+            with self._escrita('anotacoes') as conn:
+                conn.execute("INSERT INTO anotacoes_fts (anotacoes_fts) VALUES ('delete-all')")
+                alvo = conn.execute("SELECT MAX(id) FROM anotacoes").fetchone()[0] or 0
+                conn.executemany(
+                    "INSERT OR REPLACE INTO metadados (chave, valor) VALUES (?, ?)",
+                    [('fts_anotacoes_ultimo_id', '0'), ('fts_anotacoes_alvo', str(alvo))]
+                )
+
+        indexadas = 0
+        while True:
+            with self._escrita('anotacoes') as conn:
+                estado = dict(conn.execute("""
+                    SELECT chave, valor FROM metadados
+                    WHERE chave IN ('fts_anotacoes_ultimo_id', 'fts_anotacoes_alvo')
+                """).fetchall())
+
+                if len(estado) < 2:
+                    break
+
+                ultimo_id = int(estado['fts_anotacoes_ultimo_id'])
+                alvo = int(estado['fts_anotacoes_alvo'])
+
+                limite = conn.execute("""
+                    SELECT MAX(id) FROM (
+                        SELECT id FROM anotacoes WHERE id > ? AND id <= ? ORDER BY id LIMIT ?
+                    )
+                """, (ultimo_id, alvo, tamanho_lote)).fetchone()[0]
+
+                if limite is None:
+                    conn.execute("""
+                        DELETE FROM metadados
+                        WHERE chave IN ('fts_anotacoes_ultimo_id', 'fts_anotacoes_alvo')
+                    """)
+                    break
+
+                cursor = conn.execute("""
+                    INSERT INTO anotacoes_fts (rowid, titulo, conteudo)
+                    SELECT a.id, a.titulo, a.conteudo FROM anotacoes a
+                    WHERE a.id > ? AND a.id <= ?
+                      AND NOT EXISTS (SELECT 1 FROM anotacoes_fts_docsize d WHERE d.id = a.id)
+                """, (ultimo_id, limite))
+                indexadas += max(cursor.rowcount, 0)
+
+                conn.execute(
+                    "UPDATE metadados SET valor = ? WHERE chave = 'fts_anotacoes_ultimo_id'",
+                    (str(limite),)
+                )
+
+        return indexadas
+
+    @cacheado('anotacoes')
+    def obter_nuvem_tags(self, limite: int = None) -> List[Dict]:
+        """Retorna as tags em uso com o número de anotações de cada uma.
+
+        As contagens vêm de tags.total, mantida por triggers em anotacao_tags,
+        portanto a consulta não percorre as anotações.
+        """
+        query = "SELECT nome, cor, total FROM tags WHERE total > 0 ORDER BY total DESC, nome"
+        params = []
+
+        if limite:
+            query += " LIMIT ?"
+            params.append(int(limite))
+
+        with self._pool.leitura() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        return [dict(row) for row in rows]
+
+    @cacheado('anotacoes')
     def obter_categorias(self) -> List[str]:
         """Retorna lista de categorias únicas"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT DISTINCT categoria FROM anotacoes ORDER BY categoria")
-        categorias = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        return categorias
-    
+        with self._pool.leitura() as conn:
+            rows = conn.execute("SELECT DISTINCT categoria FROM anotacoes ORDER BY categoria").fetchall()
+        return [row[0] for row in rows]
+
     # ==================== OCORRÊNCIAS ====================
-    
+
+    @escrita_enfileirada
     def criar_ocorrencia(self, tipo: str, descricao: str, severidade: str = "média",
                         data_ocorrencia: str = None, responsavel: str = None,
                         solucao: str = None) -> int:
         """Cria uma nova ocorrência"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         if not data_ocorrencia:
             data_ocorrencia = datetime.now().isoformat()
-        
-        cursor.execute("""
-            INSERT INTO ocorrencias (tipo, descricao, severidade, data_ocorrencia, responsavel, solucao)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (tipo, descricao, severidade, data_ocorrencia, responsavel, solucao))
-        
-        ocorrencia_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return ocorrencia_id
-    
-    def listar_ocorrencias(self, status: str = None, severidade: str = None, 
-                          tipo: str = None) -> List[Dict]:
+
+        with self._escrita('ocorrencias') as conn:
+            cursor = conn.execute("""
+                INSERT INTO ocorrencias (tipo, descricao, severidade, data_ocorrencia, responsavel, solucao)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (tipo, descricao, severidade, data_ocorrencia, responsavel, solucao))
+
+            return cursor.lastrowid
+
+    @escrita_enfileirada(agrupar=False)
+    def criar_ocorrencias_em_lote(self, ocorrencias: Iterable[Dict], tamanho_lote: int = 1000) -> List[int]:
+        """Cria várias ocorrências com uma transação por bloco.
+
+        Cada item é um dict com os parâmetros de criar_ocorrencia e,
+        opcionalmente, status e data_fechamento (para importar histórico já
+        resolvido; sem data_fechamento, fechadas recebem a data da carga).
+        """
+        agora = datetime.now().isoformat()
+
+        def preparar(registro):
+            self._validar_registro(registro, ('tipo', 'descricao'), CAMPOS_OCORRENCIA)
+            return (registro['tipo'], registro['descricao'], registro.get('severidade') or 'média',
+                    registro.get('status') or 'aberta', registro.get('data_ocorrencia') or agora,
+                    registro.get('data_fechamento'), registro.get('responsavel'), registro.get('solucao'))
+
+        def inserir(conn, linhas):
+            return self._inserir_com_ids(conn, """
+                INSERT INTO ocorrencias (tipo, descricao, severidade, status, data_ocorrencia,
+                                         data_fechamento, responsavel, solucao)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, linhas)
+
+        return self._inserir_em_lotes('ocorrencias', ocorrencias, tamanho_lote, preparar, inserir)
+
+    @staticmethod
+    def _origem_ocorrencias(incluir_arquivo: bool) -> str:
+        """Tabela de leitura das ocorrências: só a quente ou a união com o arquivo"""
+        return f"{ORIGEM_OCORRENCIAS_COM_ARQUIVO} AS ocorrencias" if incluir_arquivo else "ocorrencias"
+
+    @staticmethod
+    def _colunas_ocorrencias(incluir_arquivo: bool) -> str:
+        """Colunas lidas das ocorrências (com 'arquivada' quando inclui o arquivo)"""
+        return COLUNAS_OCORRENCIAS + (", arquivada" if incluir_arquivo else "")
+
+    @cacheado('ocorrencias')
+    def listar_ocorrencias(self, status: str = None, severidade: str = None,
+                          tipo: str = None, incluir_arquivo: bool = False) -> List[Dict]:
         """Lista todas as ocorrências com filtros opcionais"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        query = "SELECT * FROM ocorrencias WHERE 1=1"
-        params = []
-        
-        if status and status != "Todos":
-            query += " AND status = ?"
-            params.append(status.lower())
-        
-        if severidade and severidade != "Todas":
-            query += " AND severidade = ?"
-            params.append(severidade.lower())
-        
-        if tipo and tipo != "Todos":
-            query += " AND tipo = ?"
-            params.append(tipo)
-        
-        query += " ORDER BY data_ocorrencia DESC"
-        
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
-        
-        return [dict(row) for row in rows]
-    
-    def buscar_ocorrencia(self, ocorrencia_id: int) -> Optional[Dict]:
+        condicoes, params = self._filtros_ocorrencias(status, severidade, tipo)
+        where = ' AND '.join(condicoes) if condicoes else '1=1'
+        query = f"""
+            SELECT {self._colunas_ocorrencias(incluir_arquivo)} FROM {self._origem_ocorrencias(incluir_arquivo)}
+            WHERE {where} ORDER BY data_ocorrencia_epoch DESC, id DESC
+        """
+
+        with self._pool.leitura() as conn:
+            return self._registros(conn, Ocorrencia, query, params)
+
+    @cacheado('ocorrencias')
+    def listar_ocorrencias_pagina(self, status: str = None, severidade: str = None,
+                                  tipo: str = None, tamanho_pagina: int = 20,
+                                  cursor: Tuple = None, incluir_arquivo: bool = False) -> Dict:
+        """Retorna uma página de ocorrências (keyset em data_ocorrencia_epoch, id).
+
+        Resultado: {'itens': [...], 'proximo': cursor, 'anterior': cursor}.
+        """
+        condicoes, params = self._filtros_ocorrencias(status, severidade, tipo)
+        query = (f"SELECT {self._colunas_ocorrencias(incluir_arquivo)}, data_ocorrencia_epoch "
+                 f"FROM {self._origem_ocorrencias(incluir_arquivo)}")
+
+        with self._pool.leitura() as conn:
+            rows, cursores = self._paginar(conn, query, condicoes, params, 'data_ocorrencia_epoch',
+                                           tamanho_pagina, cursor, fabrica=Ocorrencia.fabrica)
+
+        return {'itens': rows, **cursores}
+
+    @cacheado('ocorrencias')
+    def listar_ids_ocorrencias(self, status: str = None, severidade: str = None,
+                               tipo: str = None) -> List[int]:
+        """Retorna apenas os ids das ocorrências filtradas (operações em lote)"""
+        condicoes, params = self._filtros_ocorrencias(status, severidade, tipo)
+        where = ' AND '.join(condicoes) if condicoes else '1=1'
+
+        with self._pool.leitura() as conn:
+            rows = conn.execute(f"SELECT id FROM ocorrencias WHERE {where}", params).fetchall()
+
+        return [row[0] for row in rows]
+
+    @cacheado('ocorrencias')
+    def buscar_ocorrencia(self, ocorrencia_id: int, incluir_arquivo: bool = False) -> Optional[Dict]:
         """Busca uma ocorrência específica"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM ocorrencias WHERE id = ?", (ocorrencia_id,))
-        row = cursor.fetchone()
-        conn.close()
-        
-        return dict(row) if row else None
-    
+        with self._pool.leitura() as conn:
+            rows = self._registros(conn, Ocorrencia, f"""
+                SELECT {self._colunas_ocorrencias(incluir_arquivo)} FROM {self._origem_ocorrencias(incluir_arquivo)}
+                WHERE id = ?
+            """, (ocorrencia_id,))
+
+        return rows[0] if rows else None
+
+    @escrita_enfileirada
     def atualizar_ocorrencia(self, ocorrencia_id: int, tipo: str = None,
                             descricao: str = None, severidade: str = None,
                             status: str = None, responsavel: str = None,
-                            solucao: str = None):
-        """Atualiza uma ocorrência existente"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        updates = []
-        params = []
-        
-        if tipo is not None:
-            updates.append("tipo = ?")
-            params.append(tipo)
-        if descricao is not None:
-            updates.append("descricao = ?")
-            params.append(descricao)
-        if severidade is not None:
-            updates.append("severidade = ?")
-            params.append(severidade)
-        if status is not None:
-            updates.append("status = ?")
-            params.append(status)
-        if responsavel is not None:
-            updates.append("responsavel = ?")
-            params.append(responsavel)
-        if solucao is not None:
-            updates.append("solucao = ?")
-            params.append(solucao)
-        
-        if updates:
-            query = f"UPDATE ocorrencias SET {', '.join(updates)} WHERE id = ?"
-            params.append(ocorrencia_id)
-            
-            cursor.execute(query, params)
-            conn.commit()
-        
-        conn.close()
-    
+                            solucao: str = None) -> int:
+        """Atualiza uma ocorrência existente.
+
+        Retorna 1 se a ocorrência foi atualizada e 0 se ela não existe (ou
+        não há campos a alterar).
+        """
+        updates, params = self._campos_ocorrencia(tipo=tipo, descricao=descricao, severidade=severidade,
+                                                  status=status, responsavel=responsavel, solucao=solucao)
+        if not updates:
+            return 0
+
+        query = f"UPDATE ocorrencias SET {', '.join(updates)} WHERE id = ?"
+        params.append(ocorrencia_id)
+
+        with self._escrita('ocorrencias') as conn:
+            return conn.execute(query, params).rowcount
+
+    @escrita_enfileirada
+    def atualizar_ocorrencias_em_lote(self, ids: Iterable[int], tipo: str = None,
+                                      descricao: str = None, severidade: str = None,
+                                      status: str = None, responsavel: str = None,
+                                      solucao: str = None) -> int:
+        """Aplica os mesmos campos a várias ocorrências em um único UPDATE.
+
+        Retorna o número de ocorrências atualizadas.
+        """
+        updates, params = self._campos_ocorrencia(tipo=tipo, descricao=descricao, severidade=severidade,
+                                                  status=status, responsavel=responsavel, solucao=solucao)
+        if not updates:
+            return 0
+
+        query = f"UPDATE ocorrencias SET {', '.join(updates)} WHERE id IN (SELECT value FROM json_each(?))"
+        params.append(self._ids_json(ids))
+
+        with self._escrita('ocorrencias') as conn:
+            return conn.execute(query, params).rowcount
+
+    @escrita_enfileirada
+    def deletar_ocorrencias_em_lote(self, ids: Iterable[int]) -> int:
+        """Deleta várias ocorrências em um único DELETE"""
+        with self._escrita('ocorrencias') as conn:
+            cursor = conn.execute("DELETE FROM ocorrencias WHERE id IN (SELECT value FROM json_each(?))",
+                                  (self._ids_json(ids),))
+            return cursor.rowcount
+
+    @escrita_enfileirada
     def deletar_ocorrencia(self, ocorrencia_id: int):
         """Deleta uma ocorrência"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM ocorrencias WHERE id = ?", (ocorrencia_id,))
-        conn.commit()
-        conn.close()
-    
+        with self._escrita('ocorrencias') as conn:
+            conn.execute("DELETE FROM ocorrencias WHERE id = ?", (ocorrencia_id,))
+
+    def _contadores_por_prefixo(self, prefixo: str) -> Dict[str, int]:
+        """Lê os contadores cuja chave começa com o prefixo (faixa da chave primária)"""
+        with self._pool.leitura() as conn:
+            rows = conn.execute("""
+                SELECT chave, valor FROM contadores
+                WHERE chave >= ? AND chave < ? AND valor > 0
+            """, (prefixo, prefixo[:-1] + chr(ord(prefixo[-1]) + 1))).fetchall()
+
+        return {row[0][len(prefixo):]: row[1] for row in rows}
+
+    @cacheado('ocorrencias')
     def obter_ocorrencias_por_status(self) -> Dict[str, int]:
         """Retorna contagem de ocorrências por status"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT status, COUNT(*) as count 
-            FROM ocorrencias 
-            GROUP BY status
-        """)
-        
-        resultado = {row[0]: row[1] for row in cursor.fetchall()}
-        conn.close()
-        
-        return resultado
-    
+        return self._contadores_por_prefixo('ocorrencias_status:')
+
+    @cacheado('ocorrencias')
     def obter_ocorrencias_por_severidade(self) -> Dict[str, int]:
         """Retorna contagem de ocorrências por severidade"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT severidade, COUNT(*) as count 
-            FROM ocorrencias 
-            GROUP BY severidade
-        """)
-        
-        resultado = {row[0]: row[1] for row in cursor.fetchall()}
-        conn.close()
-        
-        return resultado
-    
+        return self._contadores_por_prefixo('ocorrencias_severidade:')
+
+    @staticmethod
+    def _intervalo_dias(data_inicio: str, data_fim: str) -> Tuple[str, str]:
+        """Intervalo inclusivo de dias (YYYY-MM-DD) para consultar os resumos"""
+        return (data_inicio or '0000-01-01')[:10], (data_fim or '9999-12-31')[:10]
+
+    @cacheado('ocorrencias')
+    def contar_ocorrencias_por_periodo(self, granularidade: str = 'dia',
+                                       dimensao: Union[str, Tuple[str, ...]] = None,
+                                       data_inicio: str = None, data_fim: str = None) -> List[Dict]:
+        """Conta ocorrências por dia, semana ou mês a partir de ocorrencias_diarias.
+
+        dimensao ('severidade', 'status', 'tipo' ou uma tupla delas) separa as
+        contagens em séries. data_inicio/data_fim (YYYY-MM-DD) são inclusivos.
+        Semanas começam na segunda-feira e meses são identificados pelo dia 1.
+        Como lê apenas o resumo diário (chave iniciada pelo dia), o custo
+        depende do número de dias do intervalo, não do total de ocorrências.
+        Retorna [{'periodo': 'YYYY-MM-DD', [dimensões...,] 'quantidade': n}].
+        """
+        dimensoes = self._validar_periodo(granularidade, dimensao)
+
+        colunas = ', '.join(('periodo',) + dimensoes)
+        query = f"""
+            SELECT {_PERIODOS_OCORRENCIAS[granularidade].format(coluna='dia')} AS periodo,
+                   {''.join(nome + ', ' for nome in dimensoes)}SUM(quantidade) AS quantidade
+            FROM ocorrencias_diarias
+            WHERE dia BETWEEN ? AND ?
+            GROUP BY {colunas}
+            ORDER BY {colunas}
+        """
+
+        with self._pool.leitura() as conn:
+            rows = conn.execute(query, self._intervalo_dias(data_inicio, data_fim)).fetchall()
+
+        return [dict(row) for row in rows]
+
+    @cacheado('ocorrencias')
+    def obter_fluxo_ocorrencias(self, granularidade: str = 'dia', data_inicio: str = None,
+                                data_fim: str = None) -> List[Dict]:
+        """Retorna ocorrências abertas e fechadas por período.
+
+        Abertas contam pelo dia da ocorrência e fechadas pelo dia em que o
+        status passou a 'fechada'.
+        Retorna [{'periodo': 'YYYY-MM-DD', 'abertas': n, 'fechadas': n}].
+        """
+        self._validar_periodo(granularidade)
+
+        query = f"""
+            SELECT {_PERIODOS_OCORRENCIAS[granularidade].format(coluna='dia')} AS periodo,
+                   SUM(abertas) AS abertas, SUM(fechadas) AS fechadas
+            FROM ocorrencias_fluxo_diario
+            WHERE dia BETWEEN ? AND ?
+            GROUP BY periodo
+            ORDER BY periodo
+        """
+
+        with self._pool.leitura() as conn:
+            rows = conn.execute(query, self._intervalo_dias(data_inicio, data_fim)).fetchall()
+
+        return [dict(row) for row in rows]
+
+    @escrita_enfileirada(agrupar=False)
+    def reconstruir_resumos_ocorrencias(self, data_inicio: str = None, data_fim: str = None) -> int:
+        """Recalcula os resumos diários a partir das ocorrências.
+
+        Os triggers mantêm os resumos; use após cargas feitas fora do sistema
+        ou para corrigir divergências. Sem intervalo, refaz todos os dias.
+        Retorna o número de linhas de resumo gravadas.
+        """
+        with self._escrita('ocorrencias') as conn:
+            return recalcular_resumos_ocorrencias(conn, *self._intervalo_dias(data_inicio, data_fim))
+
+    @cacheado('ocorrencias')
     def obter_ocorrencias_criticas_abertas(self) -> List[Dict]:
         """Retorna ocorrências críticas que ainda estão abertas"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM ocorrencias 
-            WHERE severidade = 'crítica' AND status IN ('aberta', 'em análise')
-            ORDER BY data_ocorrencia DESC
-        """)
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        return [dict(row) for row in rows]
-    
+        with self._pool.leitura() as conn:
+            return self._registros(conn, Ocorrencia, f"""
+                SELECT {COLUNAS_OCORRENCIAS} FROM ocorrencias
+                WHERE severidade = 'crítica' AND status IN ('aberta', 'em análise')
+                ORDER BY data_ocorrencia_epoch DESC, id DESC
+            """)
+
+    # ==================== ARQUIVAMENTO ====================
+
+    @escrita_enfileirada(agrupar=False)
+    def arquivar_ocorrencias(self, dias_retencao: int = None, tamanho_lote: int = None) -> int:
+        """Move para o arquivo as ocorrências fechadas há mais de dias_retencao dias.
+
+        Cada lote é copiado e excluído em uma transação própria, liberando o
+        escritor entre os lotes. Os resumos diários continuam contando as
+        arquivadas; os contadores passam a refletir só a tabela quente. Ao
+        final, as páginas liberadas são devolvidas com compactar_banco().
+        Retorna o número de ocorrências arquivadas.
+        """
+        if dias_retencao is None:
+            dias_retencao = ARQUIVAMENTO.get('dias_retencao', 180)
+        tamanho_lote = max(1, int(tamanho_lote or ARQUIVAMENTO.get('tamanho_lote', 500)))
+        corte = (datetime.now() - timedelta(days=int(dias_retencao))).strftime('%Y-%m-%d')
+
+        total = 0
+        while True:
+            with self._escrita('ocorrencias') as conn:
+                ids = [row[0] for row in conn.execute(f"""
+                    SELECT id FROM ocorrencias
+                    WHERE status = 'fechada'
+                      AND COALESCE({EPOCH.format('data_fechamento')}, data_ocorrencia_epoch) < {_EPOCH_DESDE}
+                    ORDER BY id LIMIT ?
+                """, (corte, tamanho_lote)).fetchall()]
+                if not ids:
+                    break
+
+                # O arquivo é outro arquivo SQLite: em WAL o COMMIT não é atômico
+                # entre os dois, por isso a cópia é idempotente (INSERT OR REPLACE)
+                ids_json = self._ids_json(ids)
+                conn.execute(f"""
+                    INSERT OR REPLACE INTO arquivo.ocorrencias_arquivo ({COLUNAS_OCORRENCIAS})
+                    SELECT {COLUNAS_OCORRENCIAS} FROM ocorrencias
+                    WHERE id IN (SELECT value FROM json_each(?))
+                """, (ids_json,))
+                conn.execute("INSERT OR REPLACE INTO metadados (chave, valor) VALUES ('arquivando', '1')")
+                conn.execute("DELETE FROM ocorrencias WHERE id IN (SELECT value FROM json_each(?))", (ids_json,))
+                conn.execute("DELETE FROM metadados WHERE chave = 'arquivando'")
+                conn.execute("""
+                    INSERT INTO metadados (chave, valor) VALUES ('ocorrencias_arquivadas', ?)
+                    ON CONFLICT (chave) DO UPDATE SET valor = CAST(valor AS INTEGER) + excluded.valor
+                """, (len(ids),))
+            total += len(ids)
+
+        if total:
+            self.compactar_banco()
+        return total
+
+    @escrita_enfileirada(agrupar=False)
+    def compactar_banco(self, paginas: int = None, completo: bool = False) -> int:
+        """Devolve ao sistema de arquivos as páginas livres do banco principal.
+
+        Usa PRAGMA incremental_vacuum (até `paginas`, padrão todas). Bancos
+        criados antes do auto_vacuum incremental precisam de uma conversão
+        única com completo=True (VACUUM, que bloqueia o banco enquanto roda).
+        Retorna o número de páginas liberadas.
+        """
+        with self._pool.escritor() as conn:
+            if completo:
+                livres = conn.execute("PRAGMA main.freelist_count").fetchone()[0]
+                conn.execute("PRAGMA main.auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM main")
+                liberadas = livres
+            elif conn.execute("PRAGMA main.auto_vacuum").fetchone()[0] == 2:
+                livres = conn.execute("PRAGMA main.freelist_count").fetchone()[0]
+                # Cada passo do PRAGMA libera uma página; executescript roda até o fim
+                conn.executescript(f"PRAGMA main.incremental_vacuum({int(paginas or 0)});")
+                liberadas = livres - conn.execute("PRAGMA main.freelist_count").fetchone()[0]
+            else:
+                return 0
+            # Em WAL o arquivo só encolhe depois do checkpoint
+            conn.execute("PRAGMA main.wal_checkpoint(TRUNCATE)")
+        return liberadas
+
     # ==================== ATAS DE REUNIÃO ====================
-    
+
+    def _carregar_acoes(self, conn, ata_ids: List[int]) -> Dict[int, List[Dict]]:
+        """Carrega, em uma única consulta, as ações das atas informadas"""
+        acoes_por_ata = {ata_id: [] for ata_id in ata_ids}
+        if not ata_ids:
+            return acoes_por_ata
+
+        rows = conn.execute("""
+            SELECT * FROM acoes
+            WHERE ata_id IN (SELECT value FROM json_each(?))
+            ORDER BY ata_id, id
+        """, (json.dumps(ata_ids),)).fetchall()
+
+        for row in rows:
+            acao = dict(row)
+            acao['concluida'] = bool(acao['concluida'])
+            acoes_por_ata[acao['ata_id']].append(acao)
+
+        return acoes_por_ata
+
+    def _inserir_acoes(self, conn, ata_id: int, acoes: List[Dict]):
+        """Insere ações (no formato dos dicts de ata['acoes']) para uma ata"""
+        conn.executemany("""
+            INSERT INTO acoes (ata_id, descricao, responsavel, prazo, concluida)
+            VALUES (?, ?, ?, ?, ?)
+        """, [
+            (ata_id, acao.get('descricao', ''), acao.get('responsavel'),
+             acao.get('prazo') or None, 1 if acao.get('concluida', False) else 0)
+            for acao in acoes
+        ])
+
+    @escrita_enfileirada
     def criar_ata(self, titulo: str, data_reuniao: str, horario_inicio: str = None,
                   horario_fim: str = None, participantes: List[str] = None,
                   pauta: str = None, discussoes: str = None, decisoes: str = None,
                   acoes: List[Dict] = None, proxima_reuniao: str = None) -> int:
         """Cria uma nova ata de reunião"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         participantes_json = json.dumps(participantes) if participantes else json.dumps([])
-        acoes_json = json.dumps(acoes) if acoes else json.dumps([])
-        
-        cursor.execute("""
-            INSERT INTO atas_reuniao (titulo, data_reuniao, horario_inicio, horario_fim,
-                                     participantes, pauta, discussoes, decisoes, acoes, proxima_reuniao)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (titulo, data_reuniao, horario_inicio, horario_fim, participantes_json,
-              pauta, discussoes, decisoes, acoes_json, proxima_reuniao))
-        
-        ata_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return ata_id
-    
+
+        with self._escrita('atas_reuniao') as conn:
+            cursor = conn.execute("""
+                INSERT INTO atas_reuniao (titulo, data_reuniao, horario_inicio, horario_fim,
+                                         participantes, pauta, discussoes, decisoes, proxima_reuniao)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (titulo, data_reuniao, horario_inicio, horario_fim, participantes_json,
+                  pauta, discussoes, decisoes, proxima_reuniao))
+
+            ata_id = cursor.lastrowid
+            if acoes:
+                self._inserir_acoes(conn, ata_id, acoes)
+
+            return ata_id
+
+    @escrita_enfileirada(agrupar=False)
+    def criar_atas_em_lote(self, atas: Iterable[Dict], tamanho_lote: int = 500) -> List[int]:
+        """Cria várias atas (e suas ações) com uma transação por bloco.
+
+        Cada item é um dict com os parâmetros de criar_ata.
+        """
+        def preparar(registro):
+            self._validar_registro(registro, ('titulo', 'data_reuniao'), CAMPOS_ATA)
+            acoes = registro.get('acoes') or []
+            if any(not isinstance(acao, dict) for acao in acoes):
+                raise ValueError("acoes deve ser uma lista de dicts")
+
+            return acoes, (registro['titulo'], registro['data_reuniao'],
+                           registro.get('horario_inicio'), registro.get('horario_fim'),
+                           json.dumps(registro.get('participantes') or []), registro.get('pauta'),
+                           registro.get('discussoes'), registro.get('decisoes'),
+                           registro.get('proxima_reuniao'))
+
+        def inserir(conn, linhas):
+            ids = self._inserir_com_ids(conn, """
+                INSERT INTO atas_reuniao (titulo, data_reuniao, horario_inicio, horario_fim,
+                                         participantes, pauta, discussoes, decisoes, proxima_reuniao)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [valores for _, valores in linhas])
+
+            conn.executemany("""
+                INSERT INTO acoes (ata_id, descricao, responsavel, prazo, concluida)
+                VALUES (?, ?, ?, ?, ?)
+            """, [
+                (ata_id, acao.get('descricao', ''), acao.get('responsavel'),
+                 acao.get('prazo') or None, 1 if acao.get('concluida', False) else 0)
+                for ata_id, (acoes, _) in zip(ids, linhas) for acao in acoes
+            ])
+
+            return ids
+
+        return self._inserir_em_lotes('atas_reuniao', atas, tamanho_lote, preparar, inserir)
+
+    @cacheado('atas_reuniao')
     def listar_atas(self, limite: int = None) -> List[Dict]:
         """Lista todas as atas de reunião"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        query = "SELECT * FROM atas_reuniao ORDER BY data_reuniao DESC"
-        
+        query = f"SELECT {_COLUNAS_ATAS_COM_ACOES} FROM atas_reuniao ORDER BY data_reuniao_epoch DESC, id DESC"
+        params = []
+
         if limite:
-            query += f" LIMIT {limite}"
-        
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        conn.close()
-        
-        atas = []
-        for row in rows:
-            ata = dict(row)
-            ata['participantes'] = json.loads(ata['participantes']) if ata['participantes'] else []
-            ata['acoes'] = json.loads(ata['acoes']) if ata['acoes'] else []
-            atas.append(ata)
-        
-        return atas
-    
+            query += " LIMIT ?"
+            params.append(int(limite))
+
+        with self._pool.leitura() as conn:
+            return self._registros(conn, Ata, query, params)
+
+    @cacheado('atas_reuniao')
     def buscar_ata(self, ata_id: int) -> Optional[Dict]:
         """Busca uma ata específica"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM atas_reuniao WHERE id = ?", (ata_id,))
-        row = cursor.fetchone()
-        conn.close()
-        
-        if row:
-            ata = dict(row)
-            ata['participantes'] = json.loads(ata['participantes']) if ata['participantes'] else []
-            ata['acoes'] = json.loads(ata['acoes']) if ata['acoes'] else []
-            return ata
-        return None
-    
+        with self._pool.leitura() as conn:
+            rows = self._registros(conn, Ata, f"SELECT {_COLUNAS_ATAS_COM_ACOES} FROM atas_reuniao WHERE id = ?", (ata_id,))
+
+        return rows[0] if rows else None
+
+    @escrita_enfileirada
     def atualizar_ata(self, ata_id: int, titulo: str = None, data_reuniao: str = None,
                      horario_inicio: str = None, horario_fim: str = None,
                      participantes: List[str] = None, pauta: str = None,
                      discussoes: str = None, decisoes: str = None,
                      acoes: List[Dict] = None, proxima_reuniao: str = None):
-        """Atualiza uma ata existente"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
+        """Atualiza uma ata existente.
+
+        Se acoes for informado, o plano de ação da ata é substituído por
+        completo; para alterar uma única ação use atualizar_acao.
+        """
         updates = []
         params = []
-        
+
         if titulo is not None:
             updates.append("titulo = ?")
             params.append(titulo)
@@ -437,116 +1103,387 @@ class DatabaseManager:
         if decisoes is not None:
             updates.append("decisoes = ?")
             params.append(decisoes)
-        if acoes is not None:
-            updates.append("acoes = ?")
-            params.append(json.dumps(acoes))
         if proxima_reuniao is not None:
             updates.append("proxima_reuniao = ?")
             params.append(proxima_reuniao)
-        
-        if updates:
-            query = f"UPDATE atas_reuniao SET {', '.join(updates)} WHERE id = ?"
-            params.append(ata_id)
-            
-            cursor.execute(query, params)
-            conn.commit()
-        
-        conn.close()
-    
+
+        if not updates and acoes is None:
+            return
+
+        with self._escrita('atas_reuniao') as conn:
+            if updates:
+                query = f"UPDATE atas_reuniao SET {', '.join(updates)} WHERE id = ?"
+                params.append(ata_id)
+                conn.execute(query, params)
+
+            if acoes is not None:
+                conn.execute("DELETE FROM acoes WHERE ata_id = ?", (ata_id,))
+                self._inserir_acoes(conn, ata_id, acoes)
+
+    @escrita_enfileirada
     def deletar_ata(self, ata_id: int):
-        """Deleta uma ata de reunião"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM atas_reuniao WHERE id = ?", (ata_id,))
-        conn.commit()
-        conn.close()
-    
+        """Deleta uma ata de reunião (e suas ações, por ON DELETE CASCADE)"""
+        with self._escrita('atas_reuniao') as conn:
+            conn.execute("DELETE FROM atas_reuniao WHERE id = ?", (ata_id,))
+
+    @cacheado('atas_reuniao')
     def buscar_atas_por_periodo(self, data_inicio: str, data_fim: str) -> List[Dict]:
-        """Busca atas em um período específico"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM atas_reuniao 
-            WHERE data_reuniao BETWEEN ? AND ?
-            ORDER BY data_reuniao DESC
-        """, (data_inicio, data_fim))
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        atas = []
-        for row in rows:
-            ata = dict(row)
-            ata['participantes'] = json.loads(ata['participantes']) if ata['participantes'] else []
-            ata['acoes'] = json.loads(ata['acoes']) if ata['acoes'] else []
-            atas.append(ata)
-        
-        return atas
-    
-    def obter_acoes_pendentes(self) -> List[Dict]:
-        """Retorna todas as ações pendentes de todas as atas"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT id, titulo, acoes, data_reuniao FROM atas_reuniao")
-        rows = cursor.fetchall()
-        conn.close()
-        
+        """Busca atas em um período específico (dias inclusivos)"""
+        condicoes, params = self._filtros_periodo('data_reuniao_epoch', data_inicio, data_fim)
+        where = ' AND '.join(condicoes) if condicoes else '1=1'
+
+        with self._pool.leitura() as conn:
+            return self._registros(conn, Ata, f"""
+                SELECT {_COLUNAS_ATAS_COM_ACOES} FROM atas_reuniao WHERE {where}
+                ORDER BY data_reuniao_epoch DESC, id DESC
+            """, params)
+
+    @cacheado('atas_reuniao')
+    def listar_atas_pagina(self, data_inicio: str = None, data_fim: str = None,
+                           tamanho_pagina: int = 20, cursor: Tuple = None) -> Dict:
+        """Retorna uma página de atas (keyset em data_reuniao_epoch, id), opcionalmente por período.
+
+        Resultado: {'itens': [...], 'proximo': cursor, 'anterior': cursor}.
+        """
+        condicoes, params = self._filtros_periodo('data_reuniao_epoch', data_inicio, data_fim)
+
+        with self._pool.leitura() as conn:
+            rows, cursores = self._paginar(conn, f"SELECT {_COLUNAS_ATAS_COM_ACOES}, data_reuniao_epoch FROM atas_reuniao",
+                                           condicoes, params, 'data_reuniao_epoch', tamanho_pagina, cursor,
+                                           fabrica=Ata.fabrica)
+
+        return {'itens': rows, **cursores}
+
+    @cacheado('atas_reuniao')
+    def listar_resumos_atas(self, data_inicio: str = None, data_fim: str = None,
+                            limite: int = None) -> List[Dict]:
+        """Lista atas para os cards: sem pauta, discussões e decisões, com
+        total_participantes, total_acoes e acoes_pendentes (detalhe em buscar_ata)"""
+        condicoes, params = self._filtros_periodo('data_reuniao_epoch', data_inicio, data_fim)
+        where = ' AND '.join(condicoes) if condicoes else '1=1'
+        query = f"""
+            SELECT {COLUNAS_RESUMO_ATAS} FROM atas_reuniao WHERE {where}
+            ORDER BY data_reuniao_epoch DESC, id DESC
+        """
+
+        if limite:
+            query += " LIMIT ?"
+            params.append(int(limite))
+
+        with self._pool.leitura() as conn:
+            return self._registros(conn, ResumoAta, query, params)
+
+    @cacheado('atas_reuniao')
+    def listar_resumos_atas_pagina(self, data_inicio: str = None, data_fim: str = None,
+                                   tamanho_pagina: int = 20, cursor: Tuple = None) -> Dict:
+        """Página de atas no formato de listar_resumos_atas"""
+        condicoes, params = self._filtros_periodo('data_reuniao_epoch', data_inicio, data_fim)
+
+        with self._pool.leitura() as conn:
+            rows, cursores = self._paginar(conn, f"SELECT {COLUNAS_RESUMO_ATAS}, data_reuniao_epoch FROM atas_reuniao",
+                                           condicoes, params, 'data_reuniao_epoch', tamanho_pagina, cursor,
+                                           fabrica=ResumoAta.fabrica)
+
+        return {'itens': rows, **cursores}
+
+    # ==================== AÇÕES ====================
+
+    @escrita_enfileirada
+    def criar_acao(self, ata_id: int, descricao: str, responsavel: str = None,
+                   prazo: str = None, concluida: bool = False) -> int:
+        """Adiciona uma ação ao plano de ação de uma ata"""
+        with self._escrita('atas_reuniao') as conn:
+            cursor = conn.execute("""
+                INSERT INTO acoes (ata_id, descricao, responsavel, prazo, concluida)
+                VALUES (?, ?, ?, ?, ?)
+            """, (ata_id, descricao, responsavel, prazo, 1 if concluida else 0))
+
+            return cursor.lastrowid
+
+    @cacheado('atas_reuniao')
+    def listar_acoes(self, ata_id: int) -> List[Dict]:
+        """Lista as ações de uma ata na ordem em que foram criadas"""
+        with self._pool.leitura() as conn:
+            return self._carregar_acoes(conn, [ata_id])[ata_id]
+
+    @escrita_enfileirada
+    def atualizar_acao(self, acao_id: int, descricao: str = None, responsavel: str = None,
+                       prazo: str = None, concluida: bool = None):
+        """Atualiza uma única ação"""
+        updates = []
+        params = []
+
+        if descricao is not None:
+            updates.append("descricao = ?")
+            params.append(descricao)
+        if responsavel is not None:
+            updates.append("responsavel = ?")
+            params.append(responsavel)
+        if prazo is not None:
+            updates.append("prazo = ?")
+            params.append(prazo)
+        if concluida is not None:
+            updates.append("concluida = ?")
+            params.append(1 if concluida else 0)
+
+        if updates:
+            query = f"UPDATE acoes SET {', '.join(updates)} WHERE id = ?"
+            params.append(acao_id)
+
+            with self._escrita('atas_reuniao') as conn:
+                conn.execute(query, params)
+
+    @escrita_enfileirada
+    def deletar_acao(self, acao_id: int):
+        """Remove uma ação"""
+        with self._escrita('atas_reuniao') as conn:
+            conn.execute("DELETE FROM acoes WHERE id = ?", (acao_id,))
+
+    @escrita_enfileirada
+    def concluir_acoes_em_lote(self, ids: Iterable[int], concluida: bool = True) -> int:
+        """Marca (ou desmarca) várias ações como concluídas em um único UPDATE"""
+        with self._escrita('atas_reuniao') as conn:
+            cursor = conn.execute("""
+                UPDATE acoes SET concluida = ?
+                WHERE id IN (SELECT value FROM json_each(?)) AND concluida IS NOT ?
+            """, (1 if concluida else 0, self._ids_json(ids), 1 if concluida else 0))
+            return cursor.rowcount
+
+    @cacheado('atas_reuniao')
+    def obter_acoes_pendentes(self, responsavel: str = None) -> List[Dict]:
+        """Retorna todas as ações pendentes de todas as atas, por prazo"""
+        query = """
+            SELECT ac.id, ac.ata_id, at.titulo AS titulo_ata, at.data_reuniao,
+                   ac.descricao AS acao, ac.responsavel, ac.prazo
+            FROM acoes ac
+            JOIN atas_reuniao at ON at.id = ac.ata_id
+            WHERE ac.concluida = 0
+        """
+        params = []
+
+        if responsavel:
+            query += " AND ac.responsavel = ?"
+            params.append(responsavel)
+
+        query += " ORDER BY ac.prazo"
+
+        with self._pool.leitura() as conn:
+            rows = conn.execute(query, params).fetchall()
+
         acoes_pendentes = []
         for row in rows:
-            ata_id = row[0]
-            titulo_ata = row[1]
-            acoes_json = row[2]
-            data_reuniao = row[3]
-            
-            if acoes_json:
-                acoes = json.loads(acoes_json)
-                for acao in acoes:
-                    if not acao.get('concluida', False):
-                        acoes_pendentes.append({
-                            'ata_id': ata_id,
-                            'titulo_ata': titulo_ata,
-                            'data_reuniao': data_reuniao,
-                            'acao': acao.get('descricao', ''),
-                            'responsavel': acao.get('responsavel', ''),
-                            'prazo': acao.get('prazo', '')
-                        })
-        
+            acao = dict(row)
+            acao['responsavel'] = acao['responsavel'] or ''
+            acao['prazo'] = acao['prazo'] or ''
+            acoes_pendentes.append(acao)
+
         return acoes_pendentes
-    
-    
+
+    # ==================== DATAFRAMES ====================
+
+    def _dataframe(self, origem: str, disponiveis: Dict[str, str], colunas: List[str],
+                   condicoes: List[str], params: List[Any], ordem: str,
+                   categoricas: Tuple[str, ...], datas: Tuple[str, ...], tamanho_bloco: int):
+        """Monta um DataFrame tipado direto do cursor, bloco a bloco (fetchmany)"""
+        colunas = list(colunas or disponiveis)
+        invalidas = [coluna for coluna in colunas if coluna not in disponiveis]
+        if invalidas:
+            raise ValueError(f"Colunas inválidas: {', '.join(invalidas)}")
+
+        where = ' AND '.join(condicoes) if condicoes else '1=1'
+        selecao = ', '.join(f"{disponiveis[coluna]} AS {coluna}" for coluna in colunas)
+        query = f"SELECT {selecao} FROM {origem} WHERE {where} ORDER BY {ordem}"
+
+        with self._pool.leitura() as conn:
+            dominios = {}
+            for coluna in colunas:
+                if coluna in categoricas:
+                    # Domínio lido pelos índices das colunas de baixa cardinalidade
+                    valores = conn.execute(
+                        f"SELECT DISTINCT {disponiveis[coluna]} FROM {origem} "
+                        f"WHERE {disponiveis[coluna]} IS NOT NULL"
+                    ).fetchall()
+                    dominios[coluna] = [row[0] for row in valores]
+
+            cursor = conn.cursor()
+            cursor.row_factory = None  # tuplas simples: menos objetos por linha
+            cursor.execute(query, params)
+
+            blocos = iter(lambda: cursor.fetchmany(tamanho_bloco), [])
+            return self._montar_dataframe(blocos, colunas, dominios, datas)
+
+    def obter_dataframe_ocorrencias(self, colunas: List[str] = None, status: str = None,
+                                    severidade: str = None, tipo: str = None,
+                                    data_inicio: str = None, data_fim: str = None,
+                                    tamanho_bloco: int = 50000):
+        """Retorna as ocorrências filtradas como DataFrame tipado (pandas).
+
+        colunas restringe a projeção (padrão: todas). tipo, severidade e
+        status são categóricas e as datas vêm em datetime64. data_inicio e
+        data_fim (YYYY-MM-DD) filtram data_ocorrencia, inclusivos.
+        """
+        condicoes, params = self._filtros_ocorrencias(status, severidade, tipo)
+        periodo, params_periodo = self._filtros_periodo('data_ocorrencia_epoch', data_inicio, data_fim)
+        condicoes += periodo
+        params += params_periodo
+
+        return self._dataframe(
+            "ocorrencias", _COLUNAS_DF_OCORRENCIAS, colunas, condicoes, params,
+            "data_ocorrencia_epoch DESC, id DESC",
+            categoricas=('tipo', 'severidade', 'status'),
+            datas=('data_ocorrencia', 'data_registro', 'data_fechamento'),
+            tamanho_bloco=tamanho_bloco
+        )
+
+    def obter_dataframe_atas(self, colunas: List[str] = None, data_inicio: str = None,
+                             data_fim: str = None, tamanho_bloco: int = 50000):
+        """Retorna as atas como DataFrame tipado (pandas).
+
+        participantes, acoes e acoes_pendentes são contagens calculadas no
+        banco; data_reuniao, proxima_reuniao e data_criacao vêm em datetime64.
+        """
+        condicoes, params = self._filtros_periodo('a.data_reuniao_epoch', data_inicio, data_fim)
+
+        return self._dataframe(
+            "atas_reuniao a", _COLUNAS_DF_ATAS, colunas, condicoes, params,
+            "a.data_reuniao_epoch DESC, a.id DESC",
+            categoricas=(),
+            datas=('data_reuniao', 'proxima_reuniao', 'data_criacao'),
+            tamanho_bloco=tamanho_bloco
+        )
+
+    # ==================== EXPORTAÇÃO ====================
+
+    def _iterar(self, query: str, params: List[Any], converter: Callable[[Dict], Dict],
+                tamanho_bloco: int) -> Iterator[Dict]:
+        """Percorre o resultado da consulta em blocos de fetchmany.
+
+        Usa uma conexão própria com uma transação de leitura aberta até o fim,
+        então a exportação enxerga um único snapshot (WAL) sem bloquear as
+        escritas e sem manter o resultado inteiro em memória.
+        """
+        conn = self._pool._abrir_conexao()
+        try:
+            conn.execute("BEGIN")
+            cursor = conn.execute(query, params)
+            # As colunas *_epoch são de uso interno (filtros e ordenação)
+            colunas = [d[0] for d in cursor.description if not d[0].endswith('_epoch')]
+            while True:
+                rows = cursor.fetchmany(tamanho_bloco)
+                if not rows:
+                    break
+                for row in rows:
+                    yield converter({coluna: row[coluna] for coluna in colunas})
+        finally:
+            conn.close()
+
+    def iterar_anotacoes(self, arquivada: bool = False, categoria: str = None, tag: str = None,
+                         prioridade: str = None, tamanho_bloco: int = 1000) -> Iterator[Dict]:
+        """Gera as anotações filtradas (mesmos filtros de listar_anotacoes)"""
+        condicoes, params = self._filtros_anotacoes(arquivada, categoria, tag, prioridade)
+        query = f"""
+            SELECT * FROM anotacoes WHERE {' AND '.join(condicoes)}
+            ORDER BY data_modificacao_epoch DESC, id DESC
+        """
+
+        def converter(anotacao):
+            anotacao['tags'] = json.loads(anotacao['tags']) if anotacao['tags'] else []
+            return anotacao
+
+        return self._iterar(query, params, converter, tamanho_bloco)
+
+    def iterar_ocorrencias(self, status: str = None, severidade: str = None, tipo: str = None,
+                           tamanho_bloco: int = 1000, incluir_arquivo: bool = False) -> Iterator[Dict]:
+        """Gera as ocorrências filtradas (mesmos filtros de listar_ocorrencias)"""
+        condicoes, params = self._filtros_ocorrencias(status, severidade, tipo)
+        where = ' AND '.join(condicoes) if condicoes else '1=1'
+        query = f"""
+            SELECT * FROM {self._origem_ocorrencias(incluir_arquivo)}
+            WHERE {where} ORDER BY data_ocorrencia_epoch DESC, id DESC
+        """
+
+        return self._iterar(query, params, lambda ocorrencia: ocorrencia, tamanho_bloco)
+
+    def iterar_atas(self, data_inicio: str = None, data_fim: str = None,
+                    tamanho_bloco: int = 500) -> Iterator[Dict]:
+        """Gera as atas do período com suas ações.
+
+        As ações de cada ata vêm agregadas em JSON na própria linha, evitando
+        uma segunda consulta por bloco.
+        """
+        condicoes, params = self._filtros_periodo('a.data_reuniao_epoch', data_inicio, data_fim)
+        condicoes.insert(0, "1=1")
+
+        query = f"""
+            SELECT a.id, a.titulo, a.data_reuniao, a.horario_inicio, a.horario_fim,
+                   a.participantes, a.pauta, a.discussoes, a.decisoes, a.proxima_reuniao,
+                   a.data_criacao,
+                   (SELECT json_group_array(json_object(
+                               'id', c.id, 'descricao', c.descricao, 'responsavel', c.responsavel,
+                               'prazo', c.prazo, 'concluida', json(CASE WHEN c.concluida THEN 'true' ELSE 'false' END)))
+                    FROM (SELECT * FROM acoes WHERE ata_id = a.id ORDER BY id) c) AS acoes
+            FROM atas_reuniao a
+            WHERE {' AND '.join(condicoes)}
+            ORDER BY a.data_reuniao_epoch DESC, a.id DESC
+        """
+
+        def converter(ata):
+            ata['participantes'] = json.loads(ata['participantes']) if ata['participantes'] else []
+            ata['acoes'] = json.loads(ata['acoes'])
+            return ata
+
+        return self._iterar(query, params, converter, tamanho_bloco)
+
     # ==================== ESTATÍSTICAS ====================
-    
+
+    @cacheado(*TABELAS_CACHE)
     def obter_estatisticas(self) -> Dict[str, Any]:
-        """Retorna estatísticas gerais do sistema"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Anotações
-        cursor.execute("SELECT COUNT(*) FROM anotacoes WHERE arquivada = 0")
-        total_anotacoes = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM anotacoes WHERE arquivada = 1")
-        anotacoes_arquivadas = cursor.fetchone()[0]
-        
-        # Ocorrências
-        cursor.execute("SELECT COUNT(*) FROM ocorrencias WHERE status != 'fechada'")
-        ocorrencias_abertas = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM ocorrencias")
-        total_ocorrencias = cursor.fetchone()[0]
-        
-        # Atas
-        cursor.execute("SELECT COUNT(*) FROM atas_reuniao")
-        total_atas = cursor.fetchone()[0]
-        
-        conn.close()
-        
+        """Retorna estatísticas gerais do sistema.
+
+        Os valores vêm da tabela contadores, mantida por triggers, em uma
+        única leitura pela chave primária.
+        """
+        with self._pool.leitura() as conn:
+            rows = conn.execute("""
+                SELECT chave, valor FROM contadores
+                WHERE chave IN ('anotacoes_ativas', 'anotacoes_arquivadas', 'ocorrencias_abertas',
+                                'ocorrencias_total', 'atas_total')
+            """).fetchall()
+            arquivadas = conn.execute(
+                "SELECT valor FROM metadados WHERE chave = 'ocorrencias_arquivadas'"
+            ).fetchone()
+
+        contadores = {row[0]: row[1] for row in rows}
+
         return {
-            'total_anotacoes': total_anotacoes,
-            'anotacoes_arquivadas': anotacoes_arquivadas,
-            'ocorrencias_abertas': ocorrencias_abertas,
-            'total_ocorrencias': total_ocorrencias,
-            'total_atas': total_atas
-        }
\ No newline at end of file
+            'total_anotacoes': contadores.get('anotacoes_ativas', 0),
+            'anotacoes_arquivadas': contadores.get('anotacoes_arquivadas', 0),
+            'ocorrencias_abertas': contadores.get('ocorrencias_abertas', 0),
+            'total_ocorrencias': contadores.get('ocorrencias_total', 0),
+            'ocorrencias_arquivadas': int(arquivadas[0]) if arquivadas else 0,
+            'total_atas': contadores.get('atas_total', 0)
+        }
+
+    @escrita_enfileirada(agrupar=False)
+    def verificar_contadores(self, corrigir: bool = True) -> Dict[str, Tuple[int, int]]:
+        """Compara a tabela contadores com as contagens reais.
+
+        Retorna {chave: (valor_gravado, valor_real)} para cada divergência. Com
+        corrigir=True a tabela é reconstruída na mesma transação, que bloqueia
+        as escritas enquanto as tabelas são recontadas.
+        """
+        with self._escrita(*TABELAS_CACHE) as conn:
+            reais = {row[0]: row[1] for row in conn.execute(CONSULTA_CONTADORES).fetchall()}
+            gravados = {row[0]: row[1] for row in conn.execute("SELECT chave, valor FROM contadores").fetchall()}
+
+            divergencias = {}
+            for chave in set(reais) | set(gravados):
+                gravado, real = gravados.get(chave, 0), reais.get(chave, 0)
+                if gravado != real:
+                    divergencias[chave] = (gravado, real)
+
+            if divergencias and corrigir:
+                conn.execute("DELETE FROM contadores")
+                conn.execute(f"INSERT INTO contadores (chave, valor) {CONSULTA_CONTADORES}")
+
+        return divergencias
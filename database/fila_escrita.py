@@ -0,0 +1,215 @@
+"""
+Fila de escrita
+Uma thread dedicada executa as escritas do gerenciador, agrupando as que
+chegam juntas em uma única transação
+"""
+import functools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, ContextManager, Dict, Any, List
+
+
+def _ocupado(erro: Exception) -> bool:
+    """Indica se o erro é de banco ocupado/travado por outra conexão"""
+    mensagem = str(erro).lower()
+    return 'locked' in mensagem or 'busy' in mensagem
+
+
+class _Pedido:
+    """Chamada de método aguardando a thread de escrita"""
+
+    __slots__ = ('funcao', 'agrupar', 'futuro', 'enfileirado_em')
+
+    def __init__(self, funcao: Callable[[], Any], agrupar: bool):
+        self.funcao = funcao
+        self.agrupar = agrupar
+        self.futuro = Future()
+        self.enfileirado_em = time.perf_counter()
+
+
+class FilaEscrita:
+    """Executa escritas em uma thread própria, em lotes de uma transação.
+
+    Os pedidos que se acumulam enquanto um lote é gravado formam o lote
+    seguinte (até max_lote): uma única transação aberta por transacao(),
+    com um SAVEPOINT por pedido, de modo que a falha de um pedido desfaz só
+    o que ele gravou. Os resultados são entregues aos Futures depois do
+    COMMIT. Pedidos com agrupar=False (manutenção, cargas em lote) rodam
+    sozinhos e controlam as próprias transações.
+
+    Se a transação não puder ser aberta por banco ocupado (outro processo
+    gravando), o lote é repetido até tentativas_ocupado vezes, com espera
+    crescente a partir de espera_ocupado segundos.
+    """
+
+    def __init__(self, transacao: Callable[[], ContextManager], max_lote: int = 50,
+                 tentativas_ocupado: int = 5, espera_ocupado: float = 0.05):
+        """Inicia a thread de escrita"""
+        if max_lote < 1:
+            raise ValueError("max_lote deve ser positivo")
+
+        self._transacao = transacao
+        self.max_lote = int(max_lote)
+        self.tentativas_ocupado = int(tentativas_ocupado)
+        self.espera_ocupado = float(espera_ocupado)
+
+        self._fila: queue.Queue = queue.Queue()
+        self._adiado = None
+
+        self._metricas_lock = threading.Lock()
+        self._metricas = {
+            'pedidos': 0, 'lotes': 0, 'maior_lote': 0, 'profundidade_max': 0,
+            'espera_total_ms': 0.0, 'espera_max_ms': 0.0, 'execucao_total_ms': 0.0,
+            'tentativas_ocupado': 0, 'falhas_ocupado': 0, 'pedidos_com_erro': 0
+        }
+
+        self._thread = threading.Thread(target=self._executar, name='fila-escrita', daemon=True)
+        self._thread.start()
+
+    def na_thread_de_escrita(self) -> bool:
+        """Indica se o chamador já é a thread de escrita (chamadas aninhadas)"""
+        return threading.current_thread() is self._thread
+
+    def submeter(self, funcao: Callable[[], Any], agrupar: bool = True) -> Future:
+        """Enfileira uma escrita e retorna o Future com o seu resultado"""
+        pedido = _Pedido(funcao, agrupar)
+        self._fila.put(pedido)
+
+        profundidade = self._fila.qsize()
+        with self._metricas_lock:
+            self._metricas['profundidade_max'] = max(self._metricas['profundidade_max'], profundidade)
+        return pedido.futuro
+
+    def _proximo_lote(self) -> List[_Pedido]:
+        """Aguarda um pedido e junta os que já estão na fila (sem esperar por mais)"""
+        primeiro, self._adiado = self._adiado, None
+        if primeiro is None:
+            primeiro = self._fila.get()
+        if primeiro is None or not primeiro.agrupar:
+            return [primeiro]
+
+        lote = [primeiro]
+        while len(lote) < self.max_lote:
+            try:
+                pedido = self._fila.get_nowait()
+            except queue.Empty:
+                break
+            if pedido is None or not pedido.agrupar:
+                self._adiado = pedido
+                break
+            lote.append(pedido)
+        return lote
+
+    def _executar(self):
+        """Laço da thread de escrita (termina ao receber None)"""
+        while True:
+            lote = self._proximo_lote()
+            if lote[0] is None:
+                break
+
+            inicio = time.perf_counter()
+            esperas = [(inicio - pedido.enfileirado_em) * 1000 for pedido in lote]
+            if lote[0].agrupar:
+                self._gravar_lote(lote)
+            else:
+                self._gravar_sozinho(lote[0])
+
+            with self._metricas_lock:
+                metricas = self._metricas
+                metricas['pedidos'] += len(lote)
+                metricas['lotes'] += 1
+                metricas['maior_lote'] = max(metricas['maior_lote'], len(lote))
+                metricas['espera_total_ms'] += sum(esperas)
+                metricas['espera_max_ms'] = max(metricas['espera_max_ms'], max(esperas))
+                metricas['execucao_total_ms'] += (time.perf_counter() - inicio) * 1000
+
+    def _gravar_sozinho(self, pedido: _Pedido):
+        """Executa um pedido fora de lote"""
+        try:
+            pedido.futuro.set_result(pedido.funcao())
+        except Exception as erro:
+            self._contar('pedidos_com_erro')
+            pedido.futuro.set_exception(erro)
+
+    def _gravar_lote(self, lote: List[_Pedido]):
+        """Executa o lote em uma transação, repetindo se o banco estiver ocupado"""
+        for tentativa in range(self.tentativas_ocupado + 1):
+            resultados = []
+            iniciada = False
+            try:
+                with self._transacao() as conn:
+                    iniciada = True
+                    for pedido in lote:
+                        conn.execute("SAVEPOINT pedido_fila")
+                        try:
+                            resultado = pedido.funcao()
+                        except Exception as erro:
+                            conn.execute("ROLLBACK TO pedido_fila")
+                            conn.execute("RELEASE pedido_fila")
+                            resultados.append((pedido, None, erro))
+                        else:
+                            conn.execute("RELEASE pedido_fila")
+                            resultados.append((pedido, resultado, None))
+            except Exception as erro:
+                # Só é seguro repetir se a transação nem chegou a ser aberta
+                if not iniciada and _ocupado(erro) and tentativa < self.tentativas_ocupado:
+                    self._contar('tentativas_ocupado')
+                    time.sleep(self.espera_ocupado * 2 ** tentativa)
+                    continue
+                if _ocupado(erro):
+                    self._contar('falhas_ocupado')
+                for pedido in lote:
+                    pedido.futuro.set_exception(erro)
+                return
+
+            for pedido, resultado, erro in resultados:
+                if erro is not None:
+                    self._contar('pedidos_com_erro')
+                    pedido.futuro.set_exception(erro)
+                else:
+                    pedido.futuro.set_result(resultado)
+            return
+
+    def _contar(self, chave: str):
+        """Incrementa um contador das métricas"""
+        with self._metricas_lock:
+            self._metricas[chave] += 1
+
+    def metricas(self) -> Dict[str, Any]:
+        """Retorna profundidade da fila, tamanho dos lotes, esperas e repetições por ocupado"""
+        with self._metricas_lock:
+            metricas = dict(self._metricas)
+
+        pedidos, lotes = metricas['pedidos'], metricas['lotes']
+        metricas['profundidade_atual'] = self._fila.qsize()
+        metricas['media_lote'] = pedidos / lotes if lotes else 0.0
+        metricas['espera_media_ms'] = metricas.pop('espera_total_ms') / pedidos if pedidos else 0.0
+        metricas['execucao_media_ms'] = metricas.pop('execucao_total_ms') / lotes if lotes else 0.0
+        return metricas
+
+    def fechar(self):
+        """Grava os pedidos já enfileirados e encerra a thread"""
+        self._fila.put(None)
+        self._thread.join()
+
+
+def escrita_enfileirada(metodo=None, *, agrupar: bool = True):
+    """Decorador para métodos de escrita do gerenciador.
+
+    Com a fila ativa (self._fila), a chamada é executada pela thread de
+    escrita e o chamador aguarda o resultado; exceções são repassadas a ele.
+    Sem fila, ou quando já está na thread de escrita, chama direto.
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envoltorio(self, *args, **kwargs):
+            fila = getattr(self, '_fila', None)
+            if fila is None or fila.na_thread_de_escrita():
+                return funcao(self, *args, **kwargs)
+            return fila.submeter(functools.partial(funcao, self, *args, **kwargs), agrupar).result()
+
+        return envoltorio
+
+    return decorador(metodo) if metodo is not None else decorador
@@ -0,0 +1,97 @@
+"""
+Comandos de manutenção do banco de dados
+
+Uso:
+    python -m database.manutencao resumos [--inicio AAAA-MM-DD] [--fim AAAA-MM-DD]
+    python -m database.manutencao contadores [--verificar]
+    python -m database.manutencao indice-busca [--completo]
+    python -m database.manutencao arquivar [--dias N] [--lote N]
+    python -m database.manutencao compactar [--paginas N] [--completo]
+"""
+import argparse
+import sys
+import time
+
+from . import criar_gerenciador
+from .backend import BackendArmazenamento
+from .db_manager import DatabaseManager
+
+
+def _resumos(db: BackendArmazenamento, args) -> str:
+    """Recalcula os resumos diários de ocorrências"""
+    linhas = db.reconstruir_resumos_ocorrencias(args.inicio, args.fim)
+    return f"{linhas} linha(s) de resumo diário gravadas"
+
+
+def _contadores(db: BackendArmazenamento, args) -> str:
+    """Verifica (e por padrão corrige) a tabela contadores"""
+    divergencias = db.verificar_contadores(corrigir=not args.verificar)
+    for chave, (gravado, real) in sorted(divergencias.items()):
+        print(f"  {chave}: gravado={gravado} real={real}")
+    acao = "encontrada(s)" if args.verificar else "corrigida(s)"
+    return f"{len(divergencias)} divergência(s) {acao}"
+
+
+def _indice_busca(db: BackendArmazenamento, args) -> str:
+    """Indexa no FTS as anotações pendentes (ou refaz o índice)"""
+    indexadas = db.reconstruir_indice_busca(completo=args.completo)
+    return f"{indexadas} anotação(ões) indexada(s)"
+
+
+def _arquivar(db: BackendArmazenamento, args) -> str:
+    """Move as ocorrências fechadas antigas para o banco de arquivo"""
+    arquivadas = db.arquivar_ocorrencias(args.dias, args.lote)
+    return f"{arquivadas} ocorrência(s) arquivada(s) em {db.arquivo_path}"
+
+
+def _compactar(db: BackendArmazenamento, args) -> str:
+    """Devolve as páginas livres do banco principal ao disco"""
+    paginas = db.compactar_banco(args.paginas, completo=args.completo)
+    return f"{paginas} página(s) liberada(s)"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m database.manutencao",
+                                     description="Manutenção do banco de dados do sistema de gestão")
+    parser.add_argument("--banco", help="Caminho de um arquivo SQLite (padrão: backend de BANCO_DADOS['backend'])")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    resumos = comandos.add_parser("resumos", help="Recalcula os resumos diários de ocorrências")
+    resumos.add_argument("--inicio", help="Primeiro dia do intervalo (AAAA-MM-DD)")
+    resumos.add_argument("--fim", help="Último dia do intervalo (AAAA-MM-DD)")
+    resumos.set_defaults(executar=_resumos)
+
+    contadores = comandos.add_parser("contadores", help="Confere a tabela contadores")
+    contadores.add_argument("--verificar", action="store_true", help="Apenas lista as divergências")
+    contadores.set_defaults(executar=_contadores)
+
+    indice = comandos.add_parser("indice-busca", help="Atualiza o índice de busca das anotações")
+    indice.add_argument("--completo", action="store_true", help="Refaz o índice do zero")
+    indice.set_defaults(executar=_indice_busca)
+
+    arquivar = comandos.add_parser("arquivar", help="Arquiva ocorrências fechadas antigas")
+    arquivar.add_argument("--dias", type=int, help="Retenção em dias (padrão: ARQUIVAMENTO['dias_retencao'])")
+    arquivar.add_argument("--lote", type=int, help="Ocorrências por transação (padrão: ARQUIVAMENTO['tamanho_lote'])")
+    arquivar.set_defaults(executar=_arquivar)
+
+    compactar = comandos.add_parser("compactar", help="Libera as páginas vazias do banco principal")
+    compactar.add_argument("--paginas", type=int, help="Máximo de páginas a liberar (padrão: todas)")
+    compactar.add_argument("--completo", action="store_true",
+                           help="VACUUM completo (necessário uma vez em bancos antigos)")
+    compactar.set_defaults(executar=_compactar)
+
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.banco) if args.banco else criar_gerenciador()
+    try:
+        inicio = time.perf_counter()
+        mensagem = args.executar(db, args)
+        print(f"{mensagem} em {time.perf_counter() - inicio:.2f}s")
+    finally:
+        db.fechar()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
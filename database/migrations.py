@@ -0,0 +1,271 @@
+"""
+Migrações versionadas do schema
+Cada migração é aplicada uma única vez, controlada por PRAGMA user_version
+"""
+import json
+import sqlite3
+from typing import Callable, List, Tuple, Union
+from .models import (ALL_SCHEMAS, SCHEMA_METADADOS, SCHEMA_ANOTACOES_FTS,
+                     TRIGGERS_ANOTACOES_FTS, SCHEMA_ACOES, INDICES_ACOES,
+                     SCHEMA_ANOTACAO_TAGS, INDICES_TAGS, TRIGGERS_TAGS,
+                     SCHEMA_CONTADORES, CONSULTA_CONTADORES, TRIGGERS_CONTADORES,
+                     SCHEMA_OCORRENCIAS_DIARIAS, SCHEMA_OCORRENCIAS_FLUXO,
+                     CONSULTA_OCORRENCIAS_DIARIAS, CONSULTA_OCORRENCIAS_FLUXO,
+                     TRIGGERS_OCORRENCIAS_DIARIAS, SCHEMA_COLUNAS_EPOCH,
+                     COLUNAS_OCORRENCIAS, TRIGGERS_ARQUIVAMENTO)
+
+# Passo de migração: comando SQL ou função que recebe a conexão
+Passo = Union[str, Callable[[sqlite3.Connection], None]]
+
+
+INDICES_CONSULTAS = [
+    # listar_ocorrencias: filtros por status/severidade/tipo ordenados por data
+    """CREATE INDEX IF NOT EXISTS idx_ocorrencias_data
+       ON ocorrencias (data_ocorrencia DESC)""",
+    """CREATE INDEX IF NOT EXISTS idx_ocorrencias_status_data
+       ON ocorrencias (status, data_ocorrencia DESC)""",
+    """CREATE INDEX IF NOT EXISTS idx_ocorrencias_severidade_data
+       ON ocorrencias (severidade, data_ocorrencia DESC)""",
+    """CREATE INDEX IF NOT EXISTS idx_ocorrencias_tipo_data
+       ON ocorrencias (tipo, data_ocorrencia DESC)""",
+    # Cobre as contagens por status/severidade sem tocar na tabela
+    """CREATE INDEX IF NOT EXISTS idx_ocorrencias_status_severidade_tipo
+       ON ocorrencias (status, severidade, tipo)""",
+
+    # listar_anotacoes: arquivada + categoria ordenadas por data_modificacao
+    """CREATE INDEX IF NOT EXISTS idx_anotacoes_arquivada_data
+       ON anotacoes (arquivada, data_modificacao DESC)""",
+    """CREATE INDEX IF NOT EXISTS idx_anotacoes_arquivada_categoria_data
+       ON anotacoes (arquivada, categoria, data_modificacao DESC)""",
+    """CREATE INDEX IF NOT EXISTS idx_anotacoes_categoria
+       ON anotacoes (categoria)""",
+
+    # buscar_atas_por_periodo / listar_atas
+    """CREATE INDEX IF NOT EXISTS idx_atas_data_reuniao
+       ON atas_reuniao (data_reuniao DESC)""",
+]
+
+INDICES_PARCIAIS = [
+    # obter_ocorrencias_criticas_abertas (banner de alerta em todas as execuções)
+    """CREATE INDEX IF NOT EXISTS idx_ocorrencias_criticas_abertas
+       ON ocorrencias (severidade, status, data_ocorrencia DESC)
+       WHERE severidade = 'crítica' AND status IN ('aberta', 'em análise')""",
+    # Ocorrências ainda não fechadas (estatísticas e alertas)
+    """CREATE INDEX IF NOT EXISTS idx_ocorrencias_nao_fechadas
+       ON ocorrencias (status)
+       WHERE status != 'fechada'""",
+]
+
+# Índices de ordenação em ordem crescente: percorridos de trás para frente
+# entregam (data DESC, id DESC) sem ordenação extra, como exige a paginação
+# por keyset com desempate pelo id.
+INDICES_PAGINACAO = [
+    "DROP INDEX IF EXISTS idx_ocorrencias_data",
+    "DROP INDEX IF EXISTS idx_ocorrencias_status_data",
+    "DROP INDEX IF EXISTS idx_ocorrencias_severidade_data",
+    "DROP INDEX IF EXISTS idx_ocorrencias_tipo_data",
+    "DROP INDEX IF EXISTS idx_anotacoes_arquivada_data",
+    "DROP INDEX IF EXISTS idx_anotacoes_arquivada_categoria_data",
+    "DROP INDEX IF EXISTS idx_atas_data_reuniao",
+    "CREATE INDEX idx_ocorrencias_data ON ocorrencias (data_ocorrencia)",
+    "CREATE INDEX idx_ocorrencias_status_data ON ocorrencias (status, data_ocorrencia)",
+    "CREATE INDEX idx_ocorrencias_severidade_data ON ocorrencias (severidade, data_ocorrencia)",
+    "CREATE INDEX idx_ocorrencias_tipo_data ON ocorrencias (tipo, data_ocorrencia)",
+    "CREATE INDEX idx_anotacoes_arquivada_data ON anotacoes (arquivada, data_modificacao)",
+    """CREATE INDEX idx_anotacoes_arquivada_categoria_data
+       ON anotacoes (arquivada, categoria, data_modificacao)""",
+    "CREATE INDEX idx_atas_data_reuniao ON atas_reuniao (data_reuniao)",
+]
+
+# Os índices de data passam a usar as colunas *_epoch (ver models.py); os
+# antigos, sobre o texto, são descartados
+INDICES_EPOCH = [
+    "DROP INDEX IF EXISTS idx_ocorrencias_data",
+    "DROP INDEX IF EXISTS idx_ocorrencias_status_data",
+    "DROP INDEX IF EXISTS idx_ocorrencias_severidade_data",
+    "DROP INDEX IF EXISTS idx_ocorrencias_tipo_data",
+    "DROP INDEX IF EXISTS idx_ocorrencias_criticas_abertas",
+    "DROP INDEX IF EXISTS idx_anotacoes_arquivada_data",
+    "DROP INDEX IF EXISTS idx_anotacoes_arquivada_categoria_data",
+    "DROP INDEX IF EXISTS idx_atas_data_reuniao",
+    "CREATE INDEX idx_ocorrencias_data ON ocorrencias (data_ocorrencia_epoch)",
+    "CREATE INDEX idx_ocorrencias_status_data ON ocorrencias (status, data_ocorrencia_epoch)",
+    "CREATE INDEX idx_ocorrencias_severidade_data ON ocorrencias (severidade, data_ocorrencia_epoch)",
+    "CREATE INDEX idx_ocorrencias_tipo_data ON ocorrencias (tipo, data_ocorrencia_epoch)",
+    """CREATE INDEX idx_ocorrencias_criticas_abertas
+       ON ocorrencias (severidade, status, data_ocorrencia_epoch)
+       WHERE severidade = 'crítica' AND status IN ('aberta', 'em análise')""",
+    "CREATE INDEX idx_anotacoes_arquivada_data ON anotacoes (arquivada, data_modificacao_epoch)",
+    """CREATE INDEX idx_anotacoes_arquivada_categoria_data
+       ON anotacoes (arquivada, categoria, data_modificacao_epoch)""",
+    "CREATE INDEX idx_atas_data_reuniao ON atas_reuniao (data_reuniao_epoch)",
+]
+
+
+def _agendar_indexacao_fts(conn: sqlite3.Connection):
+    """Marca as anotações existentes para indexação incremental no FTS.
+
+    As linhas novas já entram pelo trigger; as antigas (id <= alvo) são
+    indexadas em lotes por DatabaseManager.reconstruir_indice_busca.
+    """
+    alvo = conn.execute("SELECT MAX(id) FROM anotacoes").fetchone()[0]
+    if alvo:
+        conn.executemany(
+            "INSERT OR REPLACE INTO metadados (chave, valor) VALUES (?, ?)",
+            [('fts_anotacoes_ultimo_id', '0'), ('fts_anotacoes_alvo', str(alvo))]
+        )
+
+
+def _migrar_acoes_json(conn: sqlite3.Connection):
+    """Copia as ações do JSON de atas_reuniao.acoes para a tabela acoes"""
+    rows = conn.execute("""
+        SELECT id, acoes FROM atas_reuniao
+        WHERE acoes IS NOT NULL AND acoes NOT IN ('', '[]')
+        ORDER BY id
+    """).fetchall()
+
+    for ata_id, acoes_json in rows:
+        try:
+            acoes = json.loads(acoes_json)
+        except ValueError:
+            continue
+
+        conn.executemany("""
+            INSERT INTO acoes (ata_id, descricao, responsavel, prazo, concluida)
+            VALUES (?, ?, ?, ?, ?)
+        """, [
+            (ata_id, acao.get('descricao', ''), acao.get('responsavel'),
+             acao.get('prazo') or None, 1 if acao.get('concluida', False) else 0)
+            for acao in acoes if isinstance(acao, dict)
+        ])
+
+    # A tabela passa a ser a única fonte; o JSON antigo não é mais mantido
+    conn.execute("UPDATE atas_reuniao SET acoes = NULL WHERE acoes IS NOT NULL")
+
+
+def _migrar_tags_json(conn: sqlite3.Connection):
+    """Popula tags e anotacao_tags a partir do JSON de anotacoes.tags"""
+    rows = conn.execute("""
+        SELECT id, tags FROM anotacoes
+        WHERE tags IS NOT NULL AND tags NOT IN ('', '[]')
+    """).fetchall()
+
+    for anotacao_id, tags_json in rows:
+        try:
+            tags = json.loads(tags_json)
+        except ValueError:
+            continue
+
+        nomes = [str(tag).strip() for tag in tags if str(tag).strip()]
+        conn.executemany("INSERT OR IGNORE INTO tags (nome) VALUES (?)", [(nome,) for nome in nomes])
+        conn.execute("""
+            INSERT OR IGNORE INTO anotacao_tags (anotacao_id, tag_id)
+            SELECT ?, id FROM tags WHERE nome IN (SELECT value FROM json_each(?))
+        """, (anotacao_id, json.dumps(nomes)))
+
+
+def tem_arquivo(conn: sqlite3.Connection) -> bool:
+    """Indica se o banco de arquivo está anexado e já tem a tabela de ocorrências"""
+    anexado = conn.execute("SELECT 1 FROM pragma_database_list WHERE name = 'arquivo'").fetchone()
+    return bool(anexado) and conn.execute(
+        "SELECT 1 FROM arquivo.sqlite_master WHERE name = 'ocorrencias_arquivo'"
+    ).fetchone() is not None
+
+
+def recalcular_resumos_ocorrencias(conn: sqlite3.Connection, data_inicio: str = '0000-01-01',
+                                   data_fim: str = '9999-12-31') -> int:
+    """Refaz os resumos diários de ocorrências no intervalo de dias (inclusivo).
+
+    Deve rodar dentro de uma transação de escrita. Com o arquivo anexado,
+    as ocorrências arquivadas também entram na contagem. Retorna o número de
+    linhas gravadas em ocorrencias_diarias.
+    """
+    origem = "ocorrencias"
+    if tem_arquivo(conn):
+        origem = f"""(
+            SELECT {COLUNAS_OCORRENCIAS} FROM main.ocorrencias
+            UNION ALL
+            SELECT {COLUNAS_OCORRENCIAS} FROM arquivo.ocorrencias_arquivo
+        )"""
+    intervalo = (data_inicio, data_fim)
+    conn.execute("DELETE FROM ocorrencias_diarias WHERE dia BETWEEN ? AND ?", intervalo)
+    conn.execute("DELETE FROM ocorrencias_fluxo_diario WHERE dia BETWEEN ? AND ?", intervalo)
+    cursor = conn.execute(f"""
+        INSERT INTO ocorrencias_diarias (dia, tipo, severidade, status, quantidade)
+        {CONSULTA_OCORRENCIAS_DIARIAS.format(origem=origem)}
+    """, intervalo)
+    conn.execute(f"""
+        INSERT INTO ocorrencias_fluxo_diario (dia, abertas, fechadas)
+        {CONSULTA_OCORRENCIAS_FLUXO.format(origem=origem)}
+    """, intervalo)
+    return cursor.rowcount
+
+
+# (versão, descrição, passos) — sempre em ordem crescente de versão
+MIGRACOES: List[Tuple[int, str, List[Passo]]] = [
+    (1, "Schema inicial", ALL_SCHEMAS),
+    (2, "Índices compostos para listagens e filtros", INDICES_CONSULTAS),
+    (3, "Índices parciais para predicados frequentes", INDICES_PARCIAIS + ["ANALYZE"]),
+    (4, "Busca textual FTS5 das anotações",
+     [SCHEMA_METADADOS, SCHEMA_ANOTACOES_FTS] + TRIGGERS_ANOTACOES_FTS + [_agendar_indexacao_fts]),
+    (5, "Tabela acoes normalizada a partir do JSON das atas",
+     [SCHEMA_ACOES] + INDICES_ACOES + [_migrar_acoes_json]),
+    (6, "Tags normalizadas com contagem mantida por triggers",
+     ["ALTER TABLE tags ADD COLUMN total INTEGER NOT NULL DEFAULT 0", SCHEMA_ANOTACAO_TAGS]
+     + INDICES_TAGS + TRIGGERS_TAGS + [_migrar_tags_json]),
+    (7, "Índices de ordenação compatíveis com paginação por keyset", INDICES_PAGINACAO),
+    (8, "Contadores mantidos por triggers para obter_estatisticas",
+     [SCHEMA_CONTADORES, f"INSERT INTO contadores (chave, valor) {CONSULTA_CONTADORES}"]
+     + TRIGGERS_CONTADORES),
+    # Ocorrências já fechadas antes desta versão ficam sem data_fechamento
+    # (a data real não foi registrada) e não entram em 'fechadas'
+    (9, "Resumos diários de ocorrências mantidos por triggers",
+     ["ALTER TABLE ocorrencias ADD COLUMN data_fechamento TIMESTAMP",
+      SCHEMA_OCORRENCIAS_DIARIAS, SCHEMA_OCORRENCIAS_FLUXO]
+     + TRIGGERS_OCORRENCIAS_DIARIAS + [recalcular_resumos_ocorrencias]),
+    (10, "Colunas de data em epoch com índices para filtros e ordenação",
+     SCHEMA_COLUNAS_EPOCH + INDICES_EPOCH + ["ANALYZE"]),
+    (11, "Arquivamento de ocorrências preserva os resumos diários", TRIGGERS_ARQUIVAMENTO),
+]
+
+
+def versao_atual(conn: sqlite3.Connection) -> int:
+    """Retorna a versão do schema gravada no banco"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def aplicar_migracoes(conn: sqlite3.Connection) -> List[int]:
+    """Aplica as migrações pendentes e retorna as versões aplicadas.
+
+    Cada migração roda em sua própria transação junto com a atualização de
+    user_version, portanto uma falha não deixa o schema pela metade. A
+    conexão deve estar em modo autocommit (isolation_level=None).
+    """
+    aplicadas = []
+    versao = versao_atual(conn)
+
+    for numero, descricao, passos in MIGRACOES:
+        if numero <= versao:
+            continue
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Outra conexão pode ter migrado enquanto aguardávamos o lock
+            if versao_atual(conn) >= numero:
+                conn.execute("COMMIT")
+                continue
+
+            for passo in passos:
+                if callable(passo):
+                    passo(conn)
+                else:
+                    conn.execute(passo)
+
+            conn.execute(f"PRAGMA user_version = {int(numero)}")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        aplicadas.append(numero)
+
+    return aplicadas
@@ -1,6 +1,11 @@
 """
-Definição dos schemas das tabelas do banco de dados
+Definição dos schemas das tabelas do banco de dados e dos registros lidos delas
+Estes schemas formam a migração 1; alterações posteriores ficam em migrations.py
 """
+import copy
+import json
+import sys
+from collections.abc import MutableMapping
 
 SCHEMA_ANOTACOES = """
 CREATE TABLE IF NOT EXISTS anotacoes (
@@ -42,7 +47,7 @@ CREATE TABLE IF NOT EXISTS atas_reuniao (
     pauta TEXT,
     discussoes TEXT,
     decisoes TEXT,
-    acoes TEXT,
+    acoes TEXT,  -- legado: migrado para a tabela acoes (migração 5)
     proxima_reuniao DATE,
     data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 )
@@ -62,4 +67,712 @@ ALL_SCHEMAS = [
     SCHEMA_OCORRENCIAS,
     SCHEMA_ATAS,
     SCHEMA_TAGS
-]
\ No newline at end of file
+]
+
+# ==================== BUSCA TEXTUAL (FTS5) ====================
+
+SCHEMA_METADADOS = """
+CREATE TABLE IF NOT EXISTS metadados (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+)
+"""
+
+# Índice externo: o texto fica apenas em anotacoes, o FTS guarda só os termos.
+# remove_diacritics 2 faz "ação" e "acao" gerarem o mesmo termo.
+SCHEMA_ANOTACOES_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS anotacoes_fts USING fts5(
+    titulo,
+    conteudo,
+    content='anotacoes',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+)
+"""
+
+# A remoção só é enviada ao FTS se a linha já foi indexada (docsize), o que
+# mantém o índice íntegro enquanto a indexação inicial ainda está em andamento.
+TRIGGERS_ANOTACOES_FTS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS anotacoes_fts_ai AFTER INSERT ON anotacoes BEGIN
+        INSERT INTO anotacoes_fts (rowid, titulo, conteudo)
+        VALUES (new.id, new.titulo, new.conteudo);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS anotacoes_fts_ad AFTER DELETE ON anotacoes BEGIN
+        INSERT INTO anotacoes_fts (anotacoes_fts, rowid, titulo, conteudo)
+        SELECT 'delete', old.id, old.titulo, old.conteudo
+        WHERE EXISTS (SELECT 1 FROM anotacoes_fts_docsize WHERE id = old.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS anotacoes_fts_au AFTER UPDATE OF titulo, conteudo ON anotacoes BEGIN
+        INSERT INTO anotacoes_fts (anotacoes_fts, rowid, titulo, conteudo)
+        SELECT 'delete', old.id, old.titulo, old.conteudo
+        WHERE EXISTS (SELECT 1 FROM anotacoes_fts_docsize WHERE id = old.id);
+        INSERT INTO anotacoes_fts (rowid, titulo, conteudo)
+        VALUES (new.id, new.titulo, new.conteudo);
+    END
+    """
+]
+
+
+# ==================== AÇÕES DAS ATAS ====================
+
+SCHEMA_ACOES = """
+CREATE TABLE IF NOT EXISTS acoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ata_id INTEGER NOT NULL REFERENCES atas_reuniao(id) ON DELETE CASCADE,
+    descricao TEXT NOT NULL,
+    responsavel TEXT,
+    prazo DATE,
+    concluida INTEGER DEFAULT 0,
+    data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+INDICES_ACOES = [
+    "CREATE INDEX IF NOT EXISTS idx_acoes_ata ON acoes (ata_id)",
+    "CREATE INDEX IF NOT EXISTS idx_acoes_concluida_prazo ON acoes (concluida, prazo)",
+    "CREATE INDEX IF NOT EXISTS idx_acoes_responsavel ON acoes (responsavel)"
+]
+
+
+# ==================== TAGS DAS ANOTAÇÕES ====================
+
+SCHEMA_ANOTACAO_TAGS = """
+CREATE TABLE IF NOT EXISTS anotacao_tags (
+    anotacao_id INTEGER NOT NULL REFERENCES anotacoes(id) ON DELETE CASCADE,
+    tag_id INTEGER NOT NULL REFERENCES tags(id) ON DELETE CASCADE,
+    PRIMARY KEY (anotacao_id, tag_id)
+) WITHOUT ROWID
+"""
+
+INDICES_TAGS = [
+    "CREATE INDEX IF NOT EXISTS idx_anotacao_tags_tag ON anotacao_tags (tag_id, anotacao_id)",
+    "CREATE INDEX IF NOT EXISTS idx_tags_total ON tags (total DESC, nome)"
+]
+
+# tags.total acompanha o número de anotações ligadas a cada tag
+TRIGGERS_TAGS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS anotacao_tags_ai AFTER INSERT ON anotacao_tags BEGIN
+        UPDATE tags SET total = total + 1 WHERE id = new.tag_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS anotacao_tags_ad AFTER DELETE ON anotacao_tags BEGIN
+        UPDATE tags SET total = total - 1 WHERE id = old.tag_id;
+    END
+    """
+]
+
+
+# ==================== CONTADORES ====================
+
+SCHEMA_CONTADORES = """
+CREATE TABLE IF NOT EXISTS contadores (
+    chave TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID
+"""
+
+# Valores reais dos contadores calculados a partir das tabelas
+# (carga inicial e verificação de divergências)
+CONSULTA_CONTADORES = """
+SELECT 'anotacoes_ativas', COUNT(*) FROM anotacoes WHERE arquivada = 0
+UNION ALL
+SELECT 'anotacoes_arquivadas', COUNT(*) FROM anotacoes WHERE arquivada = 1
+UNION ALL
+SELECT 'ocorrencias_total', COUNT(*) FROM ocorrencias
+UNION ALL
+SELECT 'ocorrencias_abertas', COUNT(*) FROM ocorrencias WHERE status != 'fechada'
+UNION ALL
+SELECT 'ocorrencias_status:' || COALESCE(status, ''), COUNT(*) FROM ocorrencias GROUP BY status
+UNION ALL
+SELECT 'ocorrencias_severidade:' || COALESCE(severidade, ''), COUNT(*) FROM ocorrencias GROUP BY severidade
+UNION ALL
+SELECT 'atas_total', COUNT(*) FROM atas_reuniao
+"""
+
+TRIGGERS_CONTADORES = [
+    # Anotações: ativas x arquivadas
+    """
+    CREATE TRIGGER IF NOT EXISTS contadores_anotacoes_ai AFTER INSERT ON anotacoes BEGIN
+        UPDATE contadores SET valor = valor + 1
+        WHERE chave = CASE new.arquivada WHEN 1 THEN 'anotacoes_arquivadas'
+                                         WHEN 0 THEN 'anotacoes_ativas' END;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contadores_anotacoes_ad AFTER DELETE ON anotacoes BEGIN
+        UPDATE contadores SET valor = valor - 1
+        WHERE chave = CASE old.arquivada WHEN 1 THEN 'anotacoes_arquivadas'
+                                         WHEN 0 THEN 'anotacoes_ativas' END;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contadores_anotacoes_au AFTER UPDATE OF arquivada ON anotacoes
+    WHEN old.arquivada IS NOT new.arquivada BEGIN
+        UPDATE contadores SET valor = valor - 1
+        WHERE chave = CASE old.arquivada WHEN 1 THEN 'anotacoes_arquivadas'
+                                         WHEN 0 THEN 'anotacoes_ativas' END;
+        UPDATE contadores SET valor = valor + 1
+        WHERE chave = CASE new.arquivada WHEN 1 THEN 'anotacoes_arquivadas'
+                                         WHEN 0 THEN 'anotacoes_ativas' END;
+    END
+    """,
+
+    # Ocorrências: total, abertas, por status e por severidade
+    """
+    CREATE TRIGGER IF NOT EXISTS contadores_ocorrencias_ai AFTER INSERT ON ocorrencias BEGIN
+        UPDATE contadores SET valor = valor + 1 WHERE chave = 'ocorrencias_total';
+        UPDATE contadores SET valor = valor + 1
+        WHERE chave = 'ocorrencias_abertas' AND new.status != 'fechada';
+        INSERT INTO contadores (chave, valor) VALUES ('ocorrencias_status:' || COALESCE(new.status, ''), 1)
+        ON CONFLICT (chave) DO UPDATE SET valor = valor + 1;
+        INSERT INTO contadores (chave, valor) VALUES ('ocorrencias_severidade:' || COALESCE(new.severidade, ''), 1)
+        ON CONFLICT (chave) DO UPDATE SET valor = valor + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contadores_ocorrencias_ad AFTER DELETE ON ocorrencias BEGIN
+        UPDATE contadores SET valor = valor - 1 WHERE chave = 'ocorrencias_total';
+        UPDATE contadores SET valor = valor - 1
+        WHERE chave = 'ocorrencias_abertas' AND old.status != 'fechada';
+        UPDATE contadores SET valor = valor - 1
+        WHERE chave = 'ocorrencias_status:' || COALESCE(old.status, '');
+        UPDATE contadores SET valor = valor - 1
+        WHERE chave = 'ocorrencias_severidade:' || COALESCE(old.severidade, '');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contadores_ocorrencias_au AFTER UPDATE OF status, severidade ON ocorrencias
+    WHEN old.status IS NOT new.status OR old.severidade IS NOT new.severidade BEGIN
+        UPDATE contadores
+        SET valor = valor - (CASE WHEN old.status != 'fechada' THEN 1 ELSE 0 END)
+                          + (CASE WHEN new.status != 'fechada' THEN 1 ELSE 0 END)
+        WHERE chave = 'ocorrencias_abertas';
+        UPDATE contadores SET valor = valor - 1
+        WHERE chave = 'ocorrencias_status:' || COALESCE(old.status, '');
+        INSERT INTO contadores (chave, valor) VALUES ('ocorrencias_status:' || COALESCE(new.status, ''), 1)
+        ON CONFLICT (chave) DO UPDATE SET valor = valor + 1;
+        UPDATE contadores SET valor = valor - 1
+        WHERE chave = 'ocorrencias_severidade:' || COALESCE(old.severidade, '');
+        INSERT INTO contadores (chave, valor) VALUES ('ocorrencias_severidade:' || COALESCE(new.severidade, ''), 1)
+        ON CONFLICT (chave) DO UPDATE SET valor = valor + 1;
+    END
+    """,
+
+    # Atas
+    """
+    CREATE TRIGGER IF NOT EXISTS contadores_atas_ai AFTER INSERT ON atas_reuniao BEGIN
+        UPDATE contadores SET valor = valor + 1 WHERE chave = 'atas_total';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contadores_atas_ad AFTER DELETE ON atas_reuniao BEGIN
+        UPDATE contadores SET valor = valor - 1 WHERE chave = 'atas_total';
+    END
+    """
+]
+
+
+# ==================== RESUMOS DIÁRIOS DE OCORRÊNCIAS ====================
+
+# Dia de referência de uma ocorrência ({0} = new, old ou a própria tabela)
+_DIA_OCORRENCIA = "COALESCE(date({0}.data_ocorrencia), date({0}.data_registro), date('now', 'localtime'))"
+
+SCHEMA_OCORRENCIAS_DIARIAS = """
+CREATE TABLE IF NOT EXISTS ocorrencias_diarias (
+    dia TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    severidade TEXT NOT NULL,
+    status TEXT NOT NULL,
+    quantidade INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, tipo, severidade, status)
+) WITHOUT ROWID
+"""
+
+SCHEMA_OCORRENCIAS_FLUXO = """
+CREATE TABLE IF NOT EXISTS ocorrencias_fluxo_diario (
+    dia TEXT PRIMARY KEY,
+    abertas INTEGER NOT NULL DEFAULT 0,
+    fechadas INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID
+"""
+
+# Recalculam os resumos a partir de ocorrencias (carga inicial e reconstrução);
+# os parâmetros são o intervalo de dias, inclusivo. {origem} é a tabela ou
+# a união com o arquivo (ORIGEM_OCORRENCIAS_COM_ARQUIVO)
+CONSULTA_OCORRENCIAS_DIARIAS = f"""
+SELECT {_DIA_OCORRENCIA.format('ocorrencias')} AS dia, COALESCE(tipo, ''),
+       COALESCE(severidade, ''), COALESCE(status, ''), COUNT(*)
+FROM {{origem}} AS ocorrencias
+WHERE dia BETWEEN ? AND ?
+GROUP BY 1, 2, 3, 4
+"""
+
+CONSULTA_OCORRENCIAS_FLUXO = f"""
+SELECT dia, SUM(abertas), SUM(fechadas) FROM (
+    SELECT {_DIA_OCORRENCIA.format('ocorrencias')} AS dia, 1 AS abertas, 0 AS fechadas
+    FROM {{origem}} AS ocorrencias
+    UNION ALL
+    SELECT date(data_fechamento), 0, 1 FROM {{origem}} WHERE data_fechamento IS NOT NULL
+)
+WHERE dia BETWEEN ? AND ?
+GROUP BY dia
+"""
+
+
+def _somar_diaria(linha: str, delta: int) -> str:
+    """Comando de trigger que soma delta na linha (dia, dimensões) de new/old"""
+    return f"""
+        INSERT INTO ocorrencias_diarias (dia, tipo, severidade, status, quantidade)
+        VALUES ({_DIA_OCORRENCIA.format(linha)}, COALESCE({linha}.tipo, ''),
+                COALESCE({linha}.severidade, ''), COALESCE({linha}.status, ''), {delta})
+        ON CONFLICT (dia, tipo, severidade, status) DO UPDATE SET quantidade = quantidade + {delta};"""
+
+
+def _somar_fluxo(dia: str, coluna: str, delta: int, condicao: str = "1") -> str:
+    """Comando de trigger que soma delta em abertas/fechadas de um dia"""
+    return f"""
+        INSERT INTO ocorrencias_fluxo_diario (dia, {coluna})
+        SELECT {dia}, {delta} WHERE {condicao}
+        ON CONFLICT (dia) DO UPDATE SET {coluna} = {coluna} + {delta};"""
+
+
+def _limpar_diaria(linha: str) -> str:
+    """Remove a linha de ocorrencias_diarias de new/old se zerou"""
+    return f"""
+        DELETE FROM ocorrencias_diarias
+        WHERE dia = {_DIA_OCORRENCIA.format(linha)} AND tipo = COALESCE({linha}.tipo, '')
+          AND severidade = COALESCE({linha}.severidade, '') AND status = COALESCE({linha}.status, '')
+          AND quantidade <= 0;"""
+
+
+def _limpar_fluxo(dia: str) -> str:
+    """Remove o dia de ocorrencias_fluxo_diario se não restou movimento"""
+    return f"""
+        DELETE FROM ocorrencias_fluxo_diario WHERE dia = {dia} AND abertas <= 0 AND fechadas <= 0;"""
+
+
+# Retira new/old dos resumos (exclusão de ocorrência)
+_REMOVER_DOS_RESUMOS = f"""
+        {_somar_diaria('old', -1)}
+        {_somar_fluxo(_DIA_OCORRENCIA.format('old'), 'abertas', -1)}
+        {_somar_fluxo('date(old.data_fechamento)', 'fechadas', -1, 'old.data_fechamento IS NOT NULL')}
+        {_limpar_diaria('old')}
+        {_limpar_fluxo(_DIA_OCORRENCIA.format('old'))}
+        {_limpar_fluxo('date(old.data_fechamento)')}"""
+
+
+TRIGGERS_OCORRENCIAS_DIARIAS = [
+    # data_fechamento acompanha as mudanças de status para/de 'fechada'
+    """
+    CREATE TRIGGER IF NOT EXISTS ocorrencias_fechamento_ai AFTER INSERT ON ocorrencias
+    WHEN new.status = 'fechada' AND new.data_fechamento IS NULL BEGIN
+        UPDATE ocorrencias SET data_fechamento = datetime('now', 'localtime') WHERE id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ocorrencias_fechamento_au AFTER UPDATE OF status ON ocorrencias
+    WHEN (old.status = 'fechada') IS NOT (new.status = 'fechada') BEGIN
+        UPDATE ocorrencias
+        SET data_fechamento = CASE WHEN new.status = 'fechada' THEN datetime('now', 'localtime') END
+        WHERE id = new.id;
+    END
+    """,
+
+    # Contagem por dia x tipo x severidade x status
+    f"""
+    CREATE TRIGGER IF NOT EXISTS ocorrencias_diarias_ai AFTER INSERT ON ocorrencias BEGIN
+        {_somar_diaria('new', 1)}
+        {_somar_fluxo(_DIA_OCORRENCIA.format('new'), 'abertas', 1)}
+        {_somar_fluxo('date(new.data_fechamento)', 'fechadas', 1, 'new.data_fechamento IS NOT NULL')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS ocorrencias_diarias_ad AFTER DELETE ON ocorrencias BEGIN
+        {_REMOVER_DOS_RESUMOS}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS ocorrencias_diarias_au
+    AFTER UPDATE OF data_ocorrencia, tipo, severidade, status ON ocorrencias
+    WHEN old.data_ocorrencia IS NOT new.data_ocorrencia OR old.tipo IS NOT new.tipo
+      OR old.severidade IS NOT new.severidade OR old.status IS NOT new.status BEGIN
+        {_somar_diaria('old', -1)}
+        {_somar_diaria('new', 1)}
+        {_somar_fluxo(_DIA_OCORRENCIA.format('old'), 'abertas', -1)}
+        {_somar_fluxo(_DIA_OCORRENCIA.format('new'), 'abertas', 1)}
+        {_limpar_diaria('old')}
+        {_limpar_fluxo(_DIA_OCORRENCIA.format('old'))}
+    END
+    """,
+    # Abertas x fechadas por dia (fechadas pelo dia de data_fechamento)
+    f"""
+    CREATE TRIGGER IF NOT EXISTS ocorrencias_fluxo_au AFTER UPDATE OF data_fechamento ON ocorrencias
+    WHEN old.data_fechamento IS NOT new.data_fechamento BEGIN
+        {_somar_fluxo('date(old.data_fechamento)', 'fechadas', -1, 'old.data_fechamento IS NOT NULL')}
+        {_somar_fluxo('date(new.data_fechamento)', 'fechadas', 1, 'new.data_fechamento IS NOT NULL')}
+        {_limpar_fluxo('date(old.data_fechamento)')}
+    END
+    """
+]
+
+# ==================== DATAS EM EPOCH ====================
+# As datas são gravadas como texto em dois formatos ('2026-01-05T10:00:00.123'
+# de datetime.isoformat() e '2026-01-05 10:00:00' de CURRENT_TIMESTAMP), que
+# não se comparam corretamente como strings. Colunas geradas (VIRTUAL, sem
+# custo de armazenamento) expõem os segundos desde 1970 do valor gravado,
+# sem conversão de fuso, e são indexadas para filtros e ordenação.
+
+EPOCH = "CAST(strftime('%s', {}) AS INTEGER)"
+
+COLUNAS_EPOCH = [
+    ('anotacoes', 'data_criacao_epoch', 'data_criacao'),
+    ('anotacoes', 'data_modificacao_epoch', 'data_modificacao'),
+    # Sem data_ocorrencia, vale o registro (mesma regra dos resumos diários)
+    ('ocorrencias', 'data_ocorrencia_epoch', 'COALESCE(data_ocorrencia, data_registro)'),
+    ('ocorrencias', 'data_registro_epoch', 'data_registro'),
+    ('atas_reuniao', 'data_reuniao_epoch', 'data_reuniao'),
+    ('atas_reuniao', 'data_criacao_epoch', 'data_criacao'),
+]
+
+SCHEMA_COLUNAS_EPOCH = [
+    f"ALTER TABLE {tabela} ADD COLUMN {coluna} INTEGER GENERATED ALWAYS AS ({EPOCH.format(origem)}) VIRTUAL"
+    for tabela, coluna, origem in COLUNAS_EPOCH
+]
+
+
+# ==================== ARQUIVO DE OCORRÊNCIAS ====================
+# Ocorrências fechadas há mais tempo que a retenção saem da tabela quente para
+# ocorrencias_arquivo, em um arquivo SQLite anexado às conexões como 'arquivo'.
+# As tabelas do arquivo não têm triggers: os resumos diários preservam o
+# histórico e as contagens de contadores refletem só a tabela quente.
+
+COLUNAS_OCORRENCIAS = ("id, tipo, descricao, severidade, status, data_ocorrencia, data_registro, "
+                       "responsavel, solucao, anexos, data_fechamento")
+
+SCHEMA_OCORRENCIAS_ARQUIVO = [
+    f"""
+    CREATE TABLE IF NOT EXISTS arquivo.ocorrencias_arquivo (
+        id INTEGER PRIMARY KEY,
+        tipo TEXT NOT NULL,
+        descricao TEXT NOT NULL,
+        severidade TEXT,
+        status TEXT,
+        data_ocorrencia TIMESTAMP,
+        data_registro TIMESTAMP,
+        responsavel TEXT,
+        solucao TEXT,
+        anexos TEXT,
+        data_fechamento TIMESTAMP,
+        data_arquivamento TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        data_ocorrencia_epoch INTEGER GENERATED ALWAYS AS
+            ({EPOCH.format('COALESCE(data_ocorrencia, data_registro)')}) VIRTUAL,
+        data_registro_epoch INTEGER GENERATED ALWAYS AS ({EPOCH.format('data_registro')}) VIRTUAL
+    )
+    """,
+    """CREATE INDEX IF NOT EXISTS arquivo.idx_ocorrencias_arquivo_data
+       ON ocorrencias_arquivo (data_ocorrencia_epoch)""",
+    """CREATE INDEX IF NOT EXISTS arquivo.idx_ocorrencias_arquivo_status_data
+       ON ocorrencias_arquivo (status, data_ocorrencia_epoch)""",
+]
+
+# Leitura com o arquivo: mesma forma de SELECT * FROM ocorrencias, com a
+# coluna arquivada indicando a origem de cada linha
+ORIGEM_OCORRENCIAS_COM_ARQUIVO = f"""(
+    SELECT {COLUNAS_OCORRENCIAS}, data_ocorrencia_epoch, data_registro_epoch, 0 AS arquivada
+    FROM main.ocorrencias
+    UNION ALL
+    SELECT {COLUNAS_OCORRENCIAS}, data_ocorrencia_epoch, data_registro_epoch, 1 AS arquivada
+    FROM arquivo.ocorrencias_arquivo
+)"""
+
+# A exclusão feita pelo arquivamento (marcada em metadados dentro da mesma
+# transação) não retira a ocorrência dos resumos diários
+TRIGGERS_ARQUIVAMENTO = [
+    "DROP TRIGGER IF EXISTS ocorrencias_diarias_ad",
+    f"""
+    CREATE TRIGGER ocorrencias_diarias_ad AFTER DELETE ON ocorrencias
+    WHEN NOT EXISTS (SELECT 1 FROM metadados WHERE chave = 'arquivando') BEGIN
+        {_REMOVER_DOS_RESUMOS}
+    END
+    """
+]
+
+
+# ==================== REGISTROS ====================
+
+COLUNAS_ANOTACOES = ("id, titulo, conteudo, categoria, tags, prioridade, arquivada, "
+                     "data_criacao, data_modificacao")
+COLUNAS_ATAS = ("id, titulo, data_reuniao, horario_inicio, horario_fim, participantes, pauta, "
+                "discussoes, decisoes, proxima_reuniao, data_criacao")
+
+# Ações de cada ata agregadas em JSON na própria linha (coluna acoes)
+ACOES_DA_ATA_JSON = """(
+    SELECT json_group_array(json_object(
+               'id', c.id, 'ata_id', c.ata_id, 'descricao', c.descricao,
+               'responsavel', c.responsavel, 'prazo', c.prazo,
+               'concluida', json(CASE WHEN c.concluida THEN 'true' ELSE 'false' END),
+               'data_criacao', c.data_criacao))
+    FROM (SELECT * FROM acoes WHERE ata_id = {0}.id ORDER BY id) c
+)"""
+
+
+class _CampoJson:
+    """Coluna JSON de um registro: guarda o texto e decodifica no primeiro acesso.
+
+    O valor fica no slot '_<campo>'; NULL e texto vazio viram lista vazia.
+    """
+
+    def __set_name__(self, dono, nome):
+        self.slot = dono.__dict__[f'_{nome}']
+
+    def __get__(self, registro, dono=None):
+        if registro is None:
+            return self
+        valor = self.slot.__get__(registro)
+        if valor is None or isinstance(valor, str):
+            valor = json.loads(valor) if valor else []
+            self.slot.__set__(registro, valor)
+        return valor
+
+    def __set__(self, registro, valor):
+        self.slot.__set__(registro, valor)
+
+
+class Registro(MutableMapping):
+    """Linha lida do banco com __slots__ e interface de dict.
+
+    As páginas continuam usando registro['campo'], .get() e 'in'; chaves
+    fora de CAMPOS (colunas extras da consulta ou atribuídas depois) ficam
+    em um dict criado só quando necessário. Colunas JSON são decodificadas
+    apenas quando lidas, e cópias (inclusive as do cache) não decodificam.
+    """
+
+    __slots__ = ('_extras',)
+
+    CAMPOS = ()
+    CAMPOS_JSON = ()
+
+    @classmethod
+    def fabrica(cls, cursor, row):
+        """row_factory do sqlite3: monta o registro direto da tupla da linha"""
+        registro = cls(*row[:len(cls.CAMPOS)])
+        if len(row) > len(cls.CAMPOS):
+            registro._extras = {
+                descricao[0]: valor
+                for descricao, valor in zip(cursor.description[len(cls.CAMPOS):], row[len(cls.CAMPOS):])
+            }
+        return registro
+
+    def __getitem__(self, chave):
+        if chave in self.CAMPOS:
+            return getattr(self, chave)
+        if self._extras is not None and chave in self._extras:
+            return self._extras[chave]
+        raise KeyError(chave)
+
+    def __setitem__(self, chave, valor):
+        if chave in self.CAMPOS:
+            setattr(self, chave, valor)
+        else:
+            if self._extras is None:
+                self._extras = {}
+            self._extras[chave] = valor
+
+    def __delitem__(self, chave):
+        if chave in self.CAMPOS:
+            raise TypeError(f"O campo {chave} não pode ser removido de {type(self).__name__}")
+        if self._extras is None or chave not in self._extras:
+            raise KeyError(chave)
+        del self._extras[chave]
+
+    def __contains__(self, chave):
+        return chave in self.CAMPOS or (self._extras is not None and chave in self._extras)
+
+    def __iter__(self):
+        yield from self.CAMPOS
+        if self._extras:
+            yield from self._extras
+
+    def __len__(self):
+        return len(self.CAMPOS) + (len(self._extras) if self._extras else 0)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def _valores_brutos(self):
+        """Valores dos slots, com as colunas JSON ainda como texto se não lidas"""
+        return [getattr(self, f'_{campo}' if campo in self.CAMPOS_JSON else campo) for campo in self.CAMPOS]
+
+    def __copy__(self):
+        copia = type(self)(*self._valores_brutos())
+        copia._extras = dict(self._extras) if self._extras is not None else None
+        return copia
+
+    def __deepcopy__(self, memo):
+        copia = type(self)(*copy.deepcopy(self._valores_brutos(), memo))
+        copia._extras = copy.deepcopy(self._extras, memo)
+        return copia
+
+    def __reduce__(self):
+        return (_restaurar, (type(self), self._valores_brutos(), self._extras))
+
+    def __sizeof__(self):
+        # Usado pela estimativa de memória do cache (sys.getsizeof)
+        return (object.__sizeof__(self) + sum(sys.getsizeof(valor) for valor in self._valores_brutos())
+                + (sys.getsizeof(self._extras) if self._extras is not None else 0))
+
+    copy = __copy__
+
+
+def _restaurar(classe, valores, extras):
+    """Reconstrói um registro serializado (pickle)"""
+    registro = classe(*valores)
+    registro._extras = extras
+    return registro
+
+
+class Anotacao(Registro):
+    """Anotação; tags é decodificada no primeiro acesso"""
+
+    CAMPOS = tuple(COLUNAS_ANOTACOES.split(', '))
+    CAMPOS_JSON = ('tags',)
+    __slots__ = ('id', 'titulo', 'conteudo', 'categoria', '_tags', 'prioridade', 'arquivada',
+                 'data_criacao', 'data_modificacao')
+
+    tags = _CampoJson()
+
+    def __init__(self, id, titulo, conteudo, categoria, tags, prioridade, arquivada,
+                 data_criacao, data_modificacao):
+        self.id = id
+        self.titulo = titulo
+        self.conteudo = conteudo
+        self.categoria = categoria
+        self._tags = tags
+        self.prioridade = prioridade
+        self.arquivada = arquivada
+        self.data_criacao = data_criacao
+        self.data_modificacao = data_modificacao
+        self._extras = None
+
+
+class Ocorrencia(Registro):
+    """Ocorrência (sem colunas JSON; 'arquivada' vem como extra quando lida com o arquivo)"""
+
+    CAMPOS = tuple(COLUNAS_OCORRENCIAS.split(', '))
+    __slots__ = ('id', 'tipo', 'descricao', 'severidade', 'status', 'data_ocorrencia', 'data_registro',
+                 'responsavel', 'solucao', 'anexos', 'data_fechamento')
+
+    def __init__(self, id, tipo, descricao, severidade, status, data_ocorrencia, data_registro,
+                 responsavel, solucao, anexos, data_fechamento):
+        self.id = id
+        self.tipo = tipo
+        self.descricao = descricao
+        self.severidade = severidade
+        self.status = status
+        self.data_ocorrencia = data_ocorrencia
+        self.data_registro = data_registro
+        self.responsavel = responsavel
+        self.solucao = solucao
+        self.anexos = anexos
+        self.data_fechamento = data_fechamento
+        self._extras = None
+
+
+class Ata(Registro):
+    """Ata de reunião; participantes e acoes são decodificadas no primeiro acesso"""
+
+    CAMPOS = tuple(COLUNAS_ATAS.split(', ')) + ('acoes',)
+    CAMPOS_JSON = ('participantes', 'acoes')
+    __slots__ = ('id', 'titulo', 'data_reuniao', 'horario_inicio', 'horario_fim', '_participantes', 'pauta',
+                 'discussoes', 'decisoes', 'proxima_reuniao', 'data_criacao', '_acoes')
+
+    participantes = _CampoJson()
+    acoes = _CampoJson()
+
+    def __init__(self, id, titulo, data_reuniao, horario_inicio, horario_fim, participantes, pauta,
+                 discussoes, decisoes, proxima_reuniao, data_criacao, acoes):
+        self.id = id
+        self.titulo = titulo
+        self.data_reuniao = data_reuniao
+        self.horario_inicio = horario_inicio
+        self.horario_fim = horario_fim
+        self._participantes = participantes
+        self.pauta = pauta
+        self.discussoes = discussoes
+        self.decisoes = decisoes
+        self.proxima_reuniao = proxima_reuniao
+        self.data_criacao = data_criacao
+        self._acoes = acoes
+        self._extras = None
+
+
+# ==================== RESUMOS ====================
+# Projeções usadas pelos cards das listagens: sem os textos longos, com
+# prévia cortada no SQL e contagens; o detalhe é lido à parte (buscar_*)
+
+TAMANHO_PREVIA = 200
+
+COLUNAS_RESUMO_ANOTACOES = (
+    "id, titulo, substr(conteudo, 1, {0}) AS previa, length(conteudo) > {0} AS previa_cortada, "
+    "categoria, tags, prioridade, arquivada, data_criacao, data_modificacao"
+).format(TAMANHO_PREVIA)
+
+COLUNAS_RESUMO_ATAS = """id, titulo, data_reuniao, horario_inicio, horario_fim, proxima_reuniao, data_criacao,
+    json_array_length(coalesce(nullif(participantes, ''), '[]')) AS total_participantes,
+    (SELECT COUNT(*) FROM acoes WHERE acoes.ata_id = atas_reuniao.id) AS total_acoes,
+    (SELECT COUNT(*) FROM acoes WHERE acoes.ata_id = atas_reuniao.id AND NOT acoes.concluida) AS acoes_pendentes"""
+
+
+class ResumoAnotacao(Registro):
+    """Card de anotação: prévia do conteúdo em vez do texto completo"""
+
+    CAMPOS = ('id', 'titulo', 'previa', 'previa_cortada', 'categoria', 'tags', 'prioridade', 'arquivada',
+              'data_criacao', 'data_modificacao')
+    CAMPOS_JSON = ('tags',)
+    __slots__ = ('id', 'titulo', 'previa', 'previa_cortada', 'categoria', '_tags', 'prioridade', 'arquivada',
+                 'data_criacao', 'data_modificacao')
+
+    tags = _CampoJson()
+
+    def __init__(self, id, titulo, previa, previa_cortada, categoria, tags, prioridade, arquivada,
+                 data_criacao, data_modificacao):
+        self.id = id
+        self.titulo = titulo
+        self.previa = previa
+        self.previa_cortada = previa_cortada
+        self.categoria = categoria
+        self._tags = tags
+        self.prioridade = prioridade
+        self.arquivada = arquivada
+        self.data_criacao = data_criacao
+        self.data_modificacao = data_modificacao
+        self._extras = None
+
+
+class ResumoAta(Registro):
+    """Card de ata: sem pauta/discussões/decisões, com contagens de participantes e ações"""
+
+    CAMPOS = ('id', 'titulo', 'data_reuniao', 'horario_inicio', 'horario_fim', 'proxima_reuniao', 'data_criacao',
+              'total_participantes', 'total_acoes', 'acoes_pendentes')
+    __slots__ = CAMPOS
+
+    def __init__(self, id, titulo, data_reuniao, horario_inicio, horario_fim, proxima_reuniao, data_criacao,
+                 total_participantes, total_acoes, acoes_pendentes):
+        self.id = id
+        self.titulo = titulo
+        self.data_reuniao = data_reuniao
+        self.horario_inicio = horario_inicio
+        self.horario_fim = horario_fim
+        self.proxima_reuniao = proxima_reuniao
+        self.data_criacao = data_criacao
+        self.total_participantes = total_participantes
+        self.total_acoes = total_acoes
+        self.acoes_pendentes = acoes_pendentes
+        self._extras = None
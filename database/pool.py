@@ -0,0 +1,219 @@
+"""
+Pool de conexões SQLite
+Conexões de leitura persistentes em número limitado e uma única conexão de escrita
+"""
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, List
+
+from .replica import ReplicaMemoria
+
+
+class ConnectionPool:
+    """Pool thread-safe de conexões SQLite em modo WAL.
+
+    As conexões de leitura ficam abertas e são emprestadas a cada bloco de
+    leitura: no máximo max_leitores existem ao mesmo tempo, e uma thread que
+    não encontra nenhuma livre espera até espera_leitor segundos. Blocos
+    aninhados na mesma thread reaproveitam a conexão já emprestada. Todas as escritas
+    passam por uma única conexão protegida por lock, de modo que os leitores
+    nunca esperam pelo escritor (WAL) e os escritores não disputam o arquivo.
+    Bancos em anexos ({apelido: caminho}) são anexados a todas as conexões.
+    Com ativar_replica as leituras passam a ser atendidas por uma cópia em
+    memória enquanto ela estiver atualizada.
+    """
+
+    SYNCHRONOUS_VALIDOS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+    def __init__(self, db_path: str, busy_timeout: int = 5000, cache_size: int = -20000,
+                 mmap_size: int = 268435456, synchronous: str = 'NORMAL',
+                 anexos: Dict[str, str] = None, max_leitores: int = 8,
+                 espera_leitor: float = 30.0):
+        """Configura o pool (as conexões são abertas sob demanda)"""
+        synchronous = synchronous.upper()
+        if synchronous not in self.SYNCHRONOUS_VALIDOS:
+            raise ValueError(f"synchronous inválido: {synchronous}")
+
+        self.db_path = db_path
+        self.busy_timeout = int(busy_timeout)
+        self.cache_size = int(cache_size)
+        self.mmap_size = int(mmap_size)
+        self.synchronous = synchronous
+        self.anexos = dict(anexos or {})
+        self.max_leitores = max(1, int(max_leitores))
+        self.espera_leitor = float(espera_leitor)
+
+        self._local = threading.local()
+        self._livres: queue.LifoQueue = queue.LifoQueue()
+        self._leitores: List[sqlite3.Connection] = []
+        self._leitores_lock = threading.Lock()
+        self._escritor = None
+        self._escrita_lock = threading.RLock()
+        self.replica = None
+
+    def _abrir_conexao(self) -> sqlite3.Connection:
+        """Abre uma conexão já configurada com os PRAGMAs do pool"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout / 1000,
+            isolation_level=None,  # Transações controladas explicitamente
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        # Só tem efeito em bancos novos; os existentes mudam com um VACUUM
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout}")
+        conn.execute(f"PRAGMA cache_size = {self.cache_size}")
+        conn.execute(f"PRAGMA mmap_size = {self.mmap_size}")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute("PRAGMA foreign_keys = ON")
+        for apelido, caminho in self.anexos.items():
+            conn.execute(f"ATTACH DATABASE ? AS {apelido}", (caminho,))
+            conn.execute(f"PRAGMA {apelido}.journal_mode = WAL")
+            conn.execute(f"PRAGMA {apelido}.synchronous = {self.synchronous}")
+        return conn
+
+    def _retirar_leitor(self) -> sqlite3.Connection:
+        """Retira uma conexão de leitura livre, abrindo outra se o limite permitir"""
+        try:
+            return self._livres.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._leitores_lock:
+            if len(self._leitores) < self.max_leitores:
+                conn = self._abrir_conexao()
+                self._leitores.append(conn)
+                return conn
+
+        try:
+            return self._livres.get(timeout=self.espera_leitor)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"Nenhuma conexão de leitura livre após {self.espera_leitor:g} s "
+                f"(max_leitores = {self.max_leitores})"
+            ) from None
+
+    def _devolver_leitor(self, conn: sqlite3.Connection):
+        """Devolve a conexão ao pool (ou a descarta, se o pool foi fechado)"""
+        with self._leitores_lock:
+            ativa = any(leitor is conn for leitor in self._leitores)
+        if not ativa:
+            conn.close()
+            return
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        self._livres.put(conn)
+
+    @contextmanager
+    def leitor(self):
+        """Empresta uma conexão de leitura do arquivo até o fim do bloco"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+
+        conn = self._retirar_leitor()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._devolver_leitor(conn)
+
+    def ativar_replica(self, intervalo_verificacao: float = 1.0, idade_minima: float = 0.5,
+                       idade_maxima: float = 5.0) -> ReplicaMemoria:
+        """Passa a atender as leituras por uma réplica em memória (ver ReplicaMemoria)"""
+        if self.replica is None:
+            self.replica = ReplicaMemoria(self, intervalo_verificacao, idade_minima, idade_maxima)
+        return self.replica
+
+    @contextmanager
+    def leitura(self):
+        """Fornece um leitor da réplica, se atualizada, ou uma conexão de leitura do arquivo"""
+        if self.replica is not None:
+            with self.replica.leitor() as conn:
+                if conn is not None:
+                    yield conn
+                    return
+
+        with self.leitor() as conn:
+            yield conn
+
+    @contextmanager
+    def escritor(self):
+        """Fornece a conexão de escrita sem abrir transação (manutenção)"""
+        with self._escrita_lock:
+            if self._escritor is None:
+                self._escritor = self._abrir_conexao()
+            try:
+                yield self._escritor
+            finally:
+                if self.replica is not None and not self._escritor.in_transaction:
+                    self.replica.marcar_escrita()
+
+    @contextmanager
+    def escrita(self):
+        """Fornece a conexão de escrita dentro de uma transação.
+
+        A transação é iniciada com BEGIN IMMEDIATE, confirmada ao final do
+        bloco e desfeita se ocorrer qualquer exceção. Blocos aninhados na
+        mesma thread participam da transação já aberta.
+        """
+        with self.escritor() as conn:
+            if conn.in_transaction:
+                yield conn
+                return
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            else:
+                conn.execute("COMMIT")
+                # Antes de o chamador invalidar o cache: nenhuma leitura pode
+                # guardar o resultado da réplica ainda sem esta escrita
+                if self.replica is not None:
+                    self.replica.marcar_escrita()
+
+    @staticmethod
+    def em_transacao(conn: sqlite3.Connection) -> bool:
+        """Indica se há uma transação aberta na conexão"""
+        return conn.in_transaction
+
+    def configuracao(self) -> Dict[str, Any]:
+        """Retorna os PRAGMAs efetivos de uma conexão do pool"""
+        with self.leitor() as conn:
+            return {
+                'journal_mode': conn.execute("PRAGMA journal_mode").fetchone()[0],
+                'busy_timeout': conn.execute("PRAGMA busy_timeout").fetchone()[0],
+                'cache_size': conn.execute("PRAGMA cache_size").fetchone()[0],
+                'mmap_size': conn.execute("PRAGMA mmap_size").fetchone()[0],
+                'synchronous': conn.execute("PRAGMA synchronous").fetchone()[0],
+                'auto_vacuum': conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+            }
+
+    def fechar(self):
+        """Fecha todas as conexões abertas pelo pool"""
+        if self.replica is not None:
+            self.replica.fechar()
+            self.replica = None
+
+        # Conexões emprestadas no momento são fechadas ao serem devolvidas
+        with self._leitores_lock:
+            self._leitores.clear()
+            while True:
+                try:
+                    self._livres.get_nowait().close()
+                except queue.Empty:
+                    break
+
+        with self._escrita_lock:
+            if self._escritor is not None:
+                self._escritor.close()
+                self._escritor = None
@@ -0,0 +1,315 @@
+"""
+Réplica de leitura em memória
+Cópia do banco (e dos anexos) feita pela API de backup do SQLite e renovada
+quando o PRAGMA data_version do arquivo indica alterações
+"""
+import itertools
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+
+# Nomes únicos para os bancos em memória de cada geração
+_SEQUENCIA = itertools.count(1)
+
+
+def _uri(sequencia: int, esquema: str) -> str:
+    """URI do banco em memória de uma geração"""
+    return f"file:gestao_replica_{sequencia}_{esquema}?mode=memory&cache=shared"
+
+
+class _Geracao:
+    """Uma cópia em memória e as conexões de leitura abertas sobre ela.
+
+    As âncoras (uma por banco copiado) mantêm os bancos em memória vivos;
+    os leitores são conexões próprias de cada consulta, abertas pela URI
+    compartilhada e reaproveitadas até max_leitores. Depois de encerrada,
+    a geração fecha cada leitor na devolução, e a memória é liberada
+    quando o último deles fecha.
+    """
+
+    def __init__(self, sequencia: int, anexos: Tuple[str, ...], ancoras: List[sqlite3.Connection],
+                 max_leitores: int):
+        self.sequencia = sequencia
+        self.anexos = anexos
+        self.max_leitores = max_leitores
+        self._ancoras = ancoras
+        self._livres: List[sqlite3.Connection] = []
+        self._abertos = 0
+        self._encerrada = False
+        self._lock = threading.Lock()
+
+    def _abrir_leitor(self) -> sqlite3.Connection:
+        """Abre uma conexão só de leitura nos bancos em memória da geração"""
+        conn = sqlite3.connect(_uri(self.sequencia, 'main'), uri=True,
+                               isolation_level=None, check_same_thread=False)
+        try:
+            conn.row_factory = sqlite3.Row
+            for apelido in self.anexos:
+                conn.execute(f"ATTACH DATABASE ? AS {apelido}", (_uri(self.sequencia, apelido),))
+            conn.execute("PRAGMA query_only = ON")
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    def retirar(self) -> Optional[sqlite3.Connection]:
+        """Retira um leitor livre, ou None se a geração foi encerrada ou está no limite"""
+        with self._lock:
+            if self._encerrada:
+                return None
+            if self._livres:
+                return self._livres.pop()
+            if self._abertos >= self.max_leitores:
+                return None
+            self._abertos += 1
+
+        try:
+            return self._abrir_leitor()
+        except BaseException:
+            with self._lock:
+                self._abertos -= 1
+            raise
+
+    def devolver(self, conn: sqlite3.Connection):
+        """Devolve o leitor (ou o fecha, se a geração já foi encerrada)"""
+        with self._lock:
+            if not self._encerrada:
+                self._livres.append(conn)
+                return
+            self._abertos -= 1
+        conn.close()
+
+    def abertos(self) -> int:
+        """Leitores abertos nesta geração (livres e emprestados)"""
+        with self._lock:
+            return self._abertos
+
+    def encerrar(self):
+        """Fecha as âncoras e os leitores livres; os emprestados fecham na devolução"""
+        with self._lock:
+            self._encerrada = True
+            livres, self._livres = self._livres, []
+            self._abertos -= len(livres)
+            ancoras, self._ancoras = self._ancoras, []
+
+        for conn in livres + ancoras:
+            conn.close()
+
+
+class ReplicaMemoria:
+    """Réplica em memória que atende as leituras enquanto estiver atualizada.
+
+    Cada geração da réplica é um conjunto de bancos em memória compartilhados
+    (cache=shared). Cada leitura recebe uma conexão própria sobre eles (só
+    de leitura, PRAGMA query_only), com no máximo max_leitores por geração;
+    sem leitor livre, a leitura vai para o arquivo. Consultas simultâneas
+    não esperam umas pelas outras, mas o SQLite ainda serializa o acesso às
+    páginas de um mesmo banco em cache compartilhado. Uma thread em segundo
+    plano consulta o PRAGMA data_version a cada intervalo_verificacao
+    segundos e, se o arquivo mudou, monta uma nova geração por backup e
+    encerra a anterior; leituras em andamento nela terminam normalmente.
+
+    Limites de defasagem:
+    - escritas feitas por este processo (marcar_escrita) desviam as leituras
+      para o arquivo até a próxima cópia, então a aplicação sempre lê o que
+      acabou de gravar;
+    - alterações de outros processos são vistas em até idade_maxima
+      segundos: passado esse tempo sem confirmação, a réplica só atende se o
+      data_version não mudou;
+    - idade_minima é o intervalo mínimo entre duas cópias, para agrupar
+      escritas em rajada.
+
+    Durante a troca há duas cópias em memória ao mesmo tempo.
+    """
+
+    def __init__(self, pool, intervalo_verificacao: float = 1.0, idade_minima: float = 0.5,
+                 idade_maxima: float = 5.0):
+        """Faz a primeira cópia e inicia a thread de atualização"""
+        self._pool = pool
+        self.intervalo_verificacao = float(intervalo_verificacao)
+        self.idade_minima = float(idade_minima)
+        self.idade_maxima = float(idade_maxima)
+
+        # Conexões no arquivo: origem dos backups e sonda do data_version
+        # (o data_version é relativo à conexão, então a sonda é sempre a mesma)
+        self._origem = pool._abrir_conexao()
+        self._sonda = pool._abrir_conexao()
+        self._sonda_lock = threading.Lock()
+        self._atualizacao_lock = threading.Lock()
+
+        self.max_leitores = pool.max_leitores
+        self._atual: Optional[_Geracao] = None
+        self._geracao = 0
+        self._versao_copiada: Tuple[int, ...] = ()
+        self._verificada_em = 0.0
+        self._atualizada_em = 0.0
+        self._escritas = 0
+        self._escritas_copiadas = 0
+
+        self._metricas_lock = threading.Lock()
+        self._metricas = {
+            'atualizacoes': 0, 'duracao_total_ms': 0.0, 'ultima_duracao_ms': 0.0,
+            'max_duracao_ms': 0.0, 'leituras_replica': 0, 'leituras_disco': 0,
+            'falhas': 0, 'ultimo_erro': None
+        }
+
+        self.atualizar()
+
+        self._parar = threading.Event()
+        self._acordar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name='replica-memoria', daemon=True)
+        self._thread.start()
+
+    def _versao_disco(self) -> Tuple[int, ...]:
+        """data_version do banco principal e de cada anexo"""
+        with self._sonda_lock:
+            return tuple(
+                self._sonda.execute(f"PRAGMA {esquema}.data_version").fetchone()[0]
+                for esquema in ('main', *self._pool.anexos)
+            )
+
+    def atualizar(self) -> float:
+        """Copia o arquivo para uma nova geração em memória e a publica.
+
+        Retorna a duração da cópia em segundos.
+        """
+        with self._atualizacao_lock:
+            inicio = time.perf_counter()
+            # Lidos antes da cópia: uma escrita concorrente apenas provoca
+            # uma cópia extra, nunca uma réplica dada como atual sem ela
+            escritas = self._escritas
+            verificada_em = time.monotonic()
+            versao = self._versao_disco()
+
+            sequencia = next(_SEQUENCIA)
+            ancoras = []
+            # Uma transação de leitura na origem faz o principal e os anexos
+            # saírem do mesmo instante (snapshot WAL fixado na primeira leitura)
+            self._origem.execute("BEGIN")
+            try:
+                for esquema in ('main', *self._pool.anexos):
+                    self._origem.execute(f"SELECT COUNT(*) FROM {esquema}.sqlite_master").fetchone()
+
+                # Cada banco vai para um banco em memória compartilhado, que
+                # os leitores da geração abrem pelo mesmo nome
+                for esquema in ('main', *self._pool.anexos):
+                    ancora = sqlite3.connect(_uri(sequencia, esquema), uri=True, check_same_thread=False)
+                    ancoras.append(ancora)
+                    self._origem.backup(ancora, name=esquema)
+            except BaseException:
+                for ancora in ancoras:
+                    ancora.close()
+                raise
+            finally:
+                self._origem.execute("COMMIT")
+
+            anterior = self._atual
+            self._atual = _Geracao(sequencia, tuple(self._pool.anexos), ancoras, self.max_leitores)
+            self._geracao += 1
+            self._versao_copiada = versao
+            self._escritas_copiadas = escritas
+            self._verificada_em = self._atualizada_em = verificada_em
+            if anterior is not None:
+                anterior.encerrar()
+
+            duracao = time.perf_counter() - inicio
+            with self._metricas_lock:
+                self._metricas['atualizacoes'] += 1
+                self._metricas['duracao_total_ms'] += duracao * 1000
+                self._metricas['ultima_duracao_ms'] = duracao * 1000
+                self._metricas['max_duracao_ms'] = max(self._metricas['max_duracao_ms'], duracao * 1000)
+            return duracao
+
+    def _desatualizada(self) -> bool:
+        """Indica se o arquivo tem alterações que a réplica ainda não copiou"""
+        return self._escritas != self._escritas_copiadas or self._versao_disco() != self._versao_copiada
+
+    def _executar(self):
+        """Laço da thread de atualização"""
+        while not self._parar.is_set():
+            self._acordar.wait(self.intervalo_verificacao)
+            self._acordar.clear()
+            if self._parar.is_set():
+                break
+
+            try:
+                if not self._desatualizada():
+                    self._verificada_em = time.monotonic()
+                    continue
+
+                espera = self.idade_minima - (time.monotonic() - self._atualizada_em)
+                if espera > 0 and self._parar.wait(espera):
+                    break
+                self.atualizar()
+            except Exception as erro:
+                # Sem cópia nova as leituras voltam ao arquivo após idade_maxima
+                with self._metricas_lock:
+                    self._metricas['falhas'] += 1
+                    self._metricas['ultimo_erro'] = repr(erro)
+
+    def marcar_escrita(self):
+        """Registra uma escrita confirmada no arquivo por este processo.
+
+        Até a próxima cópia as leituras vão para o arquivo; a thread de
+        atualização é acordada imediatamente.
+        """
+        self._escritas += 1
+        self._acordar.set()
+
+    def _atende(self) -> bool:
+        """Indica se a réplica pode atender uma leitura agora"""
+        atende = self._atual is not None and self._escritas == self._escritas_copiadas
+        if atende and time.monotonic() - self._verificada_em > self.idade_maxima:
+            # A thread de atualização está atrasada: confere a versão agora
+            if self._versao_disco() == self._versao_copiada:
+                self._verificada_em = time.monotonic()
+            else:
+                atende = False
+                self._acordar.set()
+        return atende
+
+    @contextmanager
+    def leitor(self):
+        """Empresta um leitor da réplica, ou fornece None quando ela não pode atender"""
+        geracao = self._atual if self._atende() else None
+        conn = geracao.retirar() if geracao is not None else None
+
+        with self._metricas_lock:
+            self._metricas['leituras_replica' if conn is not None else 'leituras_disco'] += 1
+
+        if conn is None:
+            yield None
+            return
+        try:
+            yield conn
+        finally:
+            geracao.devolver(conn)
+
+    def metricas(self) -> Dict[str, Any]:
+        """Retorna contagens e tempos das cópias e a idade da réplica"""
+        with self._metricas_lock:
+            metricas = dict(self._metricas)
+
+        atualizacoes = metricas['atualizacoes']
+        metricas['media_duracao_ms'] = metricas.pop('duracao_total_ms') / atualizacoes if atualizacoes else 0.0
+        metricas['geracao'] = self._geracao
+        atual = self._atual
+        metricas['leitores_abertos'] = atual.abertos() if atual is not None else 0
+        metricas['idade_s'] = time.monotonic() - self._atualizada_em
+        metricas['pendente'] = self._escritas != self._escritas_copiadas
+        return metricas
+
+    def fechar(self):
+        """Para a thread de atualização e fecha as conexões da réplica"""
+        self._parar.set()
+        self._acordar.set()
+        self._thread.join()
+
+        with self._atualizacao_lock:
+            if self._atual is not None:
+                self._atual.encerrar()
+                self._atual = None
+            self._origem.close()
+            self._sonda.close()
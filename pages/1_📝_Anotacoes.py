@@ -3,9 +3,11 @@ Módulo de Anotações
 Gerenciamento completo de anotações com tags, categorias e busca
 """
 import streamlit as st
-from utils.components import exibir_logo_sidebar, exibir_assinatura_footer
+from utils.components import (exibir_logo_sidebar, exibir_assinatura_footer,
+                               carregar_pagina, exibir_navegacao, exibir_exportacao, INTERVALO_PAINEIS,
+                               reexecutar_fragmento)
 from auth import login_simples, exibir_info_usuario
-from database import DatabaseManager
+from database import criar_gerenciador
 from utils import formatar_data, emoji_prioridade, confirmar_acao
 from datetime import datetime
 
@@ -22,7 +24,7 @@ if not login_simples():
 # Inicializar banco
 @st.cache_resource
 def get_db():
-    return DatabaseManager()
+    return criar_gerenciador()
 
 db = get_db()
 
@@ -74,6 +76,148 @@ exibir_info_usuario()
 
 st.markdown("---")
 
+# Regiões que se atualizam sozinhas (st.fragment)
+@st.fragment(run_every=INTERVALO_PAINEIS)
+def exibir_estatisticas():
+    """Estatísticas da barra lateral"""
+    stats = db.obter_estatisticas()
+    st.metric("Total de Anotações", stats['total_anotacoes'])
+    st.metric("Arquivadas", stats['anotacoes_arquivadas'])
+
+
+# Cada card é um fragmento: abrir a edição ou a confirmação reexecuta só o
+# card; salvar, arquivar e excluir mudam a listagem e recarregam a página
+@st.fragment
+def exibir_card_anotacao(anotacao):
+    """Card de uma anotação com as ações de edição"""
+    with st.container():
+        # Card da anotação
+        col1, col2 = st.columns([5, 1])
+        
+        with col1:
+            # Título com emoji de prioridade
+            st.markdown(
+                f"<div class='titulo-anotacao'>"
+                f"{emoji_prioridade(anotacao['prioridade'])} {anotacao['titulo']}"
+                f"</div>",
+                unsafe_allow_html=True
+            )
+        
+        with col2:
+            # Badge de categoria
+            st.markdown(
+                f"<span class='tag-badge'>{anotacao['categoria']}</span>",
+                unsafe_allow_html=True
+            )
+        
+        # Conteúdo (prévia cortada na consulta)
+        if anotacao['previa']:
+            preview = anotacao['previa']
+            if anotacao['previa_cortada']:
+                preview += "..."
+            st.markdown(preview)
+        
+        # Tags
+        if anotacao['tags']:
+            st.markdown("**Tags:** " + " ".join([
+                f"<span class='tag-badge'>{tag}</span>" 
+                for tag in anotacao['tags']
+            ]), unsafe_allow_html=True)
+        
+        # Informações adicionais
+        col1, col2, col3, col4, col5 = st.columns([2, 2, 1, 1, 1])
+        
+        with col1:
+            st.caption(f"📅 Criado: {formatar_data(anotacao['data_criacao'])}")
+        
+        with col2:
+            st.caption(f"✏️ Modificado: {formatar_data(anotacao['data_modificacao'])}")
+        
+        # Botões de ação
+        with col3:
+            if st.button("✏️", key=f"edit_{anotacao['id']}", help="Editar"):
+                st.session_state[f'editando_{anotacao["id"]}'] = True
+                reexecutar_fragmento()
+        
+        with col4:
+            icone_arquivo = "📂" if anotacao['arquivada'] else "📦"
+            tooltip = "Desarquivar" if anotacao['arquivada'] else "Arquivar"
+            if st.button(icone_arquivo, key=f"archive_{anotacao['id']}", help=tooltip):
+                db.arquivar_anotacao(anotacao['id'], not anotacao['arquivada'])
+                st.success("✅ Anotação atualizada!")
+                st.rerun()
+        
+        with col5:
+            if st.button("🗑️", key=f"delete_{anotacao['id']}", help="Deletar"):
+                st.session_state[f'confirmar_delete_{anotacao["id"]}'] = True
+                reexecutar_fragmento()
+        
+        # Confirmação de delete
+        if st.session_state.get(f'confirmar_delete_{anotacao["id"]}', False):
+            if confirmar_acao(
+                f"⚠️ Tem certeza que deseja deletar a anotação '{anotacao['titulo']}'?",
+                f"confirma_{anotacao['id']}"
+            ):
+                db.deletar_anotacao(anotacao['id'])
+                st.success("🗑️ Anotação deletada!")
+                del st.session_state[f'confirmar_delete_{anotacao["id"]}']
+                st.rerun()
+        
+        # Modo edição
+        if st.session_state.get(f'editando_{anotacao["id"]}', False):
+            st.markdown("---")
+            # O card só traz a prévia; o conteúdo completo é lido ao editar
+            anotacao = db.buscar_anotacao(anotacao['id'])
+            with st.form(f"form_edit_{anotacao['id']}"):
+                st.subheader("✏️ Editando Anotação")
+                
+                novo_titulo = st.text_input("Título", value=anotacao['titulo'])
+                novo_conteudo = st.text_area("Conteúdo", value=anotacao['conteudo'], height=200)
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    nova_categoria = st.selectbox(
+                        "Categoria",
+                        ["Geral", "Trabalho", "Pessoal", "Estudo", "Ideias", "Projetos", "Outros"],
+                        index=["Geral", "Trabalho", "Pessoal", "Estudo", "Ideias", "Projetos", "Outros"].index(anotacao['categoria']) if anotacao['categoria'] in ["Geral", "Trabalho", "Pessoal", "Estudo", "Ideias", "Projetos", "Outros"] else 0
+                    )
+                
+                with col2:
+                    nova_prioridade = st.select_slider(
+                        "Prioridade",
+                        options=["Baixa", "Média", "Alta"],
+                        value=anotacao['prioridade'].capitalize()
+                    )
+                
+                novas_tags = st.text_input(
+                    "Tags (separadas por vírgula)",
+                    value=", ".join(anotacao['tags']) if anotacao['tags'] else ""
+                )
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    if st.form_submit_button("💾 Salvar Alterações", type="primary", use_container_width=True):
+                        tags_list = [tag.strip() for tag in novas_tags.split(",") if tag.strip()]
+                        db.atualizar_anotacao(
+                            anotacao['id'],
+                            titulo=novo_titulo,
+                            conteudo=novo_conteudo,
+                            categoria=nova_categoria,
+                            tags=tags_list,
+                            prioridade=nova_prioridade.lower()
+                        )
+                        st.success("✅ Anotação atualizada!")
+                        del st.session_state[f'editando_{anotacao["id"]}']
+                        st.rerun()
+                
+                with col2:
+                    if st.form_submit_button("❌ Cancelar", use_container_width=True):
+                        del st.session_state[f'editando_{anotacao["id"]}']
+                        reexecutar_fragmento()
+        
+        st.markdown("---")
+
+
 # Sidebar - Filtros e Ações
 with st.sidebar:
     st.header("🎯 Ações")
@@ -102,6 +246,15 @@ with st.sidebar:
             ["Todas", "Baixa", "Média", "Alta"]
         )
         
+        # Filtro de tag (contagens mantidas pelo banco)
+        nuvem_tags = db.obter_nuvem_tags()
+        contagem_tags = {t['nome']: t['total'] for t in nuvem_tags}
+        filtro_tag = st.selectbox(
+            "Tag:",
+            ["Todas"] + list(contagem_tags.keys()),
+            format_func=lambda t: t if t == "Todas" else f"{t} ({contagem_tags[t]})"
+        )
+        
         # Mostrar arquivadas
         mostrar_arquivadas = st.checkbox("Mostrar arquivadas")
         
@@ -109,9 +262,7 @@ with st.sidebar:
         
         # Estatísticas
         st.subheader("📊 Estatísticas")
-        stats = db.obter_estatisticas()
-        st.metric("Total de Anotações", stats['total_anotacoes'])
-        st.metric("Arquivadas", stats['anotacoes_arquivadas'])
+        exibir_estatisticas()
 
 # ==================== MODO: NOVA ANOTAÇÃO ====================
 if modo == "➕ Nova Anotação":
@@ -183,146 +334,83 @@ elif modo == "📋 Listar Anotações":
     
     # Buscar anotações
     categoria_filtro = None if filtro_categoria == "Todas" else filtro_categoria
-    anotacoes = db.listar_anotacoes(
+    tag_filtro = None if filtro_tag == "Todas" else filtro_tag
+    prioridade_filtro = None if filtro_prioridade == "Todas" else filtro_prioridade
+    pagina = carregar_pagina(
+        db, 'listar_resumos_anotacoes_pagina', 'pagina_anotacoes',
         arquivada=mostrar_arquivadas,
-        categoria=categoria_filtro
+        categoria=categoria_filtro,
+        tag=tag_filtro,
+        prioridade=prioridade_filtro
     )
+    anotacoes = pagina['itens']
     
-    # Filtrar por prioridade
-    if filtro_prioridade != "Todas":
-        anotacoes = [a for a in anotacoes if a['prioridade'].lower() == filtro_prioridade.lower()]
+    exibir_exportacao(
+        db, 'iterar_anotacoes', 'exportacao_anotacoes', 'anotacoes',
+        arquivada=mostrar_arquivadas,
+        categoria=categoria_filtro,
+        tag=tag_filtro,
+        prioridade=prioridade_filtro
+    )
     
     if not anotacoes:
         st.info("📭 Nenhuma anotação encontrada com os filtros selecionados.")
         st.markdown("👉 Use o menu lateral para criar sua primeira anotação!")
     else:
-        st.caption(f"Exibindo {len(anotacoes)} anotação(ões)")
+        st.caption(f"Página {pagina['numero']} - exibindo {len(anotacoes)} anotação(ões)")
+        
+        # Ações em lote: uma única escrita e um único rerun
+        with st.expander("✅ Ações em lote"):
+            todas_filtradas = st.checkbox("Aplicar a todas as anotações dos filtros atuais",
+                                          key='lote_anotacoes_todas')
+            if todas_filtradas:
+                ids_lote = db.listar_ids_anotacoes(mostrar_arquivadas, categoria_filtro,
+                                                   tag_filtro, prioridade_filtro)
+                st.caption(f"{len(ids_lote)} anotação(ões) selecionada(s)")
+            else:
+                rotulos = {a['id']: f"#{a['id']} - {a['titulo']}" for a in anotacoes}
+                ids_lote = st.multiselect("Anotações desta página:", list(rotulos),
+                                          format_func=rotulos.get, key='lote_anotacoes_ids')
+            
+            tags_lote = st.text_input("Tags (separadas por vírgula):", key='lote_anotacoes_tags')
+            tags_lote = [tag.strip() for tag in tags_lote.split(',') if tag.strip()]
+            
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                rotulo_arquivo = "📂 Desarquivar" if mostrar_arquivadas else "📦 Arquivar"
+                if st.button(rotulo_arquivo, key='lote_anotacoes_arquivar',
+                             disabled=not ids_lote, use_container_width=True):
+                    alteradas = db.arquivar_anotacoes_em_lote(ids_lote, not mostrar_arquivadas)
+                    st.success(f"✅ {alteradas} anotação(ões) atualizada(s)!")
+                    st.rerun()
+            
+            with col2:
+                if st.button("🏷️ Adicionar tags", key='lote_anotacoes_add_tags',
+                             disabled=not (ids_lote and tags_lote), use_container_width=True):
+                    alteradas = db.adicionar_tags_em_lote(ids_lote, tags_lote)
+                    st.success(f"✅ {alteradas} anotação(ões) atualizada(s)!")
+                    st.rerun()
+            
+            with col3:
+                if st.button("✂️ Remover tags", key='lote_anotacoes_rem_tags',
+                             disabled=not (ids_lote and tags_lote), use_container_width=True):
+                    alteradas = db.remover_tags_em_lote(ids_lote, tags_lote)
+                    st.success(f"✅ {alteradas} anotação(ões) atualizada(s)!")
+                    st.rerun()
+            
+            with col4:
+                confirmar_lote = st.checkbox("Confirmo a exclusão", key='lote_anotacoes_confirmar')
+                if st.button("🗑️ Excluir", key='lote_anotacoes_excluir',
+                             disabled=not (ids_lote and confirmar_lote), use_container_width=True):
+                    excluidas = db.deletar_anotacoes_em_lote(ids_lote)
+                    st.success(f"🗑️ {excluidas} anotação(ões) excluída(s)!")
+                    st.rerun()
         
         for anotacao in anotacoes:
-            with st.container():
-                # Card da anotação
-                col1, col2 = st.columns([5, 1])
-                
-                with col1:
-                    # Título com emoji de prioridade
-                    st.markdown(
-                        f"<div class='titulo-anotacao'>"
-                        f"{emoji_prioridade(anotacao['prioridade'])} {anotacao['titulo']}"
-                        f"</div>",
-                        unsafe_allow_html=True
-                    )
-                
-                with col2:
-                    # Badge de categoria
-                    st.markdown(
-                        f"<span class='tag-badge'>{anotacao['categoria']}</span>",
-                        unsafe_allow_html=True
-                    )
-                
-                # Conteúdo (preview)
-                if anotacao['conteudo']:
-                    preview = anotacao['conteudo'][:200]
-                    if len(anotacao['conteudo']) > 200:
-                        preview += "..."
-                    st.markdown(preview)
-                
-                # Tags
-                if anotacao['tags']:
-                    st.markdown("**Tags:** " + " ".join([
-                        f"<span class='tag-badge'>{tag}</span>" 
-                        for tag in anotacao['tags']
-                    ]), unsafe_allow_html=True)
-                
-                # Informações adicionais
-                col1, col2, col3, col4, col5 = st.columns([2, 2, 1, 1, 1])
-                
-                with col1:
-                    st.caption(f"📅 Criado: {anotacao['data_criacao'][:16].replace('T', ' ')}")
-                
-                with col2:
-                    st.caption(f"✏️ Modificado: {anotacao['data_modificacao'][:16].replace('T', ' ')}")
-                
-                # Botões de ação
-                with col3:
-                    if st.button("✏️", key=f"edit_{anotacao['id']}", help="Editar"):
-                        st.session_state[f'editando_{anotacao["id"]}'] = True
-                        st.rerun()
-                
-                with col4:
-                    icone_arquivo = "📂" if anotacao['arquivada'] else "📦"
-                    tooltip = "Desarquivar" if anotacao['arquivada'] else "Arquivar"
-                    if st.button(icone_arquivo, key=f"archive_{anotacao['id']}", help=tooltip):
-                        db.arquivar_anotacao(anotacao['id'], not anotacao['arquivada'])
-                        st.success("✅ Anotação atualizada!")
-                        st.rerun()
-                
-                with col5:
-                    if st.button("🗑️", key=f"delete_{anotacao['id']}", help="Deletar"):
-                        st.session_state[f'confirmar_delete_{anotacao["id"]}'] = True
-                        st.rerun()
-                
-                # Confirmação de delete
-                if st.session_state.get(f'confirmar_delete_{anotacao["id"]}', False):
-                    if confirmar_acao(
-                        f"⚠️ Tem certeza que deseja deletar a anotação '{anotacao['titulo']}'?",
-                        f"confirma_{anotacao['id']}"
-                    ):
-                        db.deletar_anotacao(anotacao['id'])
-                        st.success("🗑️ Anotação deletada!")
-                        del st.session_state[f'confirmar_delete_{anotacao["id"]}']
-                        st.rerun()
-                
-                # Modo edição
-                if st.session_state.get(f'editando_{anotacao["id"]}', False):
-                    st.markdown("---")
-                    with st.form(f"form_edit_{anotacao['id']}"):
-                        st.subheader("✏️ Editando Anotação")
-                        
-                        novo_titulo = st.text_input("Título", value=anotacao['titulo'])
-                        novo_conteudo = st.text_area("Conteúdo", value=anotacao['conteudo'], height=200)
-                        
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            nova_categoria = st.selectbox(
-                                "Categoria",
-                                ["Geral", "Trabalho", "Pessoal", "Estudo", "Ideias", "Projetos", "Outros"],
-                                index=["Geral", "Trabalho", "Pessoal", "Estudo", "Ideias", "Projetos", "Outros"].index(anotacao['categoria']) if anotacao['categoria'] in ["Geral", "Trabalho", "Pessoal", "Estudo", "Ideias", "Projetos", "Outros"] else 0
-                            )
-                        
-                        with col2:
-                            nova_prioridade = st.select_slider(
-                                "Prioridade",
-                                options=["Baixa", "Média", "Alta"],
-                                value=anotacao['prioridade'].capitalize()
-                            )
-                        
-                        novas_tags = st.text_input(
-                            "Tags (separadas por vírgula)",
-                            value=", ".join(anotacao['tags']) if anotacao['tags'] else ""
-                        )
-                        
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            if st.form_submit_button("💾 Salvar Alterações", type="primary", use_container_width=True):
-                                tags_list = [tag.strip() for tag in novas_tags.split(",") if tag.strip()]
-                                db.atualizar_anotacao(
-                                    anotacao['id'],
-                                    titulo=novo_titulo,
-                                    conteudo=novo_conteudo,
-                                    categoria=nova_categoria,
-                                    tags=tags_list,
-                                    prioridade=nova_prioridade.lower()
-                                )
-                                st.success("✅ Anotação atualizada!")
-                                del st.session_state[f'editando_{anotacao["id"]}']
-                                st.rerun()
-                        
-                        with col2:
-                            if st.form_submit_button("❌ Cancelar", use_container_width=True):
-                                del st.session_state[f'editando_{anotacao["id"]}']
-                                st.rerun()
-                
-                st.markdown("---")
+            exibir_card_anotacao(anotacao)
+        
+        exibir_navegacao(pagina, 'pagina_anotacoes')
 
 # ==================== MODO: BUSCAR ====================
 elif modo == "🔍 Buscar":
@@ -331,7 +419,8 @@ elif modo == "🔍 Buscar":
     termo_busca = st.text_input(
         "Digite o termo de busca:",
         placeholder="Busque por título ou conteúdo...",
-        help="A busca é feita no título e no conteúdo das anotações"
+        help='A busca é feita no título e no conteúdo das anotações, ignorando acentos. '
+             'Use "aspas" para frases exatas e * para prefixos (ex: manut*)'
     )
     
     if termo_busca:
@@ -341,7 +430,10 @@ elif modo == "🔍 Buscar":
             st.success(f"✅ Encontradas {len(resultados)} anotação(ões)")
             
             for anotacao in resultados:
-                with st.expander(f"{emoji_prioridade(anotacao['prioridade'])} {anotacao['titulo']}"):
+                with st.expander(f"{emoji_prioridade(anotacao['prioridade'])} {anotacao['titulo_destacado']}"):
+                    if anotacao['trecho']:
+                        st.caption(anotacao['trecho'])
+                    
                     st.markdown(f"**Categoria:** {anotacao['categoria']}")
                     st.markdown(f"**Prioridade:** {anotacao['prioridade'].capitalize()}")
                     
@@ -351,7 +443,7 @@ elif modo == "🔍 Buscar":
                     st.markdown("---")
                     st.markdown(anotacao['conteudo'])
                     
-                    st.caption(f"📅 Criado em: {anotacao['data_criacao'][:16].replace('T', ' ')}")
+                    st.caption(f"📅 Criado em: {formatar_data(anotacao['data_criacao'])}")
         else:
             st.warning("⚠️ Nenhuma anotação encontrada com esse termo.")
     else:
@@ -3,15 +3,16 @@ Módulo de Ocorrências
 Gerenciamento completo de ocorrências e incidentes
 """
 import streamlit as st
-from utils.components import exibir_logo_sidebar, exibir_assinatura_footer
+from utils.components import (exibir_logo_sidebar, exibir_assinatura_footer,
+                               carregar_pagina, exibir_navegacao, exibir_exportacao,
+                               editar_tabela, descartar_edicoes, INTERVALO_PAINEIS,
+                               iniciar_cards, registro_do_card, atualizar_card, reexecutar_fragmento,
+                               resultado_do_painel)
 from auth import login_simples, exibir_info_usuario
-from database import DatabaseManager
+from database import criar_gerenciador
 from utils import (formatar_data, emoji_severidade, cor_severidade, 
                    emoji_status, cor_status, emoji_tipo_ocorrencia, confirmar_acao)
 from datetime import datetime, timedelta
-import plotly.graph_objects as go
-import plotly.express as px
-import pandas as pd
 
 # Configuração da página
 st.set_page_config(
@@ -26,7 +27,7 @@ if not login_simples():
 # Inicializar banco
 @st.cache_resource
 def get_db():
-    return DatabaseManager()
+    return criar_gerenciador()
 
 db = get_db()
 
@@ -86,16 +87,74 @@ exibir_info_usuario()
 
 st.markdown("---")
 
+# Consultas da página submetidas em paralelo; o modo vem do estado do widget
+# (já disponível no rerun) para incluir os painéis do dashboard
+GRANULARIDADES_TIMELINE = {"Dia": "dia", "Semana": "semana", "Mês": "mes"}
+DIMENSOES_TIMELINE = {"Nenhuma": None, "Severidade": "severidade", "Status": "status", "Tipo": "tipo"}
+PERIODOS_TIMELINE = {"Últimos 90 dias": 90, "Último ano": 365, "Tudo": None}
+
+periodo_timeline = PERIODOS_TIMELINE[st.session_state.get('timeline_periodo', "Últimos 90 dias")]
+granularidade_timeline = GRANULARIDADES_TIMELINE[st.session_state.get('timeline_granularidade', "Dia")]
+inicio_timeline = ((datetime.now() - timedelta(days=periodo_timeline)).date().isoformat()
+                   if periodo_timeline else None)
+CONSULTAS_DASHBOARD = {
+    'por_status': 'obter_ocorrencias_por_status',
+    'por_severidade': 'obter_ocorrencias_por_severidade',
+    'timeline': ('contar_ocorrencias_por_periodo', {
+        'granularidade': granularidade_timeline,
+        'dimensao': DIMENSOES_TIMELINE[st.session_state.get('timeline_dimensao', "Nenhuma")],
+        'data_inicio': inicio_timeline
+    }),
+    'fluxo': ('obter_fluxo_ocorrencias', {
+        'granularidade': granularidade_timeline,
+        'data_inicio': inicio_timeline
+    })
+}
+# Painéis do dashboard: só as consultas do painel aberto são feitas
+PAINEIS_DASHBOARD = {
+    "📊 Distribuição": ('por_status', 'por_severidade'),
+    "📅 Timeline": ('por_status', 'timeline'),
+    "🔄 Abertas x Fechadas": ('por_status', 'fluxo')
+}
+painel_dashboard = st.session_state.get('painel_dashboard', next(iter(PAINEIS_DASHBOARD)))
+consultas = {'criticas': 'obter_ocorrencias_criticas_abertas', 'estatisticas': 'obter_estatisticas'}
+if st.session_state.get('modo_ocorrencias') == "📊 Dashboard":
+    consultas.update({chave: CONSULTAS_DASHBOARD[chave] for chave in PAINEIS_DASHBOARD[painel_dashboard]})
+paineis = db.submeter_consultas(consultas)
+
+
+# Regiões que se atualizam sozinhas (st.fragment): na execução completa
+# usam o resultado da consulta paralela; só as reexecuções do fragmento
+# (run_every) consultam de novo
+@st.fragment(run_every=INTERVALO_PAINEIS)
+def exibir_alerta_criticas(consulta):
+    """Alerta de ocorrências críticas abertas"""
+    ocorrencias_criticas = resultado_do_painel('painel_criticas', consulta,
+                                               db.obter_ocorrencias_criticas_abertas)
+    if ocorrencias_criticas:
+        st.markdown(
+            f"""<div class='alerta-critico'>
+            <strong>⚠️ ATENÇÃO: {len(ocorrencias_criticas)} ocorrência(s) crítica(s) em aberto!</strong><br>
+            Por favor, revise e tome as ações necessárias.
+            </div>""",
+            unsafe_allow_html=True
+        )
+
+
+@st.fragment(run_every=INTERVALO_PAINEIS)
+def exibir_estatisticas(consulta):
+    """Estatísticas da barra lateral"""
+    stats = resultado_do_painel('painel_estatisticas_ocorrencias', consulta, db.obter_estatisticas)
+    st.metric("Total de Ocorrências", stats['total_ocorrencias'])
+    st.metric("Abertas", stats['ocorrencias_abertas'], 
+             delta="Requer atenção" if stats['ocorrencias_abertas'] > 0 else "Tudo OK",
+             delta_color="inverse")
+    if stats.get('ocorrencias_arquivadas'):
+        st.caption(f"🗄️ {stats['ocorrencias_arquivadas']} ocorrência(s) no arquivo")
+
+
 # Verificar ocorrências críticas abertas
-ocorrencias_criticas = db.obter_ocorrencias_criticas_abertas()
-if ocorrencias_criticas:
-    st.markdown(
-        f"""<div class='alerta-critico'>
-        <strong>⚠️ ATENÇÃO: {len(ocorrencias_criticas)} ocorrência(s) crítica(s) em aberto!</strong><br>
-        Por favor, revise e tome as ações necessárias.
-        </div>""",
-        unsafe_allow_html=True
-    )
+exibir_alerta_criticas(paineis['criticas'])
 
 # Sidebar - Filtros e Ações
 with st.sidebar:
@@ -104,7 +163,8 @@ with st.sidebar:
     modo = st.radio(
         "Selecione o modo:",
         ["📋 Listar Ocorrências", "➕ Nova Ocorrência", "📊 Dashboard"],
-        index=0
+        index=0,
+        key='modo_ocorrencias'
     )
     
     st.markdown("---")
@@ -128,15 +188,207 @@ with st.sidebar:
             ["Todos", "Incidente", "Problema", "Observação", "Bug", "Melhoria", "Outro"]
         )
         
+        incluir_arquivo = st.checkbox("🗄️ Incluir arquivadas", help="Mostra também as ocorrências já arquivadas")
+        
+        visualizacao = st.radio(
+            "Visualização:",
+            ["🗂️ Cartões", "📊 Tabela"],
+            horizontal=True,
+            key='visualizacao_ocorrencias',
+            help="A tabela edita status, severidade e responsável de uma página inteira de uma vez"
+        )
+        
         st.markdown("---")
     
     # Estatísticas
     st.subheader("📊 Estatísticas")
-    stats = db.obter_estatisticas()
-    st.metric("Total de Ocorrências", stats['total_ocorrencias'])
-    st.metric("Abertas", stats['ocorrencias_abertas'], 
-             delta="Requer atenção" if stats['ocorrencias_abertas'] > 0 else "Tudo OK",
-             delta_color="inverse")
+    exibir_estatisticas(paineis['estatisticas'])
+
+# Edição em tabela: linhas por página e colunas editáveis
+TAMANHO_PAGINA_TABELA = 50
+CAMPOS_TABELA = ['id', 'tipo', 'descricao', 'severidade', 'status', 'responsavel', 'data_ocorrencia']
+EDITAVEIS_TABELA = ['severidade', 'status', 'responsavel']
+
+# Cards da listagem: cada um é um fragmento, então editar, mudar o status ou
+# fechar uma ocorrência reexecuta só o card (excluir recarrega a página)
+CHAVE_CARDS = 'cards_ocorrencias'
+
+
+@st.fragment
+def exibir_card_ocorrencia(ocorrencia):
+    """Card de uma ocorrência com as ações de edição"""
+    ocorrencia = registro_do_card(CHAVE_CARDS, ocorrencia)
+    
+    with st.container():
+        # Borda colorida baseada na severidade
+        border_color = cor_severidade(ocorrencia['severidade'])
+        
+        st.markdown(f"""
+            <div style='border-left: 5px solid {border_color}; padding-left: 15px;'>
+        """, unsafe_allow_html=True)
+        
+        col1, col2 = st.columns([4, 2])
+        
+        with col1:
+            # Título com emoji
+            st.markdown(
+                f"<div class='titulo-ocorrencia'>"
+                f"{emoji_tipo_ocorrencia(ocorrencia['tipo'])} "
+                f"Ocorrência #{ocorrencia['id']} - {ocorrencia['tipo']}"
+                f"</div>",
+                unsafe_allow_html=True
+            )
+        
+        with col2:
+            # Badges de status e severidade
+            st.markdown(
+                f"<span class='status-badge' style='background-color: {cor_status(ocorrencia['status'])};'>"
+                f"{emoji_status(ocorrencia['status'])} {ocorrencia['status'].upper()}"
+                f"</span>"
+                f"<span class='severidade-badge' style='background-color: {cor_severidade(ocorrencia['severidade'])};'>"
+                f"{emoji_severidade(ocorrencia['severidade'])} {ocorrencia['severidade'].upper()}"
+                f"</span>",
+                unsafe_allow_html=True
+            )
+        
+        # Descrição
+        st.markdown(f"**Descrição:** {ocorrencia['descricao']}")
+        
+        # Solução (se houver)
+        if ocorrencia['solucao']:
+            with st.expander("💡 Ver Solução"):
+                st.markdown(ocorrencia['solucao'])
+        
+        # Informações adicionais
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            data_ocorr = formatar_data(ocorrencia['data_ocorrencia'], "%d/%m/%Y às %H:%M")
+            st.caption(f"📅 Ocorreu em: {data_ocorr}")
+        
+        with col2:
+            data_reg = formatar_data(ocorrencia['data_registro'], "%d/%m/%Y às %H:%M")
+            st.caption(f"📝 Registrado em: {data_reg}")
+        
+        with col3:
+            if ocorrencia['responsavel']:
+                st.caption(f"👤 Responsável: {ocorrencia['responsavel']}")
+        
+        # Arquivadas ficam somente leitura
+        if ocorrencia.get('arquivada'):
+            st.caption("🗄️ Arquivada - somente leitura")
+            st.markdown("</div>", unsafe_allow_html=True)
+            st.markdown("---")
+            return
+        
+        # Botões de ação
+        col1, col2, col3, col4, col5 = st.columns([2, 2, 2, 2, 1])
+        
+        with col1:
+            if st.button("✏️ Editar", key=f"edit_{ocorrencia['id']}", use_container_width=True):
+                st.session_state[f'editando_{ocorrencia["id"]}'] = True
+                reexecutar_fragmento()
+        
+        with col2:
+            novo_status = st.selectbox(
+                "Status",
+                ["Aberta", "Em Análise", "Resolvida", "Fechada"],
+                index=["aberta", "em análise", "resolvida", "fechada"].index(ocorrencia['status']),
+                key=f"status_{ocorrencia['id']}"
+            )
+            if novo_status.lower() != ocorrencia['status']:
+                if st.button("💾", key=f"save_status_{ocorrencia['id']}", help="Salvar status"):
+                    db.atualizar_ocorrencia(ocorrencia['id'], status=novo_status.lower())
+                    st.success("✅ Status atualizado!")
+                    atualizar_card(CHAVE_CARDS, ocorrencia['id'], db.buscar_ocorrencia(ocorrencia['id']))
+        
+        with col3:
+            if ocorrencia['status'] != 'fechada':
+                if st.button("✅ Fechar", key=f"close_{ocorrencia['id']}", use_container_width=True):
+                    db.atualizar_ocorrencia(ocorrencia['id'], status='fechada')
+                    st.success("✅ Ocorrência fechada!")
+                    atualizar_card(CHAVE_CARDS, ocorrencia['id'], db.buscar_ocorrencia(ocorrencia['id']))
+        
+        with col4:
+            pass  # Espaço reservado
+        
+        with col5:
+            if st.button("🗑️", key=f"delete_{ocorrencia['id']}", help="Deletar"):
+                st.session_state[f'confirmar_delete_{ocorrencia["id"]}'] = True
+                reexecutar_fragmento()
+        
+        # Confirmação de delete
+        if st.session_state.get(f'confirmar_delete_{ocorrencia["id"]}', False):
+            if confirmar_acao(
+                f"⚠️ Tem certeza que deseja deletar a ocorrência #{ocorrencia['id']}?",
+                f"confirma_{ocorrencia['id']}"
+            ):
+                db.deletar_ocorrencia(ocorrencia['id'])
+                st.success("🗑️ Ocorrência deletada!")
+                del st.session_state[f'confirmar_delete_{ocorrencia["id"]}']
+                st.rerun()
+        
+        # Modo edição
+        if st.session_state.get(f'editando_{ocorrencia["id"]}', False):
+            st.markdown("---")
+            with st.form(f"form_edit_{ocorrencia['id']}"):
+                st.subheader("✏️ Editando Ocorrência")
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    novo_tipo = st.selectbox(
+                        "Tipo",
+                        ["Incidente", "Problema", "Observação", "Bug", "Melhoria", "Outro"],
+                        index=["Incidente", "Problema", "Observação", "Bug", "Melhoria", "Outro"].index(ocorrencia['tipo']) if ocorrencia['tipo'] in ["Incidente", "Problema", "Observação", "Bug", "Melhoria", "Outro"] else 0
+                    )
+                
+                with col2:
+                    nova_severidade = st.select_slider(
+                        "Severidade",
+                        options=["Baixa", "Média", "Alta", "Crítica"],
+                        value=ocorrencia['severidade'].capitalize()
+                    )
+                
+                nova_descricao = st.text_area(
+                    "Descrição",
+                    value=ocorrencia['descricao'],
+                    height=150
+                )
+                
+                novo_responsavel = st.text_input(
+                    "Responsável",
+                    value=ocorrencia['responsavel'] if ocorrencia['responsavel'] else ""
+                )
+                
+                nova_solucao = st.text_area(
+                    "Solução",
+                    value=ocorrencia['solucao'] if ocorrencia['solucao'] else "",
+                    height=150
+                )
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    if st.form_submit_button("💾 Salvar Alterações", type="primary", use_container_width=True):
+                        db.atualizar_ocorrencia(
+                            ocorrencia['id'],
+                            tipo=novo_tipo,
+                            descricao=nova_descricao,
+                            severidade=nova_severidade.lower(),
+                            responsavel=novo_responsavel if novo_responsavel else None,
+                            solucao=nova_solucao if nova_solucao else None
+                        )
+                        st.success("✅ Ocorrência atualizada!")
+                        del st.session_state[f'editando_{ocorrencia["id"]}']
+                        atualizar_card(CHAVE_CARDS, ocorrencia['id'], db.buscar_ocorrencia(ocorrencia['id']))
+                
+                with col2:
+                    if st.form_submit_button("❌ Cancelar", use_container_width=True):
+                        del st.session_state[f'editando_{ocorrencia["id"]}']
+                        reexecutar_fragmento()
+        
+        st.markdown("</div>", unsafe_allow_html=True)
+        st.markdown("---")
+
 
 # ==================== MODO: NOVA OCORRÊNCIA ====================
 if modo == "➕ Nova Ocorrência":
@@ -230,196 +482,156 @@ elif modo == "📋 Listar Ocorrências":
     severidade_filtro = None if filtro_severidade == "Todas" else filtro_severidade
     tipo_filtro = None if filtro_tipo == "Todos" else filtro_tipo
     
-    ocorrencias = db.listar_ocorrencias(
+    # A tabela usa páginas maiores e um cursor próprio
+    modo_tabela = visualizacao == "📊 Tabela"
+    chave_pagina = 'pagina_ocorrencias_tabela' if modo_tabela else 'pagina_ocorrencias'
+    pagina = carregar_pagina(
+        db, 'listar_ocorrencias_pagina', chave_pagina,
+        tamanho_pagina=TAMANHO_PAGINA_TABELA if modo_tabela else 20,
+        status=status_filtro,
+        severidade=severidade_filtro,
+        tipo=tipo_filtro,
+        incluir_arquivo=incluir_arquivo
+    )
+    ocorrencias = pagina['itens']
+    
+    exibir_exportacao(
+        db, 'iterar_ocorrencias', 'exportacao_ocorrencias', 'ocorrencias',
         status=status_filtro,
         severidade=severidade_filtro,
-        tipo=tipo_filtro
+        tipo=tipo_filtro,
+        incluir_arquivo=incluir_arquivo
     )
     
     if not ocorrencias:
         st.info("📭 Nenhuma ocorrência encontrada com os filtros selecionados.")
         st.markdown("👉 Use o menu lateral para registrar uma nova ocorrência!")
     else:
-        st.caption(f"Exibindo {len(ocorrencias)} ocorrência(s)")
+        st.caption(f"Página {pagina['numero']} - exibindo {len(ocorrencias)} ocorrência(s)")
         
-        for ocorrencia in ocorrencias:
-            with st.container():
-                # Borda colorida baseada na severidade
-                border_color = cor_severidade(ocorrencia['severidade'])
-                
-                st.markdown(f"""
-                    <div style='border-left: 5px solid {border_color}; padding-left: 15px;'>
-                """, unsafe_allow_html=True)
-                
-                col1, col2 = st.columns([4, 2])
-                
-                with col1:
-                    # Título com emoji
-                    st.markdown(
-                        f"<div class='titulo-ocorrencia'>"
-                        f"{emoji_tipo_ocorrencia(ocorrencia['tipo'])} "
-                        f"Ocorrência #{ocorrencia['id']} - {ocorrencia['tipo']}"
-                        f"</div>",
-                        unsafe_allow_html=True
-                    )
-                
-                with col2:
-                    # Badges de status e severidade
-                    st.markdown(
-                        f"<span class='status-badge' style='background-color: {cor_status(ocorrencia['status'])};'>"
-                        f"{emoji_status(ocorrencia['status'])} {ocorrencia['status'].upper()}"
-                        f"</span>"
-                        f"<span class='severidade-badge' style='background-color: {cor_severidade(ocorrencia['severidade'])};'>"
-                        f"{emoji_severidade(ocorrencia['severidade'])} {ocorrencia['severidade'].upper()}"
-                        f"</span>",
-                        unsafe_allow_html=True
-                    )
-                
-                # Descrição
-                st.markdown(f"**Descrição:** {ocorrencia['descricao']}")
-                
-                # Solução (se houver)
-                if ocorrencia['solucao']:
-                    with st.expander("💡 Ver Solução"):
-                        st.markdown(ocorrencia['solucao'])
-                
-                # Informações adicionais
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    data_ocorr = ocorrencia['data_ocorrencia'][:16].replace('T', ' às ')
-                    st.caption(f"📅 Ocorreu em: {data_ocorr}")
-                
-                with col2:
-                    data_reg = ocorrencia['data_registro'][:16].replace('T', ' às ')
-                    st.caption(f"📝 Registrado em: {data_reg}")
-                
-                with col3:
-                    if ocorrencia['responsavel']:
-                        st.caption(f"👤 Responsável: {ocorrencia['responsavel']}")
-                
-                # Botões de ação
-                col1, col2, col3, col4, col5 = st.columns([2, 2, 2, 2, 1])
-                
-                with col1:
-                    if st.button("✏️ Editar", key=f"edit_{ocorrencia['id']}", use_container_width=True):
-                        st.session_state[f'editando_{ocorrencia["id"]}'] = True
-                        st.rerun()
-                
-                with col2:
-                    novo_status = st.selectbox(
-                        "Status",
-                        ["Aberta", "Em Análise", "Resolvida", "Fechada"],
-                        index=["aberta", "em análise", "resolvida", "fechada"].index(ocorrencia['status']),
-                        key=f"status_{ocorrencia['id']}"
+        # Ações em lote: uma única escrita e um único rerun
+        with st.expander("✅ Ações em lote"):
+            todas_filtradas = st.checkbox("Aplicar a todas as ocorrências dos filtros atuais",
+                                          key='lote_ocorrencias_todas')
+            if todas_filtradas:
+                ids_lote = db.listar_ids_ocorrencias(status_filtro, severidade_filtro, tipo_filtro)
+                st.caption(f"{len(ids_lote)} ocorrência(s) selecionada(s)")
+            else:
+                rotulos = {o['id']: f"#{o['id']} - {o['tipo']}: {o['descricao'][:50]}"
+                           for o in ocorrencias if not o.get('arquivada')}
+                ids_lote = st.multiselect("Ocorrências desta página:", list(rotulos),
+                                          format_func=rotulos.get, key='lote_ocorrencias_ids')
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                status_lote = st.selectbox(
+                    "Novo status:",
+                    ["Manter", "Aberta", "Em Análise", "Resolvida", "Fechada"],
+                    key='lote_ocorrencias_status'
+                )
+            
+            with col2:
+                responsavel_lote = st.text_input("Novo responsável:", placeholder="Manter atual",
+                                                 key='lote_ocorrencias_responsavel')
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                if st.button("💾 Aplicar às selecionadas", key='lote_ocorrencias_aplicar',
+                             disabled=not ids_lote, use_container_width=True):
+                    alteradas = db.atualizar_ocorrencias_em_lote(
+                        ids_lote,
+                        status=None if status_lote == "Manter" else status_lote.lower(),
+                        responsavel=responsavel_lote or None
                     )
-                    if novo_status.lower() != ocorrencia['status']:
-                        if st.button("💾", key=f"save_status_{ocorrencia['id']}", help="Salvar status"):
-                            db.atualizar_ocorrencia(ocorrencia['id'], status=novo_status.lower())
-                            st.success("✅ Status atualizado!")
-                            st.rerun()
-                
-                with col3:
-                    if ocorrencia['status'] != 'fechada':
-                        if st.button("✅ Fechar", key=f"close_{ocorrencia['id']}", use_container_width=True):
-                            db.atualizar_ocorrencia(ocorrencia['id'], status='fechada')
-                            st.success("✅ Ocorrência fechada!")
-                            st.rerun()
-                
-                with col4:
-                    pass  # Espaço reservado
-                
-                with col5:
-                    if st.button("🗑️", key=f"delete_{ocorrencia['id']}", help="Deletar"):
-                        st.session_state[f'confirmar_delete_{ocorrencia["id"]}'] = True
-                        st.rerun()
-                
-                # Confirmação de delete
-                if st.session_state.get(f'confirmar_delete_{ocorrencia["id"]}', False):
-                    if confirmar_acao(
-                        f"⚠️ Tem certeza que deseja deletar a ocorrência #{ocorrencia['id']}?",
-                        f"confirma_{ocorrencia['id']}"
-                    ):
-                        db.deletar_ocorrencia(ocorrencia['id'])
-                        st.success("🗑️ Ocorrência deletada!")
-                        del st.session_state[f'confirmar_delete_{ocorrencia["id"]}']
+                    st.success(f"✅ {alteradas} ocorrência(s) atualizada(s)!")
+                    st.rerun()
+            
+            with col2:
+                confirmar_lote = st.checkbox("Confirmo a exclusão", key='lote_ocorrencias_confirmar')
+                if st.button("🗑️ Excluir selecionadas", key='lote_ocorrencias_excluir',
+                             disabled=not (ids_lote and confirmar_lote), use_container_width=True):
+                    excluidas = db.deletar_ocorrencias_em_lote(ids_lote)
+                    st.success(f"🗑️ {excluidas} ocorrência(s) excluída(s)!")
+                    st.rerun()
+        
+        if modo_tabela:
+            editaveis = [o for o in ocorrencias if not o.get('arquivada')]
+            if len(editaveis) < len(ocorrencias):
+                st.caption("🗄️ Ocorrências arquivadas ficam fora da tabela (somente leitura)")
+            
+            # Uma única grade por página: o rerun não cresce com widgets por registro
+            alteracoes = editar_tabela(
+                editaveis, CAMPOS_TABELA, EDITAVEIS_TABELA, 'tabela_ocorrencias',
+                configuracao={
+                    'tipo': st.column_config.TextColumn("Tipo"),
+                    'descricao': st.column_config.TextColumn("Descrição", width="large"),
+                    'severidade': st.column_config.SelectboxColumn(
+                        "Severidade", options=["baixa", "média", "alta", "crítica"], required=True),
+                    'status': st.column_config.SelectboxColumn(
+                        "Status", options=["aberta", "em análise", "resolvida", "fechada"], required=True),
+                    'responsavel': st.column_config.TextColumn("Responsável"),
+                    'data_ocorrencia': st.column_config.TextColumn("Ocorreu em")
+                }
+            )
+            # Responsável apagado na grade vira texto vazio (None não altera o campo)
+            for campos in alteracoes.values():
+                if 'responsavel' in campos and campos['responsavel'] is None:
+                    campos['responsavel'] = ''
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                if st.button(f"💾 Salvar alterações ({len(alteracoes)})", key='tabela_ocorrencias_salvar',
+                             type="primary", disabled=not alteracoes, use_container_width=True):
+                    try:
+                        # Todas as linhas em uma transação: ou grava tudo ou nada
+                        alteradas = db.atualizar_ocorrencias(alteracoes)
+                    except Exception as e:
+                        st.error(f"❌ Nenhuma alteração gravada: {str(e)}")
+                    else:
+                        descartar_edicoes('tabela_ocorrencias')
+                        st.success(f"✅ {alteradas} ocorrência(s) atualizada(s)!")
+                        if alteradas < len(alteracoes):
+                            st.warning(f"⚠️ {len(alteracoes) - alteradas} ocorrência(s) não existem mais "
+                                       "(excluídas ou arquivadas) e não foram alteradas")
                         st.rerun()
-                
-                # Modo edição
-                if st.session_state.get(f'editando_{ocorrencia["id"]}', False):
-                    st.markdown("---")
-                    with st.form(f"form_edit_{ocorrencia['id']}"):
-                        st.subheader("✏️ Editando Ocorrência")
-                        
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            novo_tipo = st.selectbox(
-                                "Tipo",
-                                ["Incidente", "Problema", "Observação", "Bug", "Melhoria", "Outro"],
-                                index=["Incidente", "Problema", "Observação", "Bug", "Melhoria", "Outro"].index(ocorrencia['tipo']) if ocorrencia['tipo'] in ["Incidente", "Problema", "Observação", "Bug", "Melhoria", "Outro"] else 0
-                            )
-                        
-                        with col2:
-                            nova_severidade = st.select_slider(
-                                "Severidade",
-                                options=["Baixa", "Média", "Alta", "Crítica"],
-                                value=ocorrencia['severidade'].capitalize()
-                            )
-                        
-                        nova_descricao = st.text_area(
-                            "Descrição",
-                            value=ocorrencia['descricao'],
-                            height=150
-                        )
-                        
-                        novo_responsavel = st.text_input(
-                            "Responsável",
-                            value=ocorrencia['responsavel'] if ocorrencia['responsavel'] else ""
-                        )
-                        
-                        nova_solucao = st.text_area(
-                            "Solução",
-                            value=ocorrencia['solucao'] if ocorrencia['solucao'] else "",
-                            height=150
-                        )
-                        
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            if st.form_submit_button("💾 Salvar Alterações", type="primary", use_container_width=True):
-                                db.atualizar_ocorrencia(
-                                    ocorrencia['id'],
-                                    tipo=novo_tipo,
-                                    descricao=nova_descricao,
-                                    severidade=nova_severidade.lower(),
-                                    responsavel=novo_responsavel if novo_responsavel else None,
-                                    solucao=nova_solucao if nova_solucao else None
-                                )
-                                st.success("✅ Ocorrência atualizada!")
-                                del st.session_state[f'editando_{ocorrencia["id"]}']
-                                st.rerun()
-                        
-                        with col2:
-                            if st.form_submit_button("❌ Cancelar", use_container_width=True):
-                                del st.session_state[f'editando_{ocorrencia["id"]}']
-                                st.rerun()
-                
-                st.markdown("</div>", unsafe_allow_html=True)
-                st.markdown("---")
+            
+            with col2:
+                if st.button("↩️ Descartar", key='tabela_ocorrencias_descartar',
+                             disabled=not alteracoes, use_container_width=True):
+                    descartar_edicoes('tabela_ocorrencias')
+                    st.rerun()
+        else:
+            iniciar_cards(CHAVE_CARDS)
+            for ocorrencia in ocorrencias:
+                exibir_card_ocorrencia(ocorrencia)
+        
+        exibir_navegacao(pagina, chave_pagina)
 
 # ==================== MODO: DASHBOARD ====================
 elif modo == "📊 Dashboard":
+    # Plotly só é carregado por quem abre o dashboard
+    import plotly.graph_objects as go
+    
     st.subheader("📊 Dashboard de Ocorrências")
     
-    # Obter dados
-    todas_ocorrencias = db.listar_ocorrencias()
-    stats_status = db.obter_ocorrencias_por_status()
-    stats_severidade = db.obter_ocorrencias_por_severidade()
+    # Painel aberto (st.tabs executaria todos; o seletor desenha só um)
+    painel = st.radio("Painel:", list(PAINEIS_DASHBOARD), horizontal=True,
+                      key='painel_dashboard', label_visibility="collapsed")
+    
+    # Obter dados (normalmente já submetidos no início da página)
+    pendentes = {chave: CONSULTAS_DASHBOARD[chave] for chave in PAINEIS_DASHBOARD[painel] if chave not in paineis}
+    if pendentes:
+        paineis.update(db.submeter_consultas(pendentes))
+    stats_status = paineis['por_status'].result()
     
     # Métricas principais
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        total = len(todas_ocorrencias)
+        total = sum(stats_status.values())
         st.metric("Total de Ocorrências", total)
     
     with col2:
@@ -436,82 +648,124 @@ elif modo == "📊 Dashboard":
     
     st.markdown("---")
     
-    # Gráficos
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("📊 Ocorrências por Status")
+    if painel == "📊 Distribuição":
+        stats_severidade = paineis['por_severidade'].result()
         
-        if stats_status:
-            labels = list(stats_status.keys())
-            values = list(stats_status.values())
-            colors = [cor_status(s) for s in labels]
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.subheader("📊 Ocorrências por Status")
             
-            fig = go.Figure(data=[go.Pie(
-                labels=[l.capitalize() for l in labels],
-                values=values,
-                hole=0.4,
-                marker=dict(colors=colors),
-                textinfo='label+value+percent'
-            )])
+            if stats_status:
+                labels = list(stats_status.keys())
+                values = list(stats_status.values())
+                colors = [cor_status(s) for s in labels]
+                
+                fig = go.Figure(data=[go.Pie(
+                    labels=[l.capitalize() for l in labels],
+                    values=values,
+                    hole=0.4,
+                    marker=dict(colors=colors),
+                    textinfo='label+value+percent'
+                )])
+                
+                fig.update_layout(height=400)
+                st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.info("Sem dados para exibir")
+        
+        with col2:
+            st.subheader("⚠️ Ocorrências por Severidade")
             
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("Sem dados para exibir")
+            if stats_severidade:
+                labels = list(stats_severidade.keys())
+                values = list(stats_severidade.values())
+                colors = [cor_severidade(s) for s in labels]
+                
+                fig = go.Figure(data=[go.Bar(
+                    x=[l.capitalize() for l in labels],
+                    y=values,
+                    marker=dict(color=colors),
+                    text=values,
+                    textposition='auto'
+                )])
+                
+                fig.update_layout(
+                    height=400,
+                    yaxis_title="Quantidade",
+                    xaxis_title="Severidade"
+                )
+                st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.info("Sem dados para exibir")
     
-    with col2:
-        st.subheader("⚠️ Ocorrências por Severidade")
+    else:
+        # Período e agrupamento valem para a timeline e para abertas x fechadas
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.selectbox("Período:", list(PERIODOS_TIMELINE), key='timeline_periodo')
         
-        if stats_severidade:
-            labels = list(stats_severidade.keys())
-            values = list(stats_severidade.values())
-            colors = [cor_severidade(s) for s in labels]
+        with col2:
+            st.selectbox("Agrupar por:", list(GRANULARIDADES_TIMELINE), key='timeline_granularidade')
+        
+        if painel == "📅 Timeline":
+            with col3:
+                st.selectbox("Separar por:", list(DIMENSOES_TIMELINE), key='timeline_dimensao')
             
-            fig = go.Figure(data=[go.Bar(
-                x=[l.capitalize() for l in labels],
-                y=values,
-                marker=dict(color=colors),
-                text=values,
-                textposition='auto'
-            )])
+            # Timeline (contagens já agrupadas no banco)
+            st.subheader("📅 Timeline de Ocorrências")
             
-            fig.update_layout(
-                height=400,
-                yaxis_title="Quantidade",
-                xaxis_title="Severidade"
-            )
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("Sem dados para exibir")
-    
-    st.markdown("---")
-    
-    # Timeline
-    if todas_ocorrencias:
-        st.subheader("📅 Timeline de Ocorrências")
-        
-        df = pd.DataFrame(todas_ocorrencias)
-        df['data_ocorrencia'] = pd.to_datetime(df['data_ocorrencia'])
-        df['data'] = df['data_ocorrencia'].dt.date
-        
-        timeline = df.groupby('data').size().reset_index(name='quantidade')
-        
-        fig = px.line(
-            timeline,
-            x='data',
-            y='quantidade',
-            title='Ocorrências ao Longo do Tempo',
-            markers=True
-        )
-        
-        fig.update_layout(
-            xaxis_title="Data",
-            yaxis_title="Número de Ocorrências",
-            height=400
-        )
+            timeline = paineis['timeline'].result()
+            dimensao = CONSULTAS_DASHBOARD['timeline'][1]['dimensao']
+            
+            if timeline:
+                import pandas as pd
+                import plotly.express as px
+                
+                fig = px.line(
+                    pd.DataFrame(timeline),
+                    x='periodo',
+                    y='quantidade',
+                    color=dimensao,
+                    title='Ocorrências ao Longo do Tempo',
+                    markers=True
+                )
+                
+                fig.update_layout(
+                    xaxis_title="Data",
+                    yaxis_title="Número de Ocorrências",
+                    height=400
+                )
+                
+                st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.info("Sem ocorrências no período selecionado")
         
-        st.plotly_chart(fig, use_container_width=True)
+        else:
+            # Abertas x fechadas no mesmo período e agrupamento
+            st.subheader("🔄 Abertas x Fechadas")
+            
+            fluxo = paineis['fluxo'].result()
+            if fluxo:
+                periodos = [linha['periodo'] for linha in fluxo]
+                fig = go.Figure(data=[
+                    go.Bar(name='Abertas', x=periodos, y=[linha['abertas'] for linha in fluxo],
+                           marker_color='#e74c3c'),
+                    go.Bar(name='Fechadas', x=periodos, y=[linha['fechadas'] for linha in fluxo],
+                           marker_color='#2ecc71')
+                ])
+                
+                fig.update_layout(
+                    barmode='group',
+                    xaxis_title="Data",
+                    yaxis_title="Número de Ocorrências",
+                    height=400
+                )
+                
+                st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.info("Sem ocorrências no período selecionado")
 
 # Footer
 st.markdown("---")
@@ -2,13 +2,16 @@
 Módulo de Atas de Reunião
 Gerenciamento completo de atas e acompanhamento de ações
 """
+import io
 import streamlit as st
-from utils.components import exibir_logo_sidebar, exibir_assinatura_footer
+from utils.components import (exibir_logo_sidebar, exibir_assinatura_footer,
+                               carregar_pagina, exibir_navegacao, exibir_exportacao, INTERVALO_PAINEIS,
+                               reexecutar_fragmento)
 from auth import login_simples, exibir_info_usuario
-from database import DatabaseManager
+from database import criar_gerenciador
 from utils import formatar_data, confirmar_acao, calcular_duracao_reuniao, status_acao
+from utils.exportacao import exportar, FORMATOS_EXPORTACAO
 from datetime import datetime, timedelta
-import pandas as pd
 
 # Configuração da página
 st.set_page_config(
@@ -23,7 +26,7 @@ if not login_simples():
 # Inicializar banco
 @st.cache_resource
 def get_db():
-    return DatabaseManager()
+    return criar_gerenciador()
 
 db = get_db()
 
@@ -84,6 +87,227 @@ exibir_info_usuario()
 
 st.markdown("---")
 
+# Regiões que se atualizam sozinhas (st.fragment)
+@st.fragment(run_every=INTERVALO_PAINEIS)
+def exibir_estatisticas():
+    """Estatísticas da barra lateral"""
+    stats = db.obter_estatisticas()
+    st.metric("Total de Atas", stats['total_atas'])
+    
+    acoes_pendentes = db.obter_acoes_pendentes()
+    st.metric("Ações Pendentes", len(acoes_pendentes),
+             delta="Requer atenção" if len(acoes_pendentes) > 0 else "Tudo OK",
+             delta_color="inverse")
+
+
+# Cada card é um fragmento: abrir os detalhes, a edição ou a confirmação
+# reexecuta só o card (excluir recarrega a página)
+@st.fragment
+def exibir_card_ata(ata):
+    """Card de uma ata, a partir do resumo da listagem"""
+    with st.container():
+        # Card da ata
+        st.markdown(f"<div class='ata-card'>", unsafe_allow_html=True)
+        
+        col1, col2 = st.columns([4, 1])
+        
+        with col1:
+            st.markdown(
+                f"<div class='titulo-ata'>📋 Ata #{ata['id']} - {ata['titulo']}</div>",
+                unsafe_allow_html=True
+            )
+        
+        with col2:
+            data_reuniao_formatada = datetime.fromisoformat(ata['data_reuniao']).strftime("%d/%m/%Y")
+            st.markdown(f"**📅 {data_reuniao_formatada}**")
+        
+        # Informações da reunião
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            if ata['horario_inicio'] and ata['horario_fim']:
+                duracao = calcular_duracao_reuniao(ata['horario_inicio'], ata['horario_fim'])
+                st.caption(f"⏰ {ata['horario_inicio'][:5]} - {ata['horario_fim'][:5]} ({duracao})")
+        
+        with col2:
+            st.caption(f"👥 {ata['total_participantes']} participante(s)")
+        
+        with col3:
+            if ata['total_acoes']:
+                st.caption(f"🎯 {ata['acoes_pendentes']} ação(ões) pendente(s)")
+        
+        # O card vem do resumo; pauta, discussões, decisões e ações
+        # só são lidas quando os detalhes são abertos
+        ver_detalhes = st.toggle("📖 Ver Detalhes Completos", key=f"detalhes_{ata['id']}")
+        if ver_detalhes:
+            ata = db.buscar_ata(ata['id']) or ata
+        
+        if ver_detalhes and 'pauta' in ata:
+            # Participantes
+            if ata['participantes']:
+                st.markdown("**👥 Participantes:**")
+                participantes_html = "".join([
+                    f"<span class='participante-badge'>{p}</span>"
+                    for p in ata['participantes']
+                ])
+                st.markdown(participantes_html, unsafe_allow_html=True)
+                st.markdown("")
+            
+            # Pauta
+            if ata['pauta']:
+                st.markdown("**📝 Pauta:**")
+                st.markdown(f"<div class='secao-ata'>{ata['pauta']}</div>", unsafe_allow_html=True)
+            
+            # Discussões
+            if ata['discussoes']:
+                st.markdown("**💬 Discussões:**")
+                st.markdown(f"<div class='secao-ata'>{ata['discussoes']}</div>", unsafe_allow_html=True)
+            
+            # Decisões
+            if ata['decisoes']:
+                st.markdown("**✅ Decisões:**")
+                st.markdown(f"<div class='secao-ata'>{ata['decisoes']}</div>", unsafe_allow_html=True)
+            
+            # Ações
+            if ata['acoes']:
+                st.markdown("**🎯 Plano de Ação:**")
+                for idx, acao in enumerate(ata['acoes']):
+                    emoji, status_texto, cor = status_acao(acao.get('prazo', ''))
+                    concluida = acao.get('concluida', False)
+                    
+                    st.markdown(
+                        f"""<div class='acao-card' style='opacity: {"0.6" if concluida else "1"};'>
+                        <strong>{"✅" if concluida else emoji} {acao.get('descricao', 'Sem descrição')}</strong><br>
+                        <small>👤 Responsável: {acao.get('responsavel') or 'Não definido'} | 
+                        📅 Prazo: {datetime.strptime(acao.get('prazo', ''), '%Y-%m-%d').strftime('%d/%m/%Y') if acao.get('prazo') else 'Não definido'} | 
+                        Status: <span style='color: {cor};'>{status_texto if not concluida else 'Concluída'}</span></small>
+                        </div>""",
+                        unsafe_allow_html=True
+                    )
+            
+            # Próxima reunião
+            if ata['proxima_reuniao']:
+                proxima_data = datetime.fromisoformat(ata['proxima_reuniao']).strftime("%d/%m/%Y")
+                st.info(f"📅 Próxima reunião agendada para: **{proxima_data}**")
+        
+        # Botões de ação
+        col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
+        
+        with col1:
+            if st.button("✏️ Editar", key=f"edit_{ata['id']}", use_container_width=True):
+                st.session_state[f'editando_{ata["id"]}'] = True
+                reexecutar_fragmento()
+        
+        with col2:
+            if st.button("🎯 Gerenciar Ações", key=f"acoes_{ata['id']}", use_container_width=True):
+                # O painel é outro fragmento: abri-lo recarrega a página
+                st.session_state[f'gerenciar_acoes_{ata["id"]}'] = True
+                st.rerun()
+        
+        with col3:
+            # A exportação precisa da ata completa: disponível com os detalhes abertos
+            if 'pauta' in ata:
+                arquivo_ata = io.BytesIO()
+                exportar([ata], 'jsonl', arquivo_ata)
+                st.download_button(
+                    "📄 Exportar",
+                    data=arquivo_ata.getvalue(),
+                    file_name=f"ata_{ata['id']}.jsonl",
+                    mime=FORMATOS_EXPORTACAO['jsonl'][1],
+                    key=f"export_{ata['id']}",
+                    use_container_width=True
+                )
+            else:
+                st.button("📄 Exportar", key=f"export_{ata['id']}", disabled=True,
+                          help="Abra os detalhes da ata para exportá-la", use_container_width=True)
+        
+        with col4:
+            if st.button("🗑️", key=f"delete_{ata['id']}", help="Deletar"):
+                st.session_state[f'confirmar_delete_{ata["id"]}'] = True
+                reexecutar_fragmento()
+        
+        # Confirmação de delete
+        if st.session_state.get(f'confirmar_delete_{ata["id"]}', False):
+            if confirmar_acao(
+                f"⚠️ Tem certeza que deseja deletar a ata '{ata['titulo']}'?",
+                f"confirma_{ata['id']}"
+            ):
+                db.deletar_ata(ata['id'])
+                st.success("🗑️ Ata deletada!")
+                del st.session_state[f'confirmar_delete_{ata["id"]}']
+                st.rerun()
+
+
+# O "Gerenciar Ações" é um fragmento à parte, que relê a ata a cada
+# execução: marcar, incluir ou excluir ações reexecuta só o painel
+@st.fragment
+def exibir_gerenciar_acoes(ata_id):
+    """Painel de gerenciamento do plano de ação de uma ata"""
+    if not st.session_state.get(f'gerenciar_acoes_{ata_id}', False):
+        return
+    ata = db.buscar_ata(ata_id)
+    if ata is None:
+        return
+    
+    st.markdown("---")
+    st.subheader("🎯 Gerenciar Plano de Ação")
+    
+    # Mostrar ações existentes
+    if ata['acoes']:
+        st.markdown("**Ações Atuais:**")
+        
+        for acao in ata['acoes']:
+            col1, col2 = st.columns([4, 1])
+            
+            with col1:
+                concluida = st.checkbox(
+                    f"{acao.get('descricao', '')} - {acao.get('responsavel') or ''}",
+                    value=acao.get('concluida', False),
+                    key=f"acao_{acao['id']}"
+                )
+                # Cada marcação grava apenas a ação alterada
+                if concluida != acao.get('concluida', False):
+                    db.atualizar_acao(acao['id'], concluida=concluida)
+                    reexecutar_fragmento()
+            
+            with col2:
+                if st.button("🗑️", key=f"del_acao_{acao['id']}"):
+                    db.deletar_acao(acao['id'])
+                    st.success("Ação removida!")
+                    reexecutar_fragmento()
+    
+    st.markdown("---")
+    
+    # Adicionar nova ação
+    with st.form(f"form_nova_acao_{ata['id']}"):
+        st.markdown("**➕ Adicionar Nova Ação:**")
+        
+        nova_descricao = st.text_input("Descrição da Ação")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            novo_responsavel = st.text_input("Responsável")
+        with col2:
+            novo_prazo = st.date_input("Prazo", value=datetime.now() + timedelta(days=7))
+        
+        if st.form_submit_button("➕ Adicionar Ação"):
+            if nova_descricao and novo_responsavel:
+                db.criar_acao(
+                    ata['id'],
+                    descricao=nova_descricao,
+                    responsavel=novo_responsavel,
+                    prazo=novo_prazo.isoformat()
+                )
+                st.success("✅ Ação adicionada!")
+                reexecutar_fragmento()
+            else:
+                st.error("Preencha todos os campos!")
+    
+    if st.button("❌ Fechar Gerenciamento", key=f"close_acoes_{ata['id']}"):
+        del st.session_state[f'gerenciar_acoes_{ata["id"]}']
+        reexecutar_fragmento()
+
+
 # Sidebar - Filtros e Ações
 with st.sidebar:
     st.header("🎯 Ações")
@@ -98,13 +322,7 @@ with st.sidebar:
     
     # Estatísticas
     st.subheader("📊 Estatísticas")
-    stats = db.obter_estatisticas()
-    st.metric("Total de Atas", stats['total_atas'])
-    
-    acoes_pendentes = db.obter_acoes_pendentes()
-    st.metric("Ações Pendentes", len(acoes_pendentes),
-             delta="Requer atenção" if len(acoes_pendentes) > 0 else "Tudo OK",
-             delta_color="inverse")
+    exibir_estatisticas()
 
 # ==================== MODO: NOVA ATA ====================
 if modo == "➕ Nova Ata":
@@ -258,203 +476,29 @@ elif modo == "📋 Listar Atas":
             st.rerun()
     
     # Buscar atas
-    if data_inicio and data_fim:
-        atas = db.buscar_atas_por_periodo(data_inicio.isoformat(), data_fim.isoformat())
-    else:
-        atas = db.listar_atas()
+    periodo = {
+        'data_inicio': data_inicio.isoformat() if data_inicio else None,
+        'data_fim': data_fim.isoformat() if data_fim else None
+    }
+    pagina = carregar_pagina(db, 'listar_resumos_atas_pagina', 'pagina_atas', **periodo)
+    atas = pagina['itens']
+    
+    exibir_exportacao(db, 'iterar_atas', 'exportacao_atas', 'atas', **periodo)
     
     if not atas:
         st.info("📭 Nenhuma ata encontrada no período selecionado.")
         st.markdown("👉 Use o menu lateral para criar sua primeira ata!")
     else:
-        st.caption(f"Exibindo {len(atas)} ata(s)")
+        st.caption(f"Página {pagina['numero']} - exibindo {len(atas)} ata(s)")
         
         for ata in atas:
-            with st.container():
-                # Card da ata
-                st.markdown(f"<div class='ata-card'>", unsafe_allow_html=True)
-                
-                col1, col2 = st.columns([4, 1])
-                
-                with col1:
-                    st.markdown(
-                        f"<div class='titulo-ata'>📋 Ata #{ata['id']} - {ata['titulo']}</div>",
-                        unsafe_allow_html=True
-                    )
-                
-                with col2:
-                    data_reuniao_formatada = datetime.fromisoformat(ata['data_reuniao']).strftime("%d/%m/%Y")
-                    st.markdown(f"**📅 {data_reuniao_formatada}**")
-                
-                # Informações da reunião
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    if ata['horario_inicio'] and ata['horario_fim']:
-                        duracao = calcular_duracao_reuniao(ata['horario_inicio'], ata['horario_fim'])
-                        st.caption(f"⏰ {ata['horario_inicio'][:5]} - {ata['horario_fim'][:5]} ({duracao})")
-                
-                with col2:
-                    st.caption(f"👥 {len(ata['participantes'])} participante(s)")
-                
-                with col3:
-                    if ata['acoes']:
-                        acoes_pendentes_ata = sum(1 for a in ata['acoes'] if not a.get('concluida', False))
-                        st.caption(f"🎯 {acoes_pendentes_ata} ação(ões) pendente(s)")
-                
-                # Botão para expandir detalhes
-                with st.expander("📖 Ver Detalhes Completos"):
-                    # Participantes
-                    if ata['participantes']:
-                        st.markdown("**👥 Participantes:**")
-                        participantes_html = "".join([
-                            f"<span class='participante-badge'>{p}</span>"
-                            for p in ata['participantes']
-                        ])
-                        st.markdown(participantes_html, unsafe_allow_html=True)
-                        st.markdown("")
-                    
-                    # Pauta
-                    if ata['pauta']:
-                        st.markdown("**📝 Pauta:**")
-                        st.markdown(f"<div class='secao-ata'>{ata['pauta']}</div>", unsafe_allow_html=True)
-                    
-                    # Discussões
-                    if ata['discussoes']:
-                        st.markdown("**💬 Discussões:**")
-                        st.markdown(f"<div class='secao-ata'>{ata['discussoes']}</div>", unsafe_allow_html=True)
-                    
-                    # Decisões
-                    if ata['decisoes']:
-                        st.markdown("**✅ Decisões:**")
-                        st.markdown(f"<div class='secao-ata'>{ata['decisoes']}</div>", unsafe_allow_html=True)
-                    
-                    # Ações
-                    if ata['acoes']:
-                        st.markdown("**🎯 Plano de Ação:**")
-                        for idx, acao in enumerate(ata['acoes']):
-                            emoji, status_texto, cor = status_acao(acao.get('prazo', ''))
-                            concluida = acao.get('concluida', False)
-                            
-                            st.markdown(
-                                f"""<div class='acao-card' style='opacity: {"0.6" if concluida else "1"};'>
-                                <strong>{"✅" if concluida else emoji} {acao.get('descricao', 'Sem descrição')}</strong><br>
-                                <small>👤 Responsável: {acao.get('responsavel', 'Não definido')} | 
-                                📅 Prazo: {datetime.strptime(acao.get('prazo', ''), '%Y-%m-%d').strftime('%d/%m/%Y') if acao.get('prazo') else 'Não definido'} | 
-                                Status: <span style='color: {cor};'>{status_texto if not concluida else 'Concluída'}</span></small>
-                                </div>""",
-                                unsafe_allow_html=True
-                            )
-                    
-                    # Próxima reunião
-                    if ata['proxima_reuniao']:
-                        proxima_data = datetime.fromisoformat(ata['proxima_reuniao']).strftime("%d/%m/%Y")
-                        st.info(f"📅 Próxima reunião agendada para: **{proxima_data}**")
-                
-                # Botões de ação
-                col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
-                
-                with col1:
-                    if st.button("✏️ Editar", key=f"edit_{ata['id']}", use_container_width=True):
-                        st.session_state[f'editando_{ata["id"]}'] = True
-                        st.rerun()
-                
-                with col2:
-                    if st.button("🎯 Gerenciar Ações", key=f"acoes_{ata['id']}", use_container_width=True):
-                        st.session_state[f'gerenciar_acoes_{ata["id"]}'] = True
-                        st.rerun()
-                
-                with col3:
-                    if st.button("📄 Exportar PDF", key=f"export_{ata['id']}", use_container_width=True):
-                        st.info("🚧 Funcionalidade em desenvolvimento")
-                
-                with col4:
-                    if st.button("🗑️", key=f"delete_{ata['id']}", help="Deletar"):
-                        st.session_state[f'confirmar_delete_{ata["id"]}'] = True
-                        st.rerun()
-                
-                # Confirmação de delete
-                if st.session_state.get(f'confirmar_delete_{ata["id"]}', False):
-                    if confirmar_acao(
-                        f"⚠️ Tem certeza que deseja deletar a ata '{ata['titulo']}'?",
-                        f"confirma_{ata['id']}"
-                    ):
-                        db.deletar_ata(ata['id'])
-                        st.success("🗑️ Ata deletada!")
-                        del st.session_state[f'confirmar_delete_{ata["id"]}']
-                        st.rerun()
-                
-                # Gerenciar ações
-                if st.session_state.get(f'gerenciar_acoes_{ata["id"]}', False):
-                    st.markdown("---")
-                    st.subheader("🎯 Gerenciar Plano de Ação")
-                    
-                    # Mostrar ações existentes
-                    if ata['acoes']:
-                        st.markdown("**Ações Atuais:**")
-                        acoes_atualizadas = ata['acoes'].copy()
-                        
-                        for idx, acao in enumerate(ata['acoes']):
-                            col1, col2 = st.columns([4, 1])
-                            
-                            with col1:
-                                concluida = st.checkbox(
-                                    f"{acao.get('descricao', '')} - {acao.get('responsavel', '')}",
-                                    value=acao.get('concluida', False),
-                                    key=f"acao_{ata['id']}_{idx}"
-                                )
-                                acoes_atualizadas[idx]['concluida'] = concluida
-                            
-                            with col2:
-                                if st.button("🗑️", key=f"del_acao_{ata['id']}_{idx}"):
-                                    acoes_atualizadas.pop(idx)
-                                    db.atualizar_ata(ata['id'], acoes=acoes_atualizadas)
-                                    st.success("Ação removida!")
-                                    st.rerun()
-                        
-                        if st.button("💾 Salvar Status", key=f"save_acoes_{ata['id']}"):
-                            db.atualizar_ata(ata['id'], acoes=acoes_atualizadas)
-                            st.success("✅ Status das ações atualizado!")
-                            st.rerun()
-                    
-                    st.markdown("---")
-                    
-                    # Adicionar nova ação
-                    with st.form(f"form_nova_acao_{ata['id']}"):
-                        st.markdown("**➕ Adicionar Nova Ação:**")
-                        
-                        nova_descricao = st.text_input("Descrição da Ação")
-                        
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            novo_responsavel = st.text_input("Responsável")
-                        with col2:
-                            novo_prazo = st.date_input("Prazo", value=datetime.now() + timedelta(days=7))
-                        
-                        if st.form_submit_button("➕ Adicionar Ação"):
-                            if nova_descricao and novo_responsavel:
-                                nova_acao = {
-                                    'descricao': nova_descricao,
-                                    'responsavel': novo_responsavel,
-                                    'prazo': novo_prazo.isoformat(),
-                                    'concluida': False
-                                }
-                                
-                                acoes_existentes = ata['acoes'] if ata['acoes'] else []
-                                acoes_existentes.append(nova_acao)
-                                
-                                db.atualizar_ata(ata['id'], acoes=acoes_existentes)
-                                st.success("✅ Ação adicionada!")
-                                st.rerun()
-                            else:
-                                st.error("Preencha todos os campos!")
-                    
-                    if st.button("❌ Fechar Gerenciamento", key=f"close_acoes_{ata['id']}"):
-                        del st.session_state[f'gerenciar_acoes_{ata["id"]}']
-                        st.rerun()
-                
-                st.markdown("</div>", unsafe_allow_html=True)
-                st.markdown("---")
+            exibir_card_ata(ata)
+            exibir_gerenciar_acoes(ata['id'])
+            
+            st.markdown("</div>", unsafe_allow_html=True)
+            st.markdown("---")
+        
+        exibir_navegacao(pagina, 'pagina_atas')
 
 # ==================== MODO: AÇÕES PENDENTES ====================
 elif modo == "✅ Ações Pendentes":
@@ -467,6 +511,18 @@ elif modo == "✅ Ações Pendentes":
     else:
         st.warning(f"⚠️ Você tem **{len(acoes)}** ação(ões) pendente(s)")
         
+        # Conclusão em lote: um único UPDATE e um único rerun
+        with st.expander("✅ Concluir várias ações"):
+            rotulos = {a['id']: f"{a['acao']} - {a['responsavel'] or 'Não definido'} ({a['titulo_ata']})"
+                       for a in acoes}
+            ids_lote = st.multiselect("Ações:", list(rotulos), format_func=rotulos.get,
+                                      key='lote_acoes_ids')
+            if st.button("✅ Marcar como concluídas", key='lote_acoes_concluir',
+                         disabled=not ids_lote, use_container_width=True):
+                concluidas = db.concluir_acoes_em_lote(ids_lote)
+                st.success(f"✅ {concluidas} ação(ões) concluída(s)!")
+                st.rerun()
+        
         # Agrupar por status
         atrasadas = []
         hoje = []
@@ -526,46 +582,41 @@ elif modo == "✅ Ações Pendentes":
 elif modo == "📊 Relatório":
     st.subheader("📊 Relatório de Reuniões")
     
-    atas = db.listar_atas()
+    # Apenas as colunas do relatório; contagens calculadas no banco
+    df_atas = db.obter_dataframe_atas(
+        ['id', 'titulo', 'data_reuniao', 'participantes', 'acoes', 'acoes_pendentes']
+    )
     
-    if not atas:
+    if df_atas.empty:
         st.info("Sem dados para gerar relatório")
     else:
         # Métricas
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total de Reuniões", len(atas))
+            st.metric("Total de Reuniões", len(df_atas))
         
         with col2:
-            total_participantes = sum(len(ata['participantes']) for ata in atas)
-            media_participantes = total_participantes / len(atas) if atas else 0
+            media_participantes = df_atas['participantes'].mean()
             st.metric("Média de Participantes", f"{media_participantes:.1f}")
         
         with col3:
-            todas_acoes = sum(len(ata['acoes']) for ata in atas)
-            st.metric("Total de Ações", todas_acoes)
+            st.metric("Total de Ações", int(df_atas['acoes'].sum()))
         
         with col4:
-            acoes_pendentes = len(db.obter_acoes_pendentes())
-            st.metric("Ações Pendentes", acoes_pendentes)
+            st.metric("Ações Pendentes", int(df_atas['acoes_pendentes'].sum()))
         
         st.markdown("---")
         
         # Tabela de resumo
         st.subheader("📋 Resumo de Reuniões")
         
-        dados_tabela = []
-        for ata in atas:
-            dados_tabela.append({
-                'ID': ata['id'],
-                'Título': ata['titulo'],
-                'Data': datetime.fromisoformat(ata['data_reuniao']).strftime('%d/%m/%Y'),
-                'Participantes': len(ata['participantes']),
-                'Ações': len(ata['acoes']) if ata['acoes'] else 0
-            })
-        
-        df = pd.DataFrame(dados_tabela)
+        df = df_atas[['id', 'titulo', 'data_reuniao', 'participantes', 'acoes']].assign(
+            data_reuniao=df_atas['data_reuniao'].dt.strftime('%d/%m/%Y')
+        ).rename(columns={
+            'id': 'ID', 'titulo': 'Título', 'data_reuniao': 'Data',
+            'participantes': 'Participantes', 'acoes': 'Ações'
+        })
         st.dataframe(df, use_container_width=True)
 
 # Footer
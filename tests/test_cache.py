@@ -0,0 +1,49 @@
+"""
+Testes do cache de consultas (database.cache)
+"""
+import copy
+
+from database.cache import CacheConsultas, cacheado
+from database.models import Anotacao
+
+
+class _Gerenciador:
+    def __init__(self):
+        self._cache = CacheConsultas()
+        self.consultas = 0
+
+    @cacheado('anotacoes')
+    def listar(self):
+        self.consultas += 1
+        return {
+            'itens': [Anotacao(1, 'Título', 'Texto', 'Geral', '["a"]', 'média', 0, '2026-01-01', '2026-01-01')],
+            'proximo': None
+        }
+
+
+def test_acerto_nao_faz_deepcopy(monkeypatch):
+    gerenciador = _Gerenciador()
+    gerenciador.listar()
+
+    def proibido(*args, **kwargs):
+        raise AssertionError('deepcopy em acerto do cache')
+
+    monkeypatch.setattr(copy, 'deepcopy', proibido)
+    gerenciador.listar()
+    assert gerenciador.consultas == 1
+
+
+def test_alterar_resultado_nao_altera_o_cache():
+    gerenciador = _Gerenciador()
+    pagina = gerenciador.listar()
+    pagina['numero'] = 2
+    pagina['itens'][0]['titulo'] = 'Alterado'
+    pagina['itens'][0]['extra'] = True
+    pagina['itens'].append(None)
+
+    outra = gerenciador.listar()
+    assert 'numero' not in outra
+    assert len(outra['itens']) == 1
+    assert outra['itens'][0]['titulo'] == 'Título'
+    assert 'extra' not in outra['itens'][0]
+    assert outra['itens'][0]['tags'] == ['a']
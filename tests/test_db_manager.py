@@ -0,0 +1,22 @@
+"""
+Testes do backend SQLite (database.db_manager)
+"""
+from database.db_manager import DatabaseManager
+
+
+def test_atualizar_ocorrencias_conta_so_as_existentes(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'teste.db'))
+    try:
+        primeira = db.criar_ocorrencia('Falha', 'Primeira')
+        segunda = db.criar_ocorrencia('Falha', 'Segunda')
+        db.deletar_ocorrencia(segunda)
+
+        alteradas = db.atualizar_ocorrencias({
+            primeira: {'status': 'em andamento'},
+            segunda: {'status': 'em andamento'}
+        })
+
+        assert alteradas == 1
+        assert db.buscar_ocorrencia(primeira)['status'] == 'em andamento'
+    finally:
+        db.fechar()
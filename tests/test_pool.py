@@ -0,0 +1,56 @@
+"""
+Testes do pool de conexões SQLite (database.pool)
+"""
+import threading
+
+from database.pool import ConnectionPool
+
+
+def _pool(tmp_path, **kwargs) -> ConnectionPool:
+    pool = ConnectionPool(str(tmp_path / 'teste.db'), **kwargs)
+    with pool.escrita() as conn:
+        conn.execute("CREATE TABLE itens (id INTEGER PRIMARY KEY)")
+        conn.execute("INSERT INTO itens DEFAULT VALUES")
+    return pool
+
+
+def test_leitores_de_threads_curtas_ficam_limitados(tmp_path):
+    pool = _pool(tmp_path, max_leitores=3)
+    resultados = []
+
+    def ler():
+        with pool.leitura() as conn:
+            resultados.append(conn.execute("SELECT COUNT(*) FROM itens").fetchone()[0])
+
+    try:
+        for _ in range(20):
+            threads = [threading.Thread(target=ler) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert len(pool._leitores) <= 3
+
+        assert resultados == [1] * 100
+        assert pool._livres.qsize() == len(pool._leitores)
+    finally:
+        pool.fechar()
+
+
+def test_leitura_aninhada_reaproveita_a_conexao(tmp_path):
+    pool = _pool(tmp_path, max_leitores=1, espera_leitor=0.1)
+    try:
+        with pool.leitura() as externa:
+            with pool.leitura() as interna:
+                assert interna is externa
+        assert len(pool._leitores) == 1
+    finally:
+        pool.fechar()
+
+
+def test_fechar_descarta_conexao_emprestada(tmp_path):
+    pool = _pool(tmp_path)
+    with pool.leitura() as conn:
+        pool.fechar()
+    assert pool._livres.qsize() == 0
+    assert pool._leitores == []
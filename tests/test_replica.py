@@ -0,0 +1,86 @@
+"""
+Testes da réplica de leitura em memória (database.replica)
+"""
+import sqlite3
+import threading
+
+import pytest
+
+from database.pool import ConnectionPool
+
+
+def _pool(tmp_path, **kwargs) -> ConnectionPool:
+    pool = ConnectionPool(str(tmp_path / 'teste.db'), anexos={'arquivo': str(tmp_path / 'arquivo.db')},
+                          **kwargs)
+    with pool.escrita() as conn:
+        conn.execute("CREATE TABLE itens (id INTEGER PRIMARY KEY)")
+        conn.execute("CREATE TABLE arquivo.itens (id INTEGER PRIMARY KEY)")
+        conn.execute("INSERT INTO itens DEFAULT VALUES")
+    return pool
+
+
+def test_leituras_simultaneas_usam_conexoes_proprias(tmp_path):
+    pool = _pool(tmp_path, max_leitores=4)
+    replica = pool.ativar_replica(intervalo_verificacao=60)
+    barreira = threading.Barrier(3)
+    conexoes = []
+
+    def ler():
+        with pool.leitura() as conn:
+            conexoes.append(conn)
+            assert conn.execute("SELECT COUNT(*) FROM itens").fetchone()[0] == 1
+            assert conn.execute("SELECT COUNT(*) FROM arquivo.itens").fetchone()[0] == 0
+            barreira.wait(timeout=5)
+
+    try:
+        threads = [threading.Thread(target=ler) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len({id(conn) for conn in conexoes}) == 3
+        assert replica.metricas()['leituras_replica'] == 3
+        assert replica.metricas()['leitores_abertos'] == 3
+        assert pool._leitores == []
+    finally:
+        pool.fechar()
+
+
+def test_leitores_alem_do_limite_vao_para_o_arquivo(tmp_path):
+    pool = _pool(tmp_path, max_leitores=1)
+    replica = pool.ativar_replica(intervalo_verificacao=60)
+    try:
+        with pool.leitura() as primeira:
+            with pool.leitura() as segunda:
+                assert segunda is not primeira
+                assert len(pool._leitores) == 1
+        assert replica.metricas()['leituras_disco'] == 1
+    finally:
+        pool.fechar()
+
+
+def test_troca_de_geracao_fecha_a_anterior(tmp_path):
+    pool = _pool(tmp_path)
+    replica = pool.ativar_replica(intervalo_verificacao=60)
+    try:
+        anterior = replica._atual
+        with pool.leitura() as emprestada:
+            with pool.leitura() as livre:
+                pass
+            assert anterior.abertos() == 2
+
+            with pool.escrita() as conn:
+                conn.execute("INSERT INTO itens DEFAULT VALUES")
+            replica.atualizar()
+            assert anterior.abertos() == 1
+            with pytest.raises(sqlite3.ProgrammingError):
+                livre.execute("SELECT 1")
+            assert emprestada.execute("SELECT COUNT(*) FROM itens").fetchone()[0] == 1
+
+        assert anterior.abertos() == 0
+        assert replica._atual is not anterior
+        with pool.leitura() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM itens").fetchone()[0] == 2
+    finally:
+        pool.fechar()
@@ -2,12 +2,17 @@
 Componentes visuais reutilizáveis
 """
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
 import sys
 import os
+import tempfile
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from utils.exportacao import FORMATOS_EXPORTACAO, exportar
+
 try:
     from config import EMPRESA, DESENVOLVEDOR, VERSAO, DATA_VERSAO
 except:
@@ -24,6 +29,17 @@ except:
     VERSAO = '1.0.0'
     DATA_VERSAO = '06/01/2026'
 
+try:
+    from config import INTERFACE
+except ImportError:
+    INTERFACE = {'intervalo_paineis': 30}
+
+# Intervalo de atualização dos fragmentos de estatísticas e alertas (run_every)
+INTERVALO_PAINEIS = INTERFACE.get('intervalo_paineis')
+
+# Bytes de uma exportação mantidos em memória antes de ir para um arquivo temporário
+LIMITE_EXPORTACAO_MEMORIA = 8 * 1024 * 1024
+
 
 def exibir_logo_sidebar():
     with st.sidebar:
@@ -195,4 +211,212 @@ def exibir_badge_personalizado(texto: str, cor: str = "#3498db", icone: str = ""
         '>
             {icone} {texto}
         </span>
-    """, unsafe_allow_html=True)
\ No newline at end of file
+    """, unsafe_allow_html=True)
+
+
+def carregar_pagina(db, metodo: str, chave: str, tamanho_pagina: int = 20, **filtros) -> Dict:
+    """Carrega a página atual de uma listagem paginada por keyset.
+
+    O cursor fica em st.session_state[chave] e volta à primeira página quando
+    os filtros mudam. A página seguinte é pré-carregada em segundo plano e
+    reaproveitada quando o usuário avança.
+    """
+    estado = st.session_state.setdefault(chave, {
+        'filtros': None, 'cursor': None, 'numero': 1, 'prefetch': None
+    })
+    
+    if estado['filtros'] != filtros:
+        estado.update(filtros=filtros, cursor=None, numero=1, prefetch=None)
+    
+    pagina = None
+    prefetch = estado['prefetch']
+    if prefetch is not None and prefetch[0] == estado['cursor']:
+        try:
+            pagina = prefetch[1].result()
+        except Exception:
+            pagina = None
+    
+    if pagina is None:
+        pagina = getattr(db, metodo)(tamanho_pagina=tamanho_pagina, cursor=estado['cursor'], **filtros)
+    
+    estado['prefetch'] = None
+    if pagina['proximo']:
+        futuro = db.pre_carregar(metodo, tamanho_pagina=tamanho_pagina,
+                                 cursor=pagina['proximo'], **filtros)
+        estado['prefetch'] = (pagina['proximo'], futuro)
+    
+    pagina['numero'] = estado['numero']
+    return pagina
+
+
+def exibir_navegacao(pagina: Dict, chave: str):
+    """Exibe os botões de página anterior/próxima de uma listagem paginada"""
+    estado = st.session_state[chave]
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    
+    with col1:
+        if st.button("⬅️ Anterior", key=f"{chave}_anterior",
+                     disabled=not pagina['anterior'], use_container_width=True):
+            estado['cursor'] = pagina['anterior']
+            estado['numero'] = max(1, estado['numero'] - 1)
+            st.rerun()
+    
+    with col2:
+        st.markdown(
+            f"<div style='text-align: center; padding-top: 8px;'>Página {pagina['numero']}</div>",
+            unsafe_allow_html=True
+        )
+    
+    with col3:
+        if st.button("Próxima ➡️", key=f"{chave}_proxima",
+                     disabled=not pagina['proximo'], use_container_width=True):
+            estado['cursor'] = pagina['proximo']
+            estado['numero'] += 1
+            st.rerun()
+
+
+def _descartar_exportacao(chave: str):
+    """Remove a exportação guardada na sessão e fecha o arquivo temporário"""
+    estado = st.session_state.pop(chave, None)
+    if estado:
+        estado['arquivo'].close()
+
+
+def exibir_exportacao(db, metodo: str, chave: str, nome_base: str, **filtros):
+    """Exporta os registros filtrados em CSV, JSONL ou XLSX.
+
+    O arquivo é gerado a partir do gerador db.<metodo>(**filtros) somente
+    quando o usuário pede, em um SpooledTemporaryFile: fica em memória até
+    LIMITE_EXPORTACAO_MEMORIA e depois em um arquivo temporário sem nome,
+    apagado pelo sistema ao ser fechado. O download fica disponível
+    enquanto formato e filtros não mudarem; uma nova exportação, a troca
+    de filtros ou o fim da sessão liberam o arquivo anterior.
+    """
+    with st.expander("📥 Exportar"):
+        formato = st.selectbox("Formato:", list(FORMATOS_EXPORTACAO), key=f"{chave}_formato",
+                               format_func=str.upper)
+        estado = st.session_state.get(chave)
+        if estado and (estado['formato'] != formato or estado['filtros'] != filtros):
+            _descartar_exportacao(chave)
+            estado = None
+
+        if st.button("⚙️ Preparar arquivo", key=f"{chave}_preparar", use_container_width=True):
+            _descartar_exportacao(chave)
+            arquivo = tempfile.SpooledTemporaryFile(max_size=LIMITE_EXPORTACAO_MEMORIA)
+
+            with st.spinner("Gerando arquivo..."):
+                try:
+                    total = exportar(getattr(db, metodo)(**filtros), formato, arquivo)
+                except (ImportError, ValueError) as erro:
+                    arquivo.close()
+                    st.error(f"❌ {erro}")
+                    return
+
+            estado = {'arquivo': arquivo, 'formato': formato, 'filtros': filtros, 'total': total}
+            st.session_state[chave] = estado
+
+        if estado:
+            extensao, mime = FORMATOS_EXPORTACAO[formato]
+            estado['arquivo'].seek(0)
+            st.download_button(
+                f"⬇️ Baixar {estado['total']} registro(s)",
+                data=estado['arquivo'].read(),
+                file_name=f"{nome_base}_{datetime.now():%Y%m%d_%H%M}.{extensao}",
+                mime=mime,
+                key=f"{chave}_download",
+                use_container_width=True
+            )
+
+
+def editar_tabela(itens: List[Dict], colunas: List[str], editaveis: List[str], chave: str,
+                  configuracao: Dict = None) -> Dict[int, Dict]:
+    """Exibe os itens em um st.data_editor e retorna as alterações feitas.
+
+    Uma linha por item (índice 'id', que deve estar em colunas); só as
+    colunas editaveis aceitam edição. O quadro editado é comparado com o
+    original e o resultado é {id: {campo: novo_valor}}; nada é gravado
+    aqui. Depois de gravar, chame descartar_edicoes(chave).
+    """
+    import pandas as pd
+
+    original = pd.DataFrame([[item.get(coluna) for coluna in colunas] for item in itens],
+                            columns=colunas).set_index('id')
+    # A chave muda com as linhas exibidas: edições pendentes não passam para outra página
+    versao = st.session_state.get(f"{chave}_versao", 0)
+    editado = st.data_editor(
+        original,
+        key=f"{chave}_{versao}_{hash(tuple(original.index))}",
+        column_config=configuracao,
+        disabled=[coluna for coluna in original.columns if coluna not in editaveis],
+        num_rows="fixed",
+        use_container_width=True
+    )
+    
+    alteracoes = {}
+    for campo in editaveis:
+        antes, depois = original[campo], editado[campo]
+        mudou = (antes != depois) & ~(antes.isna() & depois.isna())
+        for item_id, valor in depois[mudou].items():
+            alteracoes.setdefault(int(item_id), {})[campo] = None if pd.isna(valor) else valor
+    return alteracoes
+
+
+def descartar_edicoes(chave: str):
+    """Recria a tabela de editar_tabela sem as edições pendentes"""
+    st.session_state[f"{chave}_versao"] = st.session_state.get(f"{chave}_versao", 0) + 1
+
+
+def iniciar_cards(chave: str):
+    """Descarta os registros relidos pelos cards (chamar fora dos fragmentos).
+
+    Só a execução completa da página passa por aqui; a partir dela os cards
+    voltam a usar os registros da listagem recém-carregada.
+    """
+    st.session_state[chave] = {}
+
+
+def registro_do_card(chave: str, registro: Dict) -> Dict:
+    """Versão mais recente de um registro exibido em um card (st.fragment).
+
+    Um fragmento reexecuta com os argumentos da última execução completa;
+    depois de uma alteração feita no próprio card vale o registro relido.
+    """
+    return st.session_state.get(chave, {}).get(registro['id'], registro)
+
+
+def atualizar_card(chave: str, registro_id: int, registro: Optional[Dict]):
+    """Guarda o registro relido e reexecuta só o fragmento do card.
+
+    Se o registro não existe mais, a página inteira é reexecutada.
+    """
+    if registro is None:
+        st.rerun()
+    st.session_state.setdefault(chave, {})[registro_id] = registro
+    reexecutar_fragmento()
+
+
+def resultado_do_painel(chave: str, consulta, reler: Callable[[], Any]) -> Any:
+    """Dados de um fragmento que se atualiza sozinho (run_every).
+
+    consulta é o Future submetido em paralelo na execução completa: na
+    primeira execução do fragmento com ele, o resultado vem dele. As
+    reexecuções do fragmento recebem o mesmo Future (argumentos da última
+    execução completa), e aí os dados são relidos com reler().
+    """
+    if st.session_state.get(chave) is consulta:
+        return reler()
+    st.session_state[chave] = consulta
+    return consulta.result()
+
+
+def reexecutar_fragmento():
+    """Reexecuta só o fragmento atual (st.rerun com scope="fragment").
+
+    O Streamlit só aceita esse escopo durante uma reexecução do fragmento;
+    se o clique chegou em uma execução completa, reexecuta a página.
+    """
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
@@ -0,0 +1,117 @@
+"""
+Exportação de registros em CSV, JSONL e XLSX
+Os registros são consumidos de um iterável (ex.: db.iterar_ocorrencias) e
+gravados linha a linha, sem montar a lista completa em memória
+"""
+import csv
+import io
+import json
+from itertools import chain
+from typing import Any, BinaryIO, Dict, Iterable, List
+
+# formato: (extensão, tipo MIME)
+FORMATOS_EXPORTACAO = {
+    'csv': ('csv', 'text/csv'),
+    'jsonl': ('jsonl', 'application/x-ndjson'),
+    'xlsx': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+}
+
+# Limite de linhas de uma planilha do Excel (incluindo o cabeçalho)
+LIMITE_LINHAS_XLSX = 1048576
+
+
+def _valor_tabular(valor: Any) -> Any:
+    """Converte listas e dicts (tags, participantes, ações) em texto JSON"""
+    if isinstance(valor, (list, dict)):
+        return json.dumps(valor, ensure_ascii=False)
+    return valor
+
+
+def _exportar_csv(registros: Iterable[Dict], colunas: List[str], destino: BinaryIO) -> int:
+    """Grava CSV em UTF-8 com BOM (abre com acentos corretos no Excel)"""
+    texto = io.TextIOWrapper(destino, encoding='utf-8-sig', newline='')
+    try:
+        escritor = csv.writer(texto)
+        escritor.writerow(colunas)
+        total = 0
+        for registro in registros:
+            escritor.writerow([_valor_tabular(registro.get(coluna)) for coluna in colunas])
+            total += 1
+        texto.flush()
+    finally:
+        # Devolve o arquivo ao chamador sem fechá-lo
+        texto.detach()
+    return total
+
+
+def _exportar_jsonl(registros: Iterable[Dict], destino: BinaryIO) -> int:
+    """Grava um objeto JSON por linha, preservando listas e dicts"""
+    total = 0
+    for registro in registros:
+        destino.write(json.dumps(registro, ensure_ascii=False, default=str).encode('utf-8'))
+        destino.write(b'\n')
+        total += 1
+    return total
+
+
+def _exportar_xlsx(registros: Iterable[Dict], colunas: List[str], destino: BinaryIO) -> int:
+    """Grava XLSX em modo write-only do openpyxl (linhas vão direto para disco)"""
+    try:
+        from openpyxl import Workbook
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+    except ImportError as erro:
+        raise ImportError("Exportação XLSX requer o pacote openpyxl (pip install openpyxl)") from erro
+
+    def celula(valor):
+        valor = _valor_tabular(valor)
+        if isinstance(valor, str):
+            return ILLEGAL_CHARACTERS_RE.sub('', valor)
+        return valor
+
+    planilha = Workbook(write_only=True)
+    aba = planilha.create_sheet("Dados")
+    aba.append(colunas)
+
+    total = 0
+    for registro in registros:
+        if total + 1 >= LIMITE_LINHAS_XLSX:
+            raise ValueError(f"XLSX suporta no máximo {LIMITE_LINHAS_XLSX - 1} linhas; use CSV ou JSONL")
+        aba.append([celula(registro.get(coluna)) for coluna in colunas])
+        total += 1
+
+    planilha.save(destino)
+    return total
+
+
+def exportar(registros: Iterable[Dict], formato: str, destino: BinaryIO) -> int:
+    """Grava os registros no formato indicado em um arquivo binário aberto.
+
+    As colunas são as chaves do primeiro registro. Retorna o número de
+    registros gravados.
+    """
+    formato = formato.lower()
+    if formato not in FORMATOS_EXPORTACAO:
+        raise ValueError(f"Formato inválido: {formato}")
+
+    iterador = iter(registros)
+    primeiro = next(iterador, None)
+    if primeiro is None:
+        colunas, registros = [], iter(())
+    else:
+        colunas, registros = list(primeiro), chain([primeiro], iterador)
+
+    if formato == 'csv':
+        return _exportar_csv(registros, colunas, destino)
+    if formato == 'jsonl':
+        return _exportar_jsonl(registros, destino)
+    return _exportar_xlsx(registros, colunas, destino)
+
+
+def exportar_arquivo(registros: Iterable[Dict], formato: str, caminho: str) -> int:
+    """Atalho para scripts: exporta os registros para o caminho informado.
+
+    Exemplo:
+        exportar_arquivo(db.iterar_ocorrencias(status='aberta'), 'csv', 'abertas.csv')
+    """
+    with open(caminho, 'wb') as destino:
+        return exportar(registros, formato, destino)